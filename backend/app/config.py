@@ -1,9 +1,77 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import List
 import os
 
 class Settings(BaseSettings):
     database_url: str
 
+    # Anzahl der Dateien, nach denen scan_and_update die Änderungen committet
+    scan_chunk_size: int = 500
+
+    # Anzahl der Threads, die beim Scan Datei-Hashes berechnen
+    scan_hash_workers: int = 4
+
+    # Container-Header (MKV/MP4) beim Scan auslesen und Anzahl der Threads dafür
+    scan_probe_media: bool = True
+    scan_probe_workers: int = 4
+
+    # Zeitgesteuerte Scans der Medienwurzeln (media_roots): Prüfintervall in Sekunden
+    # und Anzahl der Wurzeln, die gleichzeitig gescannt werden dürfen
+    scan_scheduler_enabled: bool = True
+    scan_scheduler_tick_seconds: int = 60
+    scan_max_parallel_roots: int = 2
+
+    # Bild-Proxy: FlareSolverr-Endpunkt, gemeinsamer HTTP-Client (Verbindungen, Keep-Alive)
+    # und Begrenzung gleichzeitiger Anfragen je Zielhost bzw. an FlareSolverr
+    flaresolverr_url: str = "http://localhost:8191/v1"
+    flaresolverr_timeout_seconds: int = 60
+    flaresolverr_max_concurrent: int = 2
+    image_proxy_timeout_seconds: int = 20
+    image_proxy_max_connections: int = 50
+    image_proxy_keepalive_seconds: int = 30
+    image_proxy_per_host_limit: int = 6
+
+    # Auswahl der Bild-Download-Methoden: Fehlschläge in Folge, nach denen eine Methode
+    # (für einen Host bzw. bei nicht erreichbarem Dienst für alle) übersprungen wird,
+    # und Sekunden bis zum nächsten Probeversuch
+    image_strategy_failure_threshold: int = 3
+    image_strategy_reset_seconds: float = 300.0
+
+    # Bild-Downloads: Methoden in Standardreihenfolge (direct, flaresolverr,
+    # anime_loads_session, browser), Timeout und gleichzeitige Instanzen des Browsers
+    image_fetch_backends: List[str] = ["direct", "flaresolverr", "anime_loads_session", "browser"]
+    image_browser_timeout_seconds: int = 30
+    image_browser_max_concurrent: int = 1
+
+    # Bild-Cache: Verzeichnis auf der Platte und LRU im Speicher (Gesamtgröße und
+    # maximale Größe eines Bildes, größere Bilder liegen nur auf der Platte)
+    image_cache_dir: str = "static/covers"
+    image_cache_memory_bytes: int = 64 * 1024 * 1024
+    image_cache_memory_item_bytes: int = 512 * 1024
+
+    # Breiten der Cover-Varianten (Raster, Detailseite, hochauflösende Displays)
+    cover_variant_widths: List[int] = [240, 480, 960]
+
+    # Hintergrund-Prefetch der Cover: gleichzeitige Downloads, Versuche je Cover, Wartezeit
+    # vor dem ersten erneuten Versuch (verdoppelt sich) und Größe der Warteschlange
+    cover_prefetch_enabled: bool = True
+    cover_prefetch_workers: int = 2
+    cover_prefetch_max_attempts: int = 3
+    cover_prefetch_backoff_seconds: float = 30.0
+    cover_prefetch_max_queue: int = 10000
+
+    # Höchstzahl an Anime-IDs je Anfrage an /api/covers/batch (eine Abfrage für ein ganzes Raster)
+    cover_batch_max_ids: int = 500
+
+    # Aufräumen des Cover-Speichers (image_cache_dir): Obergrenze in Bytes (0 = unbegrenzt),
+    # Höchstalter seit dem letzten Zugriff in Tagen (0 = aus), Schonfrist in Stunden, bevor
+    # nicht mehr referenzierte Dateien gelöscht werden, und Intervall der automatischen
+    # Läufe in Minuten (0 = nur manuell über POST /api/covers/store/gc)
+    cover_store_max_bytes: int = 2 * 1024 ** 3
+    cover_store_max_age_days: int = 0
+    cover_store_orphan_grace_hours: float = 24.0
+    cover_store_gc_interval_minutes: int = 360
+
     # Absoluter Pfad zur .env-Datei
     model_config = SettingsConfigDict(env_file=os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env'))
 
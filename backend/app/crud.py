@@ -1,6 +1,9 @@
+from sqlalchemy import and_, func
 from sqlalchemy.orm import Session
 from . import models, schemas
+from .scanner.titles import normalize_title
 from typing import List, Optional
+from datetime import datetime
 
 # --- Anime CRUD --- 
 
@@ -8,6 +11,16 @@ def get_anime(db: Session, anime_id: int) -> Optional[models.Anime]:
     """Get a single anime by its ID."""
     return db.query(models.Anime).filter(models.Anime.id == anime_id).first()
 
+def get_cover_sources(db: Session, anime_ids: List[int]) -> List[tuple]:
+    """Get id, cover URL and local cover path of many animes in a single query."""
+    if not anime_ids:
+        return []
+    return (
+        db.query(models.Anime.id, models.Anime.cover_image_url, models.Anime.cover_local_path)
+        .filter(models.Anime.id.in_(anime_ids))
+        .all()
+    )
+
 def get_anime_by_titel_de(db: Session, titel_de: str) -> Optional[models.Anime]:
     """Get a single anime by its German title."""
     return db.query(models.Anime).filter(models.Anime.titel_de == titel_de).first()
@@ -113,6 +126,10 @@ def update_anime(db: Session, anime_id: int, anime_update: schemas.AnimeUpdate)
     db_anime = get_anime(db, anime_id)
     update_data = anime_update.model_dump(exclude_unset=True)
     
+    # Neue Cover-URL: das lokal gecachte Cover gehört zur alten URL und wird neu geladen
+    if db_anime is not None and update_data.get("cover_image_url", db_anime.cover_image_url) != db_anime.cover_image_url:
+        db_anime.cover_local_path = None
+    
     for key, value in update_data.items():
         setattr(db_anime, key, value)
     
@@ -139,11 +156,12 @@ def get_episode(db: Session, episode_id: int) -> Optional[models.Episode]:
     return db.query(models.Episode).filter(models.Episode.id == episode_id).first()
 
 def get_episode_by_anime_id_and_number(
-    db: Session, anime_id: int, episoden_nummer: int
+    db: Session, anime_id: int, episoden_nummer: int, staffel: int = 1
 ) -> Optional[models.Episode]:
-    """Get a specific episode by anime ID and episode number."""
+    """Get a specific episode by anime ID, season and episode number within the season."""
     return db.query(models.Episode).filter(
         models.Episode.anime_id == anime_id,
+        models.Episode.staffel == staffel,
         models.Episode.episoden_nummer == episoden_nummer
     ).first()
 
@@ -161,13 +179,16 @@ def get_episode_by_url(db: Session, url: str) -> Optional[models.Episode]:
     return db.query(models.Episode).filter(models.Episode.anime_loads_episode_url == url).first()
 
 def get_episodes_for_anime(db: Session, anime_id: int, skip: int = 0, limit: int = 1000) -> List[models.Episode]:
-    """Get all episodes for a specific anime."""
-    return db.query(models.Episode).filter(models.Episode.anime_id == anime_id).offset(skip).limit(limit).all()
+    """Get all episodes for a specific anime, ordered by season and episode number."""
+    return db.query(models.Episode).filter(models.Episode.anime_id == anime_id).order_by(
+        models.Episode.staffel, models.Episode.episoden_nummer
+    ).offset(skip).limit(limit).all()
 
 def create_episode(db: Session, episode: schemas.EpisodeCreate, anime_id: int) -> models.Episode:
     """Create a new episode in the database."""
     db_episode = models.Episode(
         anime_id=anime_id,
+        staffel=episode.staffel,
         episoden_nummer=episode.episoden_nummer,
         titel=episode.titel,
         status=episode.status,
@@ -208,3 +229,120 @@ def delete_episode(db: Session, episode_id: int) -> Optional[models.Episode]:
         db.commit()
         return db_episode
     return None
+
+def get_duplicate_episodes(db: Session, hash_mode: Optional[str] = None) -> List[schemas.DuplicateGroup]:
+    """Find local files that share the same content hash (and hash mode)."""
+    Episode = models.Episode
+    duplicates = db.query(Episode.file_hash, Episode.hash_mode).filter(Episode.file_hash.isnot(None))
+    if hash_mode:
+        duplicates = duplicates.filter(Episode.hash_mode == hash_mode)
+    duplicates = duplicates.group_by(Episode.file_hash, Episode.hash_mode).having(func.count(Episode.id) > 1).subquery()
+
+    rows = db.query(
+        Episode.id, Episode.anime_id, Episode.staffel, Episode.episoden_nummer, Episode.local_path,
+        Episode.file_size, Episode.file_hash, Episode.hash_mode
+    ).join(
+        duplicates,
+        and_(Episode.file_hash == duplicates.c.file_hash, Episode.hash_mode == duplicates.c.hash_mode)
+    ).order_by(Episode.file_hash, Episode.id).all()
+
+    groups = {}
+    for row in rows:
+        group = groups.get((row.file_hash, row.hash_mode))
+        if group is None:
+            group = groups[(row.file_hash, row.hash_mode)] = schemas.DuplicateGroup(
+                file_hash=row.file_hash, hash_mode=row.hash_mode, files=[]
+            )
+        group.files.append(schemas.DuplicateFile(
+            episode_id=row.id,
+            anime_id=row.anime_id,
+            staffel=row.staffel,
+            episoden_nummer=row.episoden_nummer,
+            local_path=row.local_path,
+            file_size=row.file_size,
+        ))
+    return list(groups.values())
+
+# --- Title alias CRUD ---
+
+def get_title_aliases(db: Session, anime_id: Optional[int] = None) -> List[models.TitleAlias]:
+    """Get all title aliases, optionally only those of one anime."""
+    query = db.query(models.TitleAlias)
+    if anime_id is not None:
+        query = query.filter(models.TitleAlias.anime_id == anime_id)
+    return query.order_by(models.TitleAlias.alias).all()
+
+def get_title_alias_by_alias(db: Session, alias: str) -> Optional[models.TitleAlias]:
+    """Get a title alias by its (normalized) text."""
+    return db.query(models.TitleAlias).filter(models.TitleAlias.alias == normalize_title(alias)).first()
+
+def create_title_alias(db: Session, alias: schemas.TitleAliasCreate) -> models.TitleAlias:
+    """Create a title alias; the alias is stored normalized like the scanner compares it."""
+    db_alias = models.TitleAlias(alias=normalize_title(alias.alias), anime_id=alias.anime_id)
+    db.add(db_alias)
+    db.commit()
+    db.refresh(db_alias)
+    return db_alias
+
+def delete_title_alias(db: Session, alias_id: int) -> Optional[models.TitleAlias]:
+    """Delete a title alias."""
+    db_alias = db.query(models.TitleAlias).filter(models.TitleAlias.id == alias_id).first()
+    if db_alias:
+        db.delete(db_alias)
+        db.commit()
+    return db_alias
+
+# --- Media root CRUD ---
+
+def get_media_roots(db: Session, enabled_only: bool = False) -> List[models.MediaRoot]:
+    """Get all media roots, optionally only the enabled ones."""
+    query = db.query(models.MediaRoot)
+    if enabled_only:
+        query = query.filter(models.MediaRoot.enabled.is_(True))
+    return query.order_by(models.MediaRoot.name).all()
+
+def get_media_root(db: Session, root_id: int) -> Optional[models.MediaRoot]:
+    """Get a single media root by its ID."""
+    return db.query(models.MediaRoot).filter(models.MediaRoot.id == root_id).first()
+
+def get_media_root_by_name(db: Session, name: str) -> Optional[models.MediaRoot]:
+    """Get a media root by its unique name."""
+    return db.query(models.MediaRoot).filter(models.MediaRoot.name == name).first()
+
+def create_media_root(db: Session, root: schemas.MediaRootCreate) -> models.MediaRoot:
+    """Create a new media root."""
+    db_root = models.MediaRoot(**root.model_dump())
+    db.add(db_root)
+    db.commit()
+    db.refresh(db_root)
+    return db_root
+
+def update_media_root(db: Session, root_id: int, root_update: schemas.MediaRootUpdate) -> Optional[models.MediaRoot]:
+    """Update an existing media root."""
+    db_root = get_media_root(db, root_id)
+    if not db_root:
+        return None
+    for key, value in root_update.model_dump(exclude_unset=True).items():
+        setattr(db_root, key, value)
+    db.commit()
+    db.refresh(db_root)
+    return db_root
+
+def delete_media_root(db: Session, root_id: int) -> Optional[models.MediaRoot]:
+    """Delete a media root (the episodes found below it are kept)."""
+    db_root = get_media_root(db, root_id)
+    if db_root:
+        db.delete(db_root)
+        db.commit()
+    return db_root
+
+def record_media_root_scan(db: Session, root_id: int, status: str, job_id: Optional[str] = None,
+                           started_at: Optional[datetime] = None) -> None:
+    """Store the state of the latest scan of a media root."""
+    values = {models.MediaRoot.last_scan_status: status}
+    if job_id is not None:
+        values[models.MediaRoot.last_job_id] = job_id
+    if started_at is not None:
+        values[models.MediaRoot.last_scan_at] = started_at
+    db.query(models.MediaRoot).filter(models.MediaRoot.id == root_id).update(values, synchronize_session=False)
+    db.commit()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, Text, ForeignKey, TIMESTAMP, Date, Boolean, LargeBinary, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Enum, Text, ForeignKey, Index, JSON, TIMESTAMP, Date, Boolean, LargeBinary, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -73,6 +73,7 @@ class Anime(Base):
                                    foreign_keys="AnimeRelation.target_anime_id",
                                    back_populates="target_anime",
                                    cascade="all, delete-orphan")
+    aliases = relationship("TitleAlias", back_populates="anime", cascade="all, delete-orphan")
 
 
 class AnimeRelation(Base):
@@ -89,23 +90,65 @@ class AnimeRelation(Base):
     target_anime = relationship("Anime", foreign_keys=[target_anime_id], back_populates="target_relations")
 
 
+class TitleAlias(Base):
+    """Alternativer (normalisierter) Titel, unter dem lokale Dateien einem Anime zugeordnet werden."""
+    __tablename__ = "title_aliases"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    alias = Column(String(255), nullable=False, unique=True)  # Normalisiert wie normalize_title()
+    anime_id = Column(Integer, ForeignKey("animes.id"), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    anime = relationship("Anime", back_populates="aliases")
+
+
+class MediaRoot(Base):
+    """Benanntes Medienverzeichnis mit eigener Dateiauswahl und eigenem Scan-Intervall."""
+    __tablename__ = "media_roots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False, unique=True)
+    path = Column(String(500), nullable=False)
+    include_globs = Column(JSON, nullable=True)  # Liste von Globs relativ zu path; leer = alle Dateien
+    exclude_globs = Column(JSON, nullable=True)  # Liste von Globs relativ zu path
+    extensions = Column(JSON, nullable=True)  # Liste von Dateiendungen; leer = Standard (mkv, mp4, avi)
+    scan_interval_minutes = Column(Integer, nullable=True)  # None = nur manuell scannen
+    workers = Column(Integer, nullable=False, default=1)  # Parser-Prozesse für diese Wurzel
+    io_workers = Column(Integer, nullable=True)  # Threads für Hashen/Auslesen; None = Standard aus den Settings
+    create_missing = Column(Boolean, nullable=False, default=True)
+    hash_mode = Column(String(10), nullable=True)  # "partial", "full" oder None
+    probe_media = Column(Boolean, nullable=True)  # None = Standard aus den Settings
+    enabled = Column(Boolean, nullable=False, default=True)
+    last_scan_at = Column(DateTime, nullable=True)  # Start des letzten Scans
+    last_scan_status = Column(String(20), nullable=True)  # Status des letzten Scan-Jobs
+    last_job_id = Column(String(32), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 class Episode(Base):
     __tablename__ = "episoden"
 
     id = Column(Integer, primary_key=True, index=True)
     anime_id = Column(Integer, ForeignKey("animes.id"), nullable=False)
-    episoden_nummer = Column(Integer, nullable=False)
+    staffel = Column(Integer, nullable=False, default=1, server_default='1')  # Staffel (0 = Specials)
+    episoden_nummer = Column(Integer, nullable=False)  # Nummer innerhalb der Staffel
+    absolute_nummer = Column(Integer, nullable=True)  # Fortlaufende Nummer über alle Staffeln
     titel = Column(String(255), nullable=True)
     status = Column(Enum(EpisodeStatus), nullable=False, default=EpisodeStatus.missing)
     availability_status = Column(Enum(EpisodeAvailabilityStatus), nullable=False, default=EpisodeAvailabilityStatus.NOT_AVAILABLE)
     local_path = Column(String(512), nullable=True)  # Pfad zur lokalen Datei
     
     # Neue Felder für lokale Dateien
-    file_size = Column(Integer, nullable=True)  # Größe der Datei in Bytes
-    file_hash = Column(String(64), nullable=True)  # Hash der Datei (für Deduplizierung)
+    file_size = Column(BigInteger, nullable=True)  # Größe der Datei in Bytes
+    file_inode = Column(BigInteger, nullable=True)  # Inode der Datei, um verschobene Dateien wiederzuerkennen
+    file_mtime = Column(BigInteger, nullable=True)  # Änderungszeit der Datei (Unix-Sekunden) beim letzten Hashen
+    file_hash = Column(String(64), nullable=True, index=True)  # Hash der Datei (für Deduplizierung)
+    hash_mode = Column(String(10), nullable=True)  # "partial" (Anfang, Ende, Größe) oder "full"
     resolution = Column(String(20), nullable=True)  # z.B. "1080p"
     codec = Column(String(20), nullable=True)  # z.B. "x265"
     audio_format = Column(String(20), nullable=True)  # z.B. "DTS"
+    probe_size = Column(BigInteger, nullable=True)  # Dateigröße beim letzten Auslesen der Container-Header
+    probe_mtime = Column(BigInteger, nullable=True)  # Änderungszeit beim letzten Auslesen der Container-Header
     
     air_date = Column(Date, nullable=True)
     anime_loads_episode_url = Column(String(512), nullable=True)
@@ -113,3 +156,7 @@ class Episode(Base):
     zuletzt_aktualisiert_am = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
     anime = relationship("Anime", back_populates="episodes")
+
+    __table_args__ = (
+        Index('ix_episoden_anime_staffel_nummer', 'anime_id', 'staffel', 'episoden_nummer'),
+    )
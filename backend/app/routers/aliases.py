@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from .. import crud, schemas
+from ..database import get_db
+from ..scanner.titles import normalize_title
+
+router = APIRouter(
+    prefix="/api/aliases",
+    tags=["aliases"],
+    responses={404: {"description": "Not found"}},
+)
+
+@router.get("/", response_model=List[schemas.TitleAlias])
+def read_title_aliases(anime_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """Liste aller Titel-Aliase, optional nur für einen Anime."""
+    return crud.get_title_aliases(db, anime_id=anime_id)
+
+@router.post("/", response_model=schemas.TitleAlias, status_code=status.HTTP_201_CREATED)
+def create_title_alias(alias: schemas.TitleAliasCreate, db: Session = Depends(get_db)):
+    """
+    Legt einen Alias an, unter dem lokale Dateien dem Anime zugeordnet werden.
+    
+    Der Alias wird normalisiert gespeichert und gilt ab dem nächsten Scan.
+    """
+    if not normalize_title(alias.alias):
+        raise HTTPException(status_code=422, detail="Alias ist nach der Normalisierung leer")
+    if crud.get_anime(db, anime_id=alias.anime_id) is None:
+        raise HTTPException(status_code=404, detail="Anime nicht gefunden")
+    existing = crud.get_title_alias_by_alias(db, alias.alias)
+    if existing:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Alias '{existing.alias}' ist bereits Anime {existing.anime_id} zugeordnet"
+        )
+    return crud.create_title_alias(db, alias)
+
+@router.delete("/{alias_id}", response_model=schemas.TitleAlias)
+def delete_title_alias(alias_id: int, db: Session = Depends(get_db)):
+    """Löscht einen Titel-Alias."""
+    db_alias = crud.delete_title_alias(db, alias_id)
+    if db_alias is None:
+        raise HTTPException(status_code=404, detail="Alias nicht gefunden")
+    return db_alias
@@ -1,18 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from sqlalchemy.orm import Session
-from typing import List, Dict, Tuple
+from typing import Any, List, Dict, Tuple
 import logging
 import uuid
 
 from .. import crud, models, schemas
 from ..database import get_db
 from ..scraper.scraper import search_anime, scrape_anime, scrape_episode_list
+from ..utils.cover_prefetch import cover_prefetcher
 
-# Import der Scan-Funktionalität
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from scan_local_files import scan_and_update
+from .scans import start_scan_job
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +25,11 @@ def create_new_anime(anime: schemas.AnimeCreate, db: Session = Depends(get_db)):
     db_anime = crud.get_anime_by_titel(db, titel=anime.titel)
     if db_anime:
         raise HTTPException(status_code=400, detail=f"Anime with title '{anime.titel}' already exists.")
-    return crud.create_anime(db=db, anime=anime)
+    db_anime = crud.create_anime(db=db, anime=anime)
+    # Cover im Hintergrund laden, statt die Anfrage darauf warten zu lassen
+    if db_anime.cover_image_url:
+        cover_prefetcher.enqueue([db_anime.id])
+    return db_anime
 
 @router.get("/", response_model=List[schemas.AnimeSimple])
 def read_all_animes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
@@ -171,119 +172,46 @@ def scrape_anime_by_url(url: str):
         "episodes": episodes_data or []
     }
 
-@router.post("/scan-local-files", response_model=Dict[str, int])
-def scan_local_anime_files(media_dir: str = Body(...), db: Session = Depends(get_db)):
+@router.post("/scan-local-files", status_code=status.HTTP_202_ACCEPTED)
+def scan_local_anime_files(media_dir: str = Body(..., embed=True)):
     """
-    Scannt das angegebene Verzeichnis nach Anime-Dateien und aktualisiert die Datenbank.
+    Startet einen Scan des angegebenen Verzeichnisses im Hintergrund.
+    
+    Der Fortschritt kann über /api/scans/{job_id} abgefragt werden.
     
     Args:
         media_dir: Das zu scannende Verzeichnis
         
     Returns:
-        Dictionary mit Statistiken (gefundene Dateien, erkannte Animes, aktualisierte Episoden)
+        Der Scan-Job (inklusive job_id)
     """
     logger.info(f"Scan-Anfrage erhalten für Verzeichnis: {media_dir}")
-    
-    # Prüfen, ob das Verzeichnis existiert
-    logger.info(f"Überprüfe ob Verzeichnis existiert: {media_dir}")
-    if not os.path.exists(media_dir):
-        err_msg = f"Verzeichnis '{media_dir}' existiert nicht."
-        logger.error(err_msg)
-        raise HTTPException(status_code=404, detail=err_msg)
-    
-    # Prüfen, ob es sich um ein Verzeichnis handelt
-    logger.info(f"Überprüfe ob es sich um ein Verzeichnis handelt: {media_dir}")
-    if not os.path.isdir(media_dir):
-        err_msg = f"'{media_dir}' ist kein Verzeichnis."
-        logger.error(err_msg)
-        raise HTTPException(status_code=400, detail=err_msg)
-    
-    try:
-        logger.info(f"Starte scan_and_update für Verzeichnis: {media_dir}")
-        total_files, matched_animes, updated_episodes = scan_and_update(media_dir, db)
-        logger.info(f"Scan abgeschlossen: {total_files} Dateien, {matched_animes} Animes, {updated_episodes} Episoden")
-        return {
-            "total_files": total_files,
-            "matched_animes": matched_animes,
-            "updated_episodes": updated_episodes
-        }
-    except Exception as e:
-        logger.exception(f"Fehler beim Scannen von {media_dir}: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Fehler beim Scannen: {str(e)}")
+    return start_scan_job(media_dir, create_missing=False)
 
-@router.post("/scan-and-create", response_model=Dict[str, int])
-def scan_and_create_animes(media_dir_obj: Dict[str, str] = Body(...), db: Session = Depends(get_db)):
+@router.post("/scan-and-create", status_code=status.HTTP_202_ACCEPTED)
+def scan_and_create_animes(media_dir_obj: Dict[str, Any] = Body(...)):
     """
-    Scannt das angegebene Verzeichnis und erstellt neue Anime-Einträge für nicht zugeordnete Dateien.
+    Startet einen Scan im Hintergrund, der neue Anime-Einträge für nicht zugeordnete Dateien erstellt.
+    
+    Der Fortschritt kann über /api/scans/{job_id} abgefragt werden. Mit 'dry_run': true
+    wird nichts geschrieben; der Plan steht dann unter /api/scans/{job_id}/results.
     
     Args:
-        media_dir_obj: Dictionary mit dem Schlüssel 'media_dir' und dem Pfad als Wert
+        media_dir_obj: Dictionary mit dem Schlüssel 'media_dir' und dem Pfad als Wert,
+            optional 'dry_run'
         
     Returns:
-        Dictionary mit Statistiken (gefundene Dateien, erstellte Animes, aktualisierte Episoden)
+        Der Scan-Job (inklusive job_id)
     """
-    # Erhöhte Sichtbarkeit des vollständigen Request-Körpers
-    logger.info(f"Empfangener Request-Body: {media_dir_obj}")
-    
     # Extrahiere media_dir aus dem Dictionary
     if not isinstance(media_dir_obj, dict) or 'media_dir' not in media_dir_obj:
         logger.error(f"Fehlerhafter Request-Body: {media_dir_obj}")
         raise HTTPException(status_code=422, detail="'media_dir' wird im Request-Body erwartet")
     
     media_dir = media_dir_obj['media_dir']
-    logger.info(f"Scan-and-Create-Anfrage für Verzeichnis: {media_dir}")
-    
-    # Prüfen, ob das Verzeichnis existiert
-    logger.info(f"Überprüfe ob Verzeichnis existiert: {media_dir}")
-    if not os.path.exists(media_dir):
-        err_msg = f"Verzeichnis '{media_dir}' existiert nicht."
-        logger.error(err_msg)
-        raise HTTPException(status_code=404, detail=err_msg)
-    
-    # Prüfen, ob es sich um ein Verzeichnis handelt
-    logger.info(f"Überprüfe ob es sich um ein Verzeichnis handelt: {media_dir}")
-    if not os.path.isdir(media_dir):
-        err_msg = f"'{media_dir}' ist kein Verzeichnis."
-        logger.error(err_msg)
-        raise HTTPException(status_code=400, detail=err_msg)
-    
-    try:
-        # Aufruf der erweiterten Funktion mit create_missing=True
-        logger.info(f"Führe scan_and_update mit create_missing=True für Verzeichnis aus: {media_dir}")
-        
-        # Detailliertes Debugging
-        import traceback
-        try:
-            # Einfacher Test, ob wir überhaupt auf die Datenbank zugreifen können
-            try:
-                test_animes = db.query(models.Anime).limit(1).all()
-                logger.info(f"Datenbankzugriff erfolgreich, gefundene Animes: {len(test_animes)}")
-            except Exception as db_e:
-                logger.error(f"Datenbankzugriff fehlgeschlagen: {str(db_e)}")
-                raise HTTPException(status_code=500, detail=f"Datenbankzugriff fehlgeschlagen: {str(db_e)}")
-                
-            total_files, matched_animes, updated_episodes = scan_and_update(
-                media_dir, db, create_missing=True
-            )
-            
-            logger.info(f"Scan-and-Create abgeschlossen: {total_files} Dateien, {matched_animes} Animes, {updated_episodes} Episoden")
-            
-            # Zusätzliche Überprüfung, ob wir die Daten tatsächlich zurückgeben können
-            result = {
-                "total_files": total_files,
-                "matched_animes": matched_animes, 
-                "updated_episodes": updated_episodes
-            }
-            logger.info(f"Rückgabewerte: {result}")
-            return result
-            
-        except Exception as inner_e:
-            logger.error(f"Details der Exception: {str(inner_e)}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            raise inner_e
-    except Exception as e:
-        logger.exception(f"Fehler beim Scan-and-Create für {media_dir}: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Fehler beim Scannen: {str(e)}")
+    dry_run = bool(media_dir_obj.get('dry_run', False))
+    logger.info(f"Scan-and-Create-Anfrage für Verzeichnis: {media_dir} (Probelauf: {dry_run})")
+    return start_scan_job(media_dir, create_missing=True, dry_run=dry_run)
 
 @router.get("/{anime_id}", response_model=schemas.Anime)
 def read_single_anime(anime_id: int, db: Session = Depends(get_db)):
@@ -300,6 +228,9 @@ def update_existing_anime(anime_id: int, anime: schemas.AnimeUpdate, db: Session
     db_anime = crud.update_anime(db, anime_id=anime_id, anime_update=anime)
     if db_anime is None:
         raise HTTPException(status_code=404, detail="Anime not found")
+    # Neue Cover-URL: Cover im Hintergrund neu laden
+    if db_anime.cover_image_url and not db_anime.cover_local_path:
+        cover_prefetcher.enqueue([db_anime.id])
     return db_anime
 
 @router.delete("/{anime_id}", response_model=schemas.AnimeSimple)
@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Response, status
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+
+from .. import crud
+from ..config import settings
+from ..database import get_db
+from ..utils.cover_prefetch import cover_prefetcher
+from ..utils.cover_store import cover_store
+from ..utils.covers import describe_cover, negotiate_format
+from ..utils.image_cache import image_cache
+from ..utils.image_fetch import image_fetcher
+
+router = APIRouter(
+    prefix="/api/covers",
+    tags=["covers"],
+    responses={404: {"description": "Not found"}},
+)
+
+@router.get("/prefetch")
+def read_prefetch_status() -> Dict:
+    """Status des Cover-Prefetchers: Warteschlange, laufende Downloads und Fehlschläge."""
+    return cover_prefetcher.status()
+
+@router.post("/prefetch", status_code=status.HTTP_202_ACCEPTED)
+def start_prefetch(anime_ids: Optional[List[int]] = Body(None, embed=True), db: Session = Depends(get_db)) -> Dict:
+    """
+    Reiht fehlende Cover zum Vorladen ein (ohne anime_ids: alle Animes mit Cover-URL,
+    aber ohne lokales Cover).
+    """
+    queued = cover_prefetcher.enqueue_missing(db, anime_ids)
+    return {"queued": queued, **cover_prefetcher.status()}
+
+@router.post("/batch")
+def read_cover_batch(
+    response: Response,
+    anime_ids: List[int] = Body(..., embed=True),
+    w: int = Body(240, embed=True, gt=0),
+    accept: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+) -> Dict:
+    """
+    Löst die Cover vieler Animes mit einer Datenbankabfrage auf (z.B. für ein ganzes Raster).
+
+    Liefert je Anime eine versionierte Thumbnail-URL (/api/cover/{id}?w=..&v=..), die der
+    Browser dauerhaft cachen darf, sowie ETag und Content-Type der Variante, sofern sie
+    schon existiert. Fehlende Cover werden dem Prefetcher übergeben, außer er ist daran
+    bereits gescheitert.
+    """
+    if len(anime_ids) > settings.cover_batch_max_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Höchstens {settings.cover_batch_max_ids} Anime-IDs pro Anfrage",
+        )
+    format_name = negotiate_format(accept)
+    covers = {}
+    pending = []
+    for anime_id, cover_url, local_path in crud.get_cover_sources(db, list(dict.fromkeys(anime_ids))):
+        cover = describe_cover(anime_id, cover_url, local_path, w, format_name)
+        if cover["status"] == "pending":
+            if anime_id in cover_prefetcher.failures:
+                # Nicht bei jedem Seitenaufruf erneut versuchen (dafür gibt es POST /prefetch)
+                cover["status"] = "failed"
+            else:
+                pending.append(anime_id)
+        covers[str(anime_id)] = cover
+    if pending:
+        cover_prefetcher.enqueue(pending)
+    # ETag und Content-Type hängen vom ausgehandelten Format ab
+    response.headers["Vary"] = "Accept"
+    return {
+        "covers": covers,
+        "not_found": [anime_id for anime_id in dict.fromkeys(anime_ids) if str(anime_id) not in covers],
+    }
+
+@router.get("/metrics")
+def read_cover_metrics() -> Dict:
+    """
+    Kennzahlen der Bild-Downloads: Erfolgsquote, Dauer und Circuit Breaker je Methode
+    (gesamt und je Host), zusammengefasste Downloads und Treffer des Bild-Caches.
+    """
+    return {
+        "image_fetch": image_fetcher.metrics(),
+        "image_cache": image_cache.stats(),
+    }
+
+@router.post("/metrics/reset")
+def reset_download_strategies() -> Dict:
+    """Vergisst Statistik und Circuit Breaker der Download-Methoden (z.B. nach Neustart von FlareSolverr)."""
+    image_fetcher.strategies.reset()
+    return image_fetcher.metrics()
+
+@router.get("/store")
+def read_cover_store(db: Session = Depends(get_db)) -> Dict:
+    """
+    Belegung des Cover-Speichers (Originale, Varianten, verwaiste Einträge), Obergrenze,
+    Trefferquote des Bild-Caches und Ergebnis des letzten Aufräumlaufs.
+    """
+    return cover_store.stats(db)
+
+@router.post("/store/gc")
+def collect_cover_store(dry_run: bool = Body(False, embed=True), db: Session = Depends(get_db)) -> Dict:
+    """
+    Räumt den Cover-Speicher sofort auf: verwaiste Dateien, Platzhalter, abgelaufene
+    Einträge und Verdrängung bis unter die Obergrenze (dry_run: nur berechnen).
+    """
+    return cover_store.collect(db, dry_run=dry_run)
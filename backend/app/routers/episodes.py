@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from .. import crud, models, schemas
 from ..database import get_db
@@ -11,6 +11,11 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+@router.get("/duplicates", response_model=List[schemas.DuplicateGroup])
+def read_duplicate_episodes(hash_mode: Optional[str] = None, db: Session = Depends(get_db)):
+    """Liste lokaler Dateien mit identischem Inhalts-Hash (wird beim Scan mit --hash berechnet)."""
+    return crud.get_duplicate_episodes(db, hash_mode=hash_mode)
+
 @router.post("/{anime_id}", response_model=schemas.Episode, status_code=status.HTTP_201_CREATED)
 def create_episode_for_anime(anime_id: int, episode: schemas.EpisodeCreate, db: Session = Depends(get_db)):
     """Erstelle eine neue Episode für einen bestimmten Anime."""
@@ -18,14 +23,14 @@ def create_episode_for_anime(anime_id: int, episode: schemas.EpisodeCreate, db:
     if db_anime is None:
         raise HTTPException(status_code=404, detail="Anime nicht gefunden")
     
-    # Prüfen, ob eine Episode mit dieser Nummer bereits existiert
+    # Prüfen, ob eine Episode mit dieser Nummer in der Staffel bereits existiert
     existing_episode = crud.get_episode_by_anime_id_and_number(
-        db, anime_id=anime_id, episoden_nummer=episode.episoden_nummer
+        db, anime_id=anime_id, episoden_nummer=episode.episoden_nummer, staffel=episode.staffel
     )
     if existing_episode:
         raise HTTPException(
             status_code=400, 
-            detail=f"Episode {episode.episoden_nummer} existiert bereits für Anime mit ID {anime_id}"
+            detail=f"Episode {episode.episoden_nummer} (Staffel {episode.staffel}) existiert bereits für Anime mit ID {anime_id}"
         )
     
     return crud.create_episode(db=db, episode=episode, anime_id=anime_id)
@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Dict, List
+import os
+
+from .. import crud, schemas
+from ..config import settings
+from ..database import SessionLocal, get_db
+from ..scanner.jobs import MediaRootUnavailableError, ScanAlreadyRunningError
+from ..scanner.scheduler import MediaRootScheduler
+from .scans import start_root_scan
+
+router = APIRouter(
+    prefix="/api/media-roots",
+    tags=["media-roots"],
+    responses={404: {"description": "Not found"}},
+)
+
+# Scheduler für zeitgesteuerte Scans; wird beim Start der Anwendung gestartet (siehe main.py)
+scheduler = MediaRootScheduler(
+    SessionLocal,
+    lambda db: crud.get_media_roots(db, enabled_only=True),
+    start_root_scan,
+    tick_seconds=settings.scan_scheduler_tick_seconds,
+    max_parallel=settings.scan_max_parallel_roots,
+)
+
+def _validate_path(path: str) -> None:
+    # Das Verzeichnis selbst muss nicht erreichbar sein (z.B. Netzlaufwerk), aber absolut
+    if not os.path.isabs(path):
+        raise HTTPException(status_code=400, detail=f"Pfad '{path}' muss absolut sein")
+
+def _get_root_or_404(db: Session, root_id: int):
+    db_root = crud.get_media_root(db, root_id)
+    if db_root is None:
+        raise HTTPException(status_code=404, detail="Medienwurzel nicht gefunden")
+    return db_root
+
+@router.get("/", response_model=List[schemas.MediaRoot])
+def read_media_roots(db: Session = Depends(get_db)):
+    """Liste aller Medienwurzeln."""
+    return crud.get_media_roots(db)
+
+@router.post("/", response_model=schemas.MediaRoot, status_code=status.HTTP_201_CREATED)
+def create_media_root(root: schemas.MediaRootCreate, db: Session = Depends(get_db)):
+    """Legt eine Medienwurzel an (Name, Pfad, Dateiauswahl, Scan-Intervall und Worker-Limits)."""
+    _validate_path(root.path)
+    if crud.get_media_root_by_name(db, root.name):
+        raise HTTPException(status_code=409, detail=f"Medienwurzel '{root.name}' existiert bereits")
+    return crud.create_media_root(db, root)
+
+@router.get("/scheduler")
+def read_scheduler_status() -> Dict:
+    """Status des Schedulers und laufende geplante Scans je Wurzel."""
+    return scheduler.status()
+
+@router.get("/{root_id}", response_model=schemas.MediaRoot)
+def read_media_root(root_id: int, db: Session = Depends(get_db)):
+    return _get_root_or_404(db, root_id)
+
+@router.put("/{root_id}", response_model=schemas.MediaRoot)
+def update_media_root(root_id: int, root: schemas.MediaRootUpdate, db: Session = Depends(get_db)):
+    """Ändert eine Medienwurzel; Änderungen gelten ab dem nächsten Scan."""
+    _get_root_or_404(db, root_id)
+    if root.path is not None:
+        _validate_path(root.path)
+    if root.name is not None:
+        existing = crud.get_media_root_by_name(db, root.name)
+        if existing and existing.id != root_id:
+            raise HTTPException(status_code=409, detail=f"Medienwurzel '{root.name}' existiert bereits")
+    return crud.update_media_root(db, root_id, root)
+
+@router.delete("/{root_id}", response_model=schemas.MediaRoot)
+def delete_media_root(root_id: int, db: Session = Depends(get_db)):
+    """Löscht eine Medienwurzel; die gefundenen Episoden bleiben erhalten."""
+    db_root = crud.delete_media_root(db, root_id)
+    if db_root is None:
+        raise HTTPException(status_code=404, detail="Medienwurzel nicht gefunden")
+    return db_root
+
+@router.post("/{root_id}/scan", status_code=status.HTTP_202_ACCEPTED)
+def scan_media_root(root_id: int, dry_run: bool = False, db: Session = Depends(get_db)):
+    """Startet sofort einen Scan der Medienwurzel; Fortschritt unter /api/scans/{job_id}."""
+    db_root = _get_root_or_404(db, root_id)
+    try:
+        job = start_root_scan(db, db_root, dry_run=dry_run)
+    except MediaRootUnavailableError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ScanAlreadyRunningError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return job.as_dict()
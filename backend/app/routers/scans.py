@@ -0,0 +1,202 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from typing import Dict, List, Optional
+from datetime import datetime
+import logging
+
+from .. import crud, models, schemas
+from ..database import SessionLocal, get_db
+from ..scanner.candidates import DEFAULT_TOP_K, build_unmatched_report
+from ..scanner.jobs import MediaRootUnavailableError, ScanAlreadyRunningError, ScanJob, scan_jobs
+from ..utils.cover_prefetch import cover_prefetcher
+
+# Import der Scan-Funktionalität
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from scan_local_files import build_candidate_index, catalog_version, scan_and_update, scan_media_root
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/scans",
+    tags=["scans"],
+    responses={404: {"description": "Not found"}},
+)
+
+def _prefetch_covers(db: Session, job: ScanJob) -> None:
+    """Reiht die Cover der im Scan gefundenen Animes zum Vorladen ein."""
+    if job.dry_run:
+        return
+    try:
+        queued = cover_prefetcher.enqueue_missing(db, job.progress.matched_anime_ids)
+    except SQLAlchemyError as e:
+        logger.error("Cover-Prefetch für Scan-Job %s nicht möglich: %s", job.id, e)
+        return
+    if queued:
+        logger.info("%s Cover aus Scan-Job %s zum Vorladen eingereiht", queued, job.id)
+
+def _run_scan_job(job: ScanJob):
+    """Führt den Scan eines Jobs mit einer eigenen Datenbankverbindung aus."""
+    db = SessionLocal()
+    try:
+        summary = scan_and_update(
+            job.media_dir, db,
+            create_missing=job.create_missing,
+            workers=job.workers,
+            progress=job.progress,
+            hash_mode=job.hash_mode,
+            probe_media=job.probe_media,
+            dry_run=job.dry_run
+        )
+        _prefetch_covers(db, job)
+        return summary
+    finally:
+        db.close()
+
+def _run_root_scan(job: ScanJob):
+    """Führt den Scan einer Medienwurzel mit deren Einstellungen aus und speichert den Status."""
+    db = SessionLocal()
+    try:
+        root = crud.get_media_root(db, job.root_id)
+        if root is None:
+            raise ValueError(f"Medienwurzel {job.root_id} existiert nicht mehr")
+        if job.dry_run:
+            return scan_media_root(db, root, job.progress, dry_run=True)
+        
+        crud.record_media_root_scan(db, root.id, "running", job.id, datetime.now())
+        try:
+            summary = scan_media_root(db, root, job.progress)
+        except Exception:
+            db.rollback()
+            crud.record_media_root_scan(db, root.id, "failed")
+            raise
+        crud.record_media_root_scan(db, root.id, "cancelled" if job.progress.cancelled else "completed")
+        _prefetch_covers(db, job)
+        return summary
+    finally:
+        db.close()
+
+def start_root_scan(db: Session, root: models.MediaRoot, dry_run: bool = False) -> ScanJob:
+    """
+    Startet den Scan einer Medienwurzel im Hintergrund (manuell oder durch den Scheduler).
+    
+    Ist das Verzeichnis nicht erreichbar (z.B. Netzlaufwerk nicht eingehängt), wird das
+    als Status gespeichert; der Scheduler versucht es erst nach dem nächsten Intervall erneut.
+    
+    Raises:
+        MediaRootUnavailableError: wenn das Verzeichnis nicht existiert
+        ScanAlreadyRunningError: wenn für das Verzeichnis bereits ein Scan läuft
+    """
+    if not os.path.isdir(root.path):
+        if not dry_run:
+            crud.record_media_root_scan(db, root.id, "unavailable", started_at=datetime.now())
+        error = MediaRootUnavailableError(root.name, root.path)
+        logger.error("%s", error)
+        raise error
+    
+    job = scan_jobs.submit(root.path, root.create_missing, _run_root_scan, workers=max(1, root.workers or 1),
+                           hash_mode=root.hash_mode, probe_media=root.probe_media, dry_run=dry_run,
+                           root_id=root.id, root_name=root.name)
+    logger.info("Scan-Job %s für Medienwurzel '%s' eingereiht", job.id, root.name)
+    return job
+
+def start_scan_job(media_dir: str, create_missing: bool, workers: int = 1, hash_mode: Optional[str] = None,
+                   probe_media: Optional[bool] = None, dry_run: bool = False) -> Dict:
+    """
+    Prüft das Verzeichnis und startet einen Scan-Job im Hintergrund.
+    
+    Args:
+        media_dir: Das zu scannende Verzeichnis
+        create_missing: Wenn True, werden neue Animes für nicht zugeordnete Dateien erstellt
+        workers: Anzahl der Parser-Prozesse
+        hash_mode: Optionaler Hash-Modus für die Duplikaterkennung ("partial" oder "full")
+        probe_media: Container-Header auslesen (None: Standard aus den Settings)
+        dry_run: Nur einen Plan erstellen, nichts schreiben (Ergebnis unter /results)
+        
+    Returns:
+        Der Job als Dictionary (inklusive job_id)
+    """
+    if not os.path.exists(media_dir):
+        err_msg = f"Verzeichnis '{media_dir}' existiert nicht."
+        logger.error(err_msg)
+        raise HTTPException(status_code=404, detail=err_msg)
+    
+    if not os.path.isdir(media_dir):
+        err_msg = f"'{media_dir}' ist kein Verzeichnis."
+        logger.error(err_msg)
+        raise HTTPException(status_code=400, detail=err_msg)
+    
+    try:
+        job = scan_jobs.submit(media_dir, create_missing, _run_scan_job, workers=max(1, workers),
+                               hash_mode=hash_mode, probe_media=probe_media, dry_run=dry_run)
+    except ScanAlreadyRunningError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    logger.info("Scan-Job %s für %s eingereiht", job.id, job.media_dir)
+    return job.as_dict()
+
+def _get_job_or_404(job_id: str) -> ScanJob:
+    job = scan_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scan-Job nicht gefunden")
+    return job
+
+@router.post("/", status_code=status.HTTP_202_ACCEPTED)
+def create_scan_job(scan: schemas.ScanJobCreate):
+    """Startet einen Scan im Hintergrund und gibt sofort die Job-ID zurück."""
+    return start_scan_job(scan.media_dir, scan.create_missing, scan.workers, scan.hash_mode, scan.probe_media,
+                          scan.dry_run)
+
+@router.get("/", response_model=List[Dict])
+def list_scan_jobs():
+    """Listet laufende und zuletzt abgeschlossene Scan-Jobs."""
+    return [job.as_dict() for job in scan_jobs.list()]
+
+@router.get("/{job_id}")
+def read_scan_job(job_id: str):
+    """Status und Fortschritt (Dateien gefunden, geparst, zugeordnet, geschrieben, Durchsatz) eines Scan-Jobs."""
+    return _get_job_or_404(job_id).as_dict()
+
+@router.get("/{job_id}/results")
+def read_scan_job_results(job_id: str):
+    """Bisherige Ergebnisse eines Scan-Jobs; auch während der Scan noch läuft."""
+    return _get_job_or_404(job_id).results()
+
+@router.get("/{job_id}/unmatched")
+def read_scan_job_unmatched(
+    job_id: str,
+    k: int = Query(DEFAULT_TOP_K, ge=1, le=20),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """
+    Nicht zugeordnete Dateien eines Scan-Jobs mit den k ähnlichsten Animes als Vorschlag.
+    
+    Die Ähnlichkeit wird für alle Dateien gemeinsam über einen Trigramm-Index berechnet;
+    Dateien mit gleichem Titel werden nur einmal bewertet. Der Index wird je Job
+    zwischengespeichert, solange sich weder Job-Status noch Titelbestand ändern.
+    """
+    job = _get_job_or_404(job_id)
+    candidates = job.candidate_index(catalog_version(db), lambda: build_candidate_index(db))
+    unmatched = list(job.progress.unmatched_files)
+    page = unmatched[offset:offset + limit]
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "total": len(unmatched),
+        "offset": offset,
+        "items": build_unmatched_report(page, candidates, k),
+    }
+
+@router.post("/{job_id}/cancel")
+def cancel_scan_job(job_id: str):
+    """
+    Bricht einen laufenden Scan-Job ab.
+    
+    Der Scan endet nach dem aktuellen Chunk; bereits gespeicherte Chunks bleiben erhalten.
+    """
+    _get_job_or_404(job_id)
+    return scan_jobs.cancel(job_id).as_dict()
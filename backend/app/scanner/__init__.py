@@ -0,0 +1,7 @@
+"""
+Scanner-Modul für lokale Anime-Dateien
+Dieses Paket enthält die Bausteine, mit denen scan_local_files lokale Mediendateien erkennt und zuordnet
+"""
+
+from .parser import ParsedFile, parse_filename
+from .summary import ScanSummary
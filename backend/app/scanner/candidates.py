@@ -0,0 +1,119 @@
+"""
+Vorschläge für nicht zugeordnete Dateien.
+
+Jeder Titel wird als Menge von Zeichen-Trigrammen dargestellt. Ein invertierter
+Index (Trigramm -> Titel) erlaubt es, für einen Suchtitel die Überschneidungen mit
+allen Anime-Titeln in einem Durchlauf zu zählen, statt jeden Titel paarweise zu
+vergleichen. Der Score ist der Dice-Koeffizient 2*|A∩B| / (|A|+|B|).
+"""
+
+import heapq
+import logging
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .parser import parse_filename
+from .titles import normalize_title
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 3
+
+# Vorschläge unterhalb dieses Scores werden verworfen
+MIN_SCORE = 0.2
+
+
+def trigrams(text: str) -> frozenset:
+    """Zeichen-Trigramme eines (normalisierten) Titels, mit Leerzeichen an den Rändern."""
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class CandidateIndex:
+    """Trigramm-Index über die Titel und Synonyme aller Animes."""
+
+    def __init__(self, rows: Iterable[Tuple[int, str, Optional[str]]]):
+        """
+        Args:
+            rows: Tupel (id, titel_de, synonyme)
+        """
+        self._anime_ids: List[int] = []
+        self._sizes: List[int] = []
+        self._titles: Dict[int, str] = {}
+        self._postings: Dict[str, List[int]] = {}
+        for anime_id, titel_de, synonyme in rows:
+            self._titles[anime_id] = titel_de
+            names = [titel_de] + ([s.strip() for s in synonyme.split(',')] if synonyme else [])
+            for name in names:
+                normalized = normalize_title(name)
+                if normalized:
+                    self._add(anime_id, normalized)
+
+    def _add(self, anime_id: int, normalized: str) -> None:
+        entry = len(self._anime_ids)
+        grams = trigrams(normalized)
+        self._anime_ids.append(anime_id)
+        self._sizes.append(len(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(entry)
+
+    def title_of(self, anime_id: int) -> Optional[str]:
+        return self._titles.get(anime_id)
+
+    def top_k(self, normalized: str, k: int = DEFAULT_TOP_K) -> List[Tuple[int, float]]:
+        """
+        Liefert die k besten Animes für einen normalisierten Titel.
+
+        Returns:
+            Liste von (anime_id, score), absteigend nach Score
+        """
+        grams = trigrams(normalized)
+        if not grams:
+            return []
+        # Überschneidungen mit allen Einträgen auf einmal zählen
+        overlaps = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in grams))
+
+        best: Dict[int, float] = {}
+        size = len(grams)
+        for entry, common in overlaps.items():
+            score = 2.0 * common / (size + self._sizes[entry])
+            anime_id = self._anime_ids[entry]
+            if score >= MIN_SCORE and score > best.get(anime_id, 0.0):
+                best[anime_id] = score
+        return heapq.nlargest(k, best.items(), key=lambda item: item[1])
+
+
+def build_unmatched_report(paths: Iterable[str], index: CandidateIndex, k: int = DEFAULT_TOP_K) -> List[dict]:
+    """
+    Erstellt für nicht zugeordnete Dateien je bis zu k Vorschläge.
+
+    Dateien mit gleichem Titel (z.B. alle Episoden einer Serie) werden nur einmal bewertet.
+
+    Args:
+        paths: Pfade der nicht zugeordneten Dateien
+        index: Der CandidateIndex
+        k: Anzahl der Vorschläge je Datei
+
+    Returns:
+        Liste von Einträgen mit path, title, episode und candidates
+    """
+    report = []
+    ranked: Dict[str, List[dict]] = {}
+    for path in paths:
+        parsed = parse_filename(path)
+        title = parsed.title if parsed else None
+        normalized = normalize_title(title) if title else ""
+        if normalized not in ranked:
+            ranked[normalized] = [
+                {"anime_id": anime_id, "titel_de": index.title_of(anime_id), "score": round(score, 3)}
+                for anime_id, score in (index.top_k(normalized, k) if normalized else [])
+            ]
+        report.append({
+            "path": path,
+            "title": title,
+            "episode": parsed.episode if parsed else None,
+            "candidates": ranked[normalized],
+        })
+    logger.info("Vorschläge für %d Dateien (%d verschiedene Titel) berechnet", len(report), len(ranked))
+    return report
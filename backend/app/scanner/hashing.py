@@ -0,0 +1,121 @@
+"""
+Inhalts-Hashes lokaler Mediendateien zur Erkennung doppelter Releases.
+
+Zwei Modi stehen zur Verfügung:
+- "partial": SHA-256 über Dateigröße, die ersten und die letzten PARTIAL_HASH_BYTES
+  Bytes. Liest nur wenige MiB pro Datei und reicht, um Duplikate zu finden.
+- "full": SHA-256 über den gesamten Inhalt (per mmap, sonst in großen Blöcken).
+
+Das Hashen läuft in einem Thread-Pool; hashlib und das Lesen geben den GIL frei.
+"""
+
+import os
+import mmap
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HASH_MODES = ("partial", "full")
+
+# Bytes, die im partiellen Modus vom Anfang und vom Ende gelesen werden
+PARTIAL_HASH_BYTES = 4 * 1024 * 1024
+
+# Blockgröße für das Lesen, wenn mmap nicht verfügbar ist (z.B. auf manchen Netzlaufwerken)
+READ_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Ergebnis je Datei: (Hash, Größe in Bytes, mtime in Sekunden)
+HashResult = Tuple[str, int, int]
+
+
+def _partial_hash(f, size: int) -> str:
+    digest = hashlib.sha256()
+    digest.update(size.to_bytes(8, 'little'))
+    digest.update(f.read(PARTIAL_HASH_BYTES))
+    if size > PARTIAL_HASH_BYTES:
+        f.seek(max(PARTIAL_HASH_BYTES, size - PARTIAL_HASH_BYTES))
+        digest.update(f.read(PARTIAL_HASH_BYTES))
+    return digest.hexdigest()
+
+
+def _full_hash(f, size: int) -> str:
+    digest = hashlib.sha256()
+    if size > 0:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+            return digest.hexdigest()
+        except (OSError, ValueError):
+            # mmap nicht möglich, auf blockweises Lesen zurückfallen
+            f.seek(0)
+    for block in iter(lambda: f.read(READ_BLOCK_SIZE), b''):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_file(path: str, mode: str = "partial") -> HashResult:
+    """
+    Berechnet den Inhalts-Hash einer Datei.
+
+    Args:
+        path: Pfad zur Datei
+        mode: "partial" oder "full"
+
+    Returns:
+        Tuple (Hash, Größe, mtime)
+    """
+    if mode not in HASH_MODES:
+        raise ValueError(f"Unbekannter Hash-Modus: {mode}")
+    with open(path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        if mode == "partial":
+            file_hash = _partial_hash(f, stat.st_size)
+        else:
+            file_hash = _full_hash(f, stat.st_size)
+    return file_hash, stat.st_size, int(stat.st_mtime)
+
+
+def is_hash_current(file_hash: Optional[str], hash_mode: Optional[str], stored_size: Optional[int],
+                    stored_mtime: Optional[int], size: int, mtime: int, mode: str) -> bool:
+    """Prüft, ob der gespeicherte Hash für Größe, mtime und Modus noch gültig ist."""
+    if not file_hash or stored_size != size or stored_mtime != mtime:
+        return False
+    # Ein vollständiger Hash ersetzt auch einen angeforderten partiellen
+    return hash_mode == mode or hash_mode == "full"
+
+
+class FileHasher:
+    """Hasht Dateien parallel in einem Thread-Pool."""
+
+    def __init__(self, mode: str = "partial", workers: int = 4):
+        if mode not in HASH_MODES:
+            raise ValueError(f"Unbekannter Hash-Modus: {mode}")
+        self.mode = mode
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hasher")
+
+    def hash_many(self, paths: Iterable[str]) -> Dict[str, HashResult]:
+        """Hasht alle Pfade; nicht lesbare Dateien fehlen im Ergebnis."""
+        paths = list(paths)
+        results = {}
+        for path, outcome in zip(paths, self._pool.map(self._safe_hash, paths)):
+            if outcome is not None:
+                results[path] = outcome
+        return results
+
+    def _safe_hash(self, path: str) -> Optional[HashResult]:
+        try:
+            return hash_file(path, self.mode)
+        except OSError as e:
+            logger.warning("Datei konnte nicht gehasht werden: %s (%s)", path, e)
+            return None
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
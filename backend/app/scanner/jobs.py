@@ -0,0 +1,321 @@
+"""
+Hintergrund-Jobs für Scans lokaler Mediendateien.
+
+Ein Scan läuft in einem eigenen Thread und meldet seinen Fortschritt über ein
+ScanProgress-Objekt, das die API jederzeit auslesen kann. Pro Medienverzeichnis
+(bzw. überlappendem Verzeichnisbaum) läuft höchstens ein Scan gleichzeitig.
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .summary import ScanSummary
+
+logger = logging.getLogger(__name__)
+
+# Anzahl abgeschlossener Jobs, die für Abfragen im Speicher bleiben
+MAX_FINISHED_JOBS = 20
+
+# Anzahl nicht zugeordneter Dateien in den Teilergebnissen
+UNMATCHED_SAMPLE_SIZE = 100
+
+# Markiert das Ende eines Iterators in ScanProgress.timed
+_END = object()
+
+
+class ScanAlreadyRunningError(Exception):
+    """Für das Verzeichnis (oder ein überlappendes) läuft bereits ein Scan."""
+
+    def __init__(self, job: "ScanJob"):
+        super().__init__(f"Für '{job.media_dir}' läuft bereits der Scan {job.id}")
+        self.job = job
+
+
+class MediaRootUnavailableError(Exception):
+    """Das Verzeichnis einer Medienwurzel existiert nicht (z.B. Netzlaufwerk nicht eingehängt)."""
+
+    def __init__(self, root_name: str, path: str):
+        super().__init__(f"Verzeichnis '{path}' der Medienwurzel '{root_name}' existiert nicht.")
+        self.root_name = root_name
+        self.path = path
+
+
+class ScanProgress:
+    """Fortschrittszähler eines laufenden Scans; wird von scan_and_update fortgeschrieben."""
+
+    def __init__(self):
+        self.files_walked = 0
+        self.files_parsed = 0
+        self.files_matched = 0
+        self.files_written = 0
+        self.files_hashed = 0
+        self.files_probed = 0
+        # Laufzeit je Stufe in Sekunden (walk, reconcile, snapshot, parse, match, write, ...);
+        # walk und reconcile laufen gestreamt und sind in der Wartezeit von parse enthalten
+        self.timings: Dict[str, float] = {}
+        # Schreibzugriffe (Chunk schreiben und committen): Anzahl, Summe und Maximum in Sekunden
+        self.db_writes = 0
+        self.db_write_seconds = 0.0
+        self.db_write_max_seconds = 0.0
+        self.summary = ScanSummary()
+        self.matched_anime_ids = set()
+        self.unmatched_files: List[str] = []
+        # Bei Probeläufen der ScanPlan
+        self.plan = None
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self._cancel_event = threading.Event()
+
+    def count_walked(self, paths):
+        """Reicht die Pfade des Walkers durch und zählt sie dabei."""
+        for path in paths:
+            self.files_walked += 1
+            yield path
+
+    @contextmanager
+    def stage(self, name: str):
+        """Misst die Laufzeit einer Stufe; mehrere Abschnitte einer Stufe werden addiert."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def timed(self, iterable, name: str):
+        """
+        Reicht die Elemente durch und rechnet die Wartezeit auf jedes Element der Stufe zu.
+
+        Mit mehreren Parser-Prozessen ist das die Zeit, die der Writer auf den nächsten
+        Chunk wartet, nicht die Rechenzeit der Prozesse.
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                item = next(iterator, _END)
+            if item is _END:
+                return
+            yield item
+
+    def record_write(self, seconds: float) -> None:
+        """Verbucht die Dauer eines Schreibzugriffs auf die Datenbank."""
+        self.db_writes += 1
+        self.db_write_seconds += seconds
+        self.db_write_max_seconds = max(self.db_write_max_seconds, seconds)
+        self.timings["write"] = self.timings.get("write", 0.0) + seconds
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    @property
+    def files_per_second(self) -> float:
+        elapsed = self.elapsed_seconds
+        return self.files_parsed / elapsed if elapsed > 0 else 0.0
+
+    def stage_rate(self, name: str, count: int) -> float:
+        """Dateien pro Sekunde, bezogen auf die reine Laufzeit der Stufe."""
+        seconds = self.timings.get(name, 0.0)
+        return count / seconds if seconds > 0 else 0.0
+
+    @property
+    def db_write_avg_ms(self) -> float:
+        return self.db_write_seconds / self.db_writes * 1000 if self.db_writes else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "files_walked": self.files_walked,
+            "files_parsed": self.files_parsed,
+            "files_matched": self.files_matched,
+            "files_written": self.files_written,
+            "files_hashed": self.files_hashed,
+            "files_probed": self.files_probed,
+            "files_per_second": round(self.files_per_second, 1),
+            "parse_per_second": round(self.stage_rate("parse", self.files_parsed), 1),
+            "match_per_second": round(self.stage_rate("match", self.files_parsed), 1),
+            "db_writes": self.db_writes,
+            "db_write_avg_ms": round(self.db_write_avg_ms, 1),
+            "db_write_max_ms": round(self.db_write_max_seconds * 1000, 1),
+            "elapsed_seconds": round(self.elapsed_seconds, 2),
+            # Kopie, da der Scan-Thread die Laufzeiten weiter fortschreibt
+            "timings": {name: round(seconds, 3) for name, seconds in list(self.timings.items())},
+        }
+
+
+class ScanJob:
+    """Ein im Hintergrund laufender Scan eines Medienverzeichnisses."""
+
+    def __init__(self, media_dir: str, create_missing: bool, workers: int = 1, hash_mode: Optional[str] = None,
+                 probe_media: Optional[bool] = None, dry_run: bool = False, root_id: Optional[int] = None,
+                 root_name: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.media_dir = media_dir
+        # Medienwurzel, falls der Scan für eine konfigurierte Wurzel läuft
+        self.root_id = root_id
+        self.root_name = root_name
+        self.create_missing = create_missing
+        self.workers = workers
+        self.hash_mode = hash_mode
+        self.probe_media = probe_media
+        self.dry_run = dry_run
+        self.status = "queued"  # queued, running, completed, cancelled, failed
+        self.error: Optional[str] = None
+        self.progress = ScanProgress()
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        # Vorschlagsindex für die nicht zugeordneten Dateien (Stand, Index), siehe candidate_index
+        self._candidates: Optional[Tuple[Hashable, Any]] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "cancelled", "failed")
+
+    def candidate_index(self, version: Hashable, build: Callable[[], Any]) -> Any:
+        """
+        Liefert den Vorschlagsindex für die nicht zugeordneten Dateien des Jobs.
+
+        Der Index wird nur neu gebaut, wenn der Job seitdem beendet wurde oder sich
+        der Titelbestand (z.B. durch Aliase) geändert hat.
+
+        Args:
+            version: Kennung des Titelbestands (catalog_version)
+            build: Baut den Index
+        """
+        key = (self.finished, version)
+        cached = self._candidates
+        if cached is None or cached[0] != key:
+            cached = self._candidates = (key, build())
+        return cached[1]
+
+    def as_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "media_dir": self.media_dir,
+            "root_id": self.root_id,
+            "root_name": self.root_name,
+            "create_missing": self.create_missing,
+            "workers": self.workers,
+            "hash_mode": self.hash_mode,
+            "probe_media": self.probe_media,
+            "dry_run": self.dry_run,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "progress": self.progress.as_dict(),
+            "summary": self.progress.summary.as_dict(),
+        }
+
+    def results(self) -> dict:
+        """Teilergebnisse: bisher zugeordnete Animes und eine Stichprobe nicht zugeordneter Dateien."""
+        unmatched = self.progress.unmatched_files
+        results = {
+            "job_id": self.id,
+            "status": self.status,
+            "summary": self.progress.summary.as_dict(),
+            "matched_anime_ids": sorted(i for i in self.progress.matched_anime_ids if i > 0),
+            "unmatched_files": unmatched[:UNMATCHED_SAMPLE_SIZE],
+            "unmatched_total": len(unmatched),
+        }
+        if self.progress.plan is not None:
+            results["plan"] = self.progress.plan.as_dict()
+        return results
+
+
+def _overlaps(path_a: str, path_b: str) -> bool:
+    """Prüft, ob zwei Verzeichnisse identisch sind oder eines im anderen liegt."""
+    return (path_a == path_b
+            or path_a.startswith(path_b.rstrip(os.sep) + os.sep)
+            or path_b.startswith(path_a.rstrip(os.sep) + os.sep))
+
+
+class ScanJobManager:
+    """Verwaltet Scan-Jobs im Speicher des API-Prozesses."""
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, ScanJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, media_dir: str, create_missing: bool, run: Callable[[ScanJob], ScanSummary],
+               workers: int = 1, hash_mode: Optional[str] = None,
+               probe_media: Optional[bool] = None, dry_run: bool = False,
+               root_id: Optional[int] = None, root_name: Optional[str] = None) -> ScanJob:
+        """
+        Startet einen Scan im Hintergrund.
+
+        Args:
+            media_dir: Das zu scannende Verzeichnis
+            create_missing: Wird an scan_and_update durchgereicht
+            run: Führt den Scan für den Job aus und liefert die Zusammenfassung
+            workers: Anzahl der Parser-Prozesse
+            hash_mode: Optionaler Hash-Modus ("partial" oder "full")
+            probe_media: Container-Header auslesen (None: Standard aus den Settings)
+            dry_run: Nur einen Plan erstellen, nichts schreiben
+            root_id: ID der Medienwurzel, falls der Scan für eine konfigurierte Wurzel läuft
+            root_name: Name der Medienwurzel
+
+        Raises:
+            ScanAlreadyRunningError: wenn für das Verzeichnis bereits ein Scan läuft
+        """
+        media_dir = os.path.realpath(media_dir)
+        with self._lock:
+            for job in self._jobs.values():
+                if not job.finished and _overlaps(job.media_dir, media_dir):
+                    raise ScanAlreadyRunningError(job)
+            job = ScanJob(media_dir, create_missing, workers, hash_mode, probe_media, dry_run, root_id, root_name)
+            self._jobs[job.id] = job
+            self._prune()
+
+        thread = threading.Thread(target=self._run, args=(job, run), name=f"scan-{job.id[:8]}", daemon=True)
+        thread.start()
+        return job
+
+    def _run(self, job: ScanJob, run: Callable[[ScanJob], ScanSummary]) -> None:
+        job.status = "running"
+        logger.info("Scan-Job %s gestartet für %s", job.id, job.media_dir)
+        try:
+            job.progress.summary = run(job)
+            job.status = "cancelled" if job.progress.cancelled else "completed"
+        except Exception as e:
+            logger.exception("Scan-Job %s fehlgeschlagen", job.id)
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.progress.finished_at = time.monotonic()
+            job.finished_at = datetime.now()
+            logger.info("Scan-Job %s beendet mit Status %s", job.id, job.status)
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[ScanJob]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[ScanJob]:
+        return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[ScanJob]:
+        job = self._jobs.get(job_id)
+        if job and not job.finished:
+            job.progress.cancel()
+        return job
+
+
+# Globale Instanz für den API-Prozess
+scan_jobs = ScanJobManager()
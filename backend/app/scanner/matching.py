@@ -0,0 +1,150 @@
+"""
+Zuordnung geparster Titel zu Animes anhand einer Momentaufnahme der Titel.
+
+Die Momentaufnahme wird zu Beginn eines Scans einmal aus der Datenbank geladen
+(nur Spalten, keine ORM-Objekte, inklusive der Aliase aus title_aliases) und
+anschließend nur im Speicher befragt.
+
+Hat eine Staffel einen eigenen Eintrag (z.B. "Vinland Saga Season 2"), wird sie
+über match_season diesem Eintrag zugeordnet; sonst zählt die Staffel als Teil
+des Animes mit dem Basistitel.
+"""
+
+import os
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .titles import normalize_title
+
+logger = logging.getLogger(__name__)
+
+# Namensformen eigenständiger Einträge für eine Staffel (normalisiert), z.B. "vinland saga season 2"
+SEASON_NAME_FORMATS = ("{title} season {season}", "{title} {season}", "{title} s{season}",
+                       "{title} {season}{suffix} season", "{title} staffel {season}")
+
+
+class TitleEntry(NamedTuple):
+    anime_id: int
+    titel_de: str
+    normalized: str
+    tokens: frozenset
+
+
+class TitleSnapshot:
+    """Titel, Synonyme und Aliase aller Animes in einer für das Matching aufbereiteten Form."""
+
+    def __init__(self, rows: Iterable[Tuple[int, str, Optional[str], Optional[str]]] = (),
+                 aliases: Iterable[Tuple[str, int]] = ()):
+        """
+        Args:
+            rows: Tupel (id, titel_de, synonyme, local_path), z.B. aus einer Spaltenabfrage
+            aliases: Tupel (normalisierter Alias, anime_id) aus der Tabelle title_aliases
+        """
+        self._entries: List[TitleEntry] = []
+        self._titles: Dict[int, str] = {}
+        self._ids_by_path: Dict[str, int] = {}
+        # Normalisierter Titel, Synonym oder Alias -> Anime-ID (ein Dictionary-Zugriff pro Datei)
+        self._ids_by_name: Dict[str, int] = {}
+        # Namen für die Teilstring-Suche: (normalisierter Titel oder Alias, Anime-ID)
+        self._substring_names: List[Tuple[str, int]] = []
+        for anime_id, titel_de, synonyme, local_path in rows:
+            self.add(anime_id, titel_de, synonyme, local_path)
+        for alias, anime_id in aliases:
+            self.add_alias(alias, anime_id)
+
+    def add(self, anime_id: int, titel_de: str, synonyme: Optional[str] = None,
+            local_path: Optional[str] = None) -> None:
+        """Nimmt einen (z.B. während des Scans angelegten) Anime in die Momentaufnahme auf."""
+        normalized = normalize_title(titel_de)
+        self._entries.append(TitleEntry(anime_id, titel_de, normalized, frozenset(normalized.split())))
+        self._titles[anime_id] = titel_de
+        if normalized:
+            self._substring_names.append((normalized, anime_id))
+            self._ids_by_name.setdefault(normalized, anime_id)
+        if synonyme:
+            for synonym in synonyme.split(','):
+                synonym_normalized = normalize_title(synonym.strip())
+                if synonym_normalized:
+                    self._ids_by_name.setdefault(synonym_normalized, anime_id)
+        if local_path:
+            self._ids_by_path.setdefault(local_path, anime_id)
+
+    def add_alias(self, alias: str, anime_id: int) -> None:
+        """Registriert einen Alias; Aliase haben Vorrang vor gleichlautenden Titeln."""
+        alias = normalize_title(alias)
+        if alias:
+            self._ids_by_name[alias] = anime_id
+            self._substring_names.append((alias, anime_id))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def title_of(self, anime_id: int) -> Optional[str]:
+        return self._titles.get(anime_id)
+
+    def match_path(self, path: str) -> Optional[int]:
+        """Liefert die ID des Animes mit genau diesem lokalen Verzeichnis."""
+        return self._ids_by_path.get(path)
+
+    def match_season(self, normalized_title: str, season: int) -> Optional[int]:
+        """
+        Sucht einen eigenständigen Anime für eine Staffel (exakter Treffer auf Titel,
+        Synonym oder Alias in einer der SEASON_NAME_FORMATS).
+        
+        Args:
+            normalized_title: Der normalisierte Titel ohne Staffelangabe
+            season: Die Staffel (größer als 1)
+            
+        Returns:
+            Die Anime-ID oder None
+        """
+        suffix = {1: "st", 2: "nd", 3: "rd"}.get(season if season < 20 else season % 10, "th")
+        for name_format in SEASON_NAME_FORMATS:
+            anime_id = self._ids_by_name.get(name_format.format(title=normalized_title, season=season, suffix=suffix))
+            if anime_id is not None:
+                logger.info("Eintrag für Staffel %s gefunden: '%s' -> '%s'", season, normalized_title,
+                            self._titles.get(anime_id))
+                return anime_id
+        return None
+
+    def match(self, title: str, normalized_title: Optional[str] = None) -> Optional[int]:
+        """
+        Sucht den passenden Anime für einen Titel.
+
+        1. Exakter Treffer auf Titel, Synonym oder Alias (ein Dictionary-Zugriff)
+        2. Teilstring in beide Richtungen (Titel und Aliase)
+        3. Token-Überlappung, nur für kurze Titel bzw. Verzeichnisnamen
+
+        Args:
+            title: Der geparste Titel
+            normalized_title: Bereits normalisierter Titel, falls vorhanden
+
+        Returns:
+            Die Anime-ID oder None
+        """
+        if not title:
+            return None
+        if normalized_title is None:
+            normalized_title = normalize_title(title)
+
+        anime_id = self._ids_by_name.get(normalized_title)
+        if anime_id is not None:
+            logger.info("Exakte Übereinstimmung gefunden: '%s' -> '%s'", title, self._titles.get(anime_id))
+            return anime_id
+
+        for name, anime_id in self._substring_names:
+            if normalized_title in name or name in normalized_title:
+                logger.info("Teilstring-Übereinstimmung gefunden: '%s' -> '%s'", title, self._titles.get(anime_id))
+                return anime_id
+
+        if os.path.sep in title or title.count(' ') < 3:
+            input_tokens = set(normalized_title.split())
+            for entry in self._entries:
+                common_tokens = entry.tokens & input_tokens
+                if common_tokens and (len(common_tokens) / len(entry.tokens) > 0.5 or
+                                      len(common_tokens) / len(input_tokens) > 0.5):
+                    logger.info("Token-Übereinstimmung gefunden: '%s' -> '%s'", title, entry.titel_de)
+                    return entry.anime_id
+
+        logger.warning("Kein passender Anime für '%s' gefunden", title)
+        return None
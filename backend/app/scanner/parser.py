@@ -0,0 +1,183 @@
+"""
+Dateinamen-Parser für lokale Anime-Dateien.
+
+Alle Regex-Patterns werden einmalig beim Import kompiliert. Ein Aufruf von
+parse_filename() extrahiert Titel, Episode, Staffel, Release-Gruppe, Version
+sowie Auflösung, Codec und Audioformat und liefert ein kompaktes ParsedFile.
+"""
+
+import os
+import re
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Patterns auf dem Basisnamen, in der Reihenfolge ihrer Priorität.
+# Die TV-Formate stehen vor dem Ziffern-Pattern, damit "S01E04...h264" nicht als Episode 264 endet.
+BASENAME_PATTERNS = tuple(re.compile(p) for p in (
+    # [Gruppe] Anime Name - Episode [Qualität] (Qualität).Erweiterung
+    r'\[(?P<group>[^\]]+)\]\s*(?P<title>[^-]+)-\s*(?P<episode>\d+)(?:\s*v\d+)?(?:\s*[\[(][^\])]*[\])])*\..+',
+    # Anime Name - Episode [Qualität].Erweiterung
+    r'(?P<title>[^-]+)-\s*(?P<episode>\d+)(?:\s*v\d+)?(?:\s*[\[(][^\])]*[\])])*\..+',
+    # Anime.Name.S01E01.Info.Erweiterung (TV-Format mit Punkten)
+    r'(?P<title>.*?)\.S(?P<season>\d+)E(?P<episode>\d+)\..*?\.[a-zA-Z0-9]+$',
+    # Anime Name S01E01.Erweiterung (TV-Format mit Leerzeichen)
+    r'(?P<title>.*?)\sS(?P<season>\d+)E(?P<episode>\d+)\.[a-zA-Z0-9]+$',
+    # Anime Name EpisodeErweiterung (ohne Trennzeichen)
+    r'(?P<title>.*?)(?P<episode>\d{2,3})(?:v\d+)?\.[a-zA-Z0-9]+$',
+))
+
+# Pattern auf dem vollen Pfad: Anime Name/Season 01/EpisodeX.Erweiterung (auch "Staffel 1")
+PATH_PATTERN = re.compile(
+    r'.*?/(?P<title>.*?)/(?:Season|Staffel)\s+(?P<season>\d+)/.*?(?P<episode>\d+).*\.[a-zA-Z0-9]+$'
+)
+
+# Hilfspatterns für das Parsen über den Verzeichnisnamen
+TV_EPISODE_PATTERN = re.compile(r'S(\d+)E(\d{1,3})')
+TV_TITLE_PATTERN = re.compile(r'(.*?)\.S(\d+)E(\d+)')
+BARE_NUMBER_PATTERN = re.compile(r'[^0-9](\d{1,3})[^0-9]')
+GROUP_PATTERN = re.compile(r'^\[([^\]]+)\]')
+VERSION_PATTERN = re.compile(r'\d\s*v(\d+)\b')
+SEASON_DIR_PATTERN = re.compile(r'(?:season|staffel)\s*(\d+)', re.IGNORECASE)
+# Staffel am Ende des Titels: "Title S2", "Title Season 2", "Title 2nd Season"
+TITLE_SEASON_PATTERN = re.compile(
+    r'^(?P<title>.+?)\s+(?:S(?P<short>\d{1,2})|(?i:season)\s*(?P<long>\d{1,2})'
+    r'|(?P<ordinal>\d{1,2})(?i:st|nd|rd|th)\s+(?i:season))$'
+)
+
+# Alle Metadaten-Token in einer Alternation, damit ein einziger Durchlauf genügt
+METADATA_PATTERN = re.compile(
+    r'(?P<resolution>2160p|1080p|720p|480p|4K)'
+    r'|(?P<codec>x264|x265|h264|h265|AVC|HEVC)'
+    r'|(?P<audio>AC3|DTS|AAC|FLAC|TrueHD)'
+)
+
+
+class ParsedFile:
+    """Ergebnis von parse_filename() für eine einzelne Datei."""
+
+    __slots__ = ('title', 'episode', 'season', 'group', 'version',
+                 'resolution', 'codec', 'audio')
+
+    def __init__(self, title: str, episode: int, season: Optional[int] = None,
+                 group: Optional[str] = None, version: Optional[int] = None,
+                 resolution: Optional[str] = None, codec: Optional[str] = None,
+                 audio: Optional[str] = None):
+        self.title = title
+        self.episode = episode
+        self.season = season
+        self.group = group
+        self.version = version
+        self.resolution = resolution
+        self.codec = codec
+        self.audio = audio
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ParsedFile):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"ParsedFile({fields})"
+
+
+def _int_or_none(value: Optional[str]) -> Optional[int]:
+    return int(value) if value is not None else None
+
+
+def _clean_title(title: str) -> str:
+    return title.strip().replace('.', ' ')
+
+
+def _scan_metadata(path: str, result: ParsedFile) -> None:
+    """Setzt Auflösung, Codec und Audioformat; der erste Treffer je Feld gewinnt."""
+    for match in METADATA_PATTERN.finditer(path):
+        field = match.lastgroup
+        if getattr(result, field) is None:
+            setattr(result, field, match.group(field))
+
+
+def _match_structure(filename: str, basename: str):
+    """
+    Ermittelt Titel, Episode und Staffel.
+
+    Returns:
+        Tuple (title, episode, season, group) oder None
+    """
+    # Spezialfall: Anime-Titel aus dem übergeordneten Verzeichnis
+    # (für Dateien, die in einem Verzeichnis mit dem Anime-Namen liegen)
+    anime_dir = os.path.basename(os.path.dirname(os.path.dirname(filename)))
+    if anime_dir and anime_dir != "Anime":
+        match = TV_EPISODE_PATTERN.search(basename)
+        if match:
+            return anime_dir, int(match.group(2)), int(match.group(1)), None
+        match = BARE_NUMBER_PATTERN.search(basename)
+        if match:
+            season_match = SEASON_DIR_PATTERN.search(os.path.basename(os.path.dirname(filename)))
+            season = int(season_match.group(1)) if season_match else None
+            return anime_dir, int(match.group(1)), season, None
+
+    # Pattern auf dem vollen Pfad (Verzeichnisstruktur-basiertes Matching)
+    match = PATH_PATTERN.match(filename)
+    if match:
+        return (_clean_title(match.group('title')), int(match.group('episode')),
+                int(match.group('season')), None)
+
+    # Restliche Patterns auf dem Basisnamen
+    for pattern in BASENAME_PATTERNS:
+        match = pattern.match(basename)
+        if match:
+            groups = match.groupdict()
+            return (_clean_title(groups['title']), int(groups['episode']),
+                    _int_or_none(groups.get('season')), groups.get('group'))
+
+    # TV-Format, das keines der Patterns getroffen hat
+    match = TV_TITLE_PATTERN.match(basename)
+    if match:
+        return _clean_title(match.group(1)), int(match.group(3)), int(match.group(2)), None
+
+    return None
+
+
+def parse_filename(filename: str) -> Optional[ParsedFile]:
+    """
+    Extrahiert Titel, Episode und Release-Metadaten aus einem Dateipfad.
+
+    Args:
+        filename: Der zu parsende Dateipfad
+
+    Returns:
+        Ein ParsedFile oder None, wenn das Parsing fehlschlägt
+    """
+    basename = os.path.basename(filename)
+    structure = _match_structure(filename, basename)
+    if structure is None:
+        logger.warning("Konnte Datei nicht parsen: %s", basename)
+        return None
+
+    title, episode, season, group = structure
+    if season is None:
+        season_match = TITLE_SEASON_PATTERN.match(title)
+        if season_match:
+            title = season_match.group('title')
+            season = int(season_match.group('short') or season_match.group('long') or season_match.group('ordinal'))
+    if group is None:
+        group_match = GROUP_PATTERN.match(basename)
+        if group_match:
+            group = group_match.group(1)
+    version_match = VERSION_PATTERN.search(basename)
+
+    result = ParsedFile(
+        title=title,
+        episode=episode,
+        season=season,
+        group=group,
+        version=int(version_match.group(1)) if version_match else None,
+    )
+    _scan_metadata(filename, result)
+    return result
@@ -0,0 +1,154 @@
+"""
+Mehrstufige Scan-Pipeline für große Mediatheken.
+
+Der Walker liefert Dateipfade als Generator, ein Prozess-Pool parst und
+normalisiert sie in Batches, und der Aufrufer (scan_and_update) übernimmt als
+einzige Writer-Stufe das Matching und die Datenbank-Schreibzugriffe.
+"""
+
+import os
+import re
+import logging
+import fnmatch
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Pattern, Tuple
+
+from .parser import ParsedFile, parse_filename
+from .titles import normalize_title
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXTENSIONS = ('mkv', 'mp4', 'avi')
+
+# Ergebnis je Datei: (Pfad, geparste Daten oder None, normalisierter Titel oder None)
+ParsedEntry = Tuple[str, Optional[ParsedFile], Optional[str]]
+
+
+def _compile_globs(patterns: Optional[Iterable[str]]) -> Optional[Pattern]:
+    """Fasst Glob-Patterns (fnmatch-Syntax) zu einem einzigen Regex zusammen."""
+    patterns = [p for p in (patterns or ()) if p]
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{fnmatch.translate(p)})' for p in patterns))
+
+
+class PathFilter:
+    """
+    Auswahl der Mediendateien eines Verzeichnisses: Dateiendungen sowie Include- und
+    Exclude-Globs, jeweils relativ zum gescannten Verzeichnis (z.B. "*/Extras/*").
+
+    Ein Exclude-Glob, der auf ein Verzeichnis passt (z.B. "Extras"), schließt den
+    gesamten Teilbaum aus; der Walker betritt ihn gar nicht erst.
+    """
+
+    def __init__(self, extensions: Optional[Iterable[str]] = None, include: Optional[Iterable[str]] = None,
+                 exclude: Optional[Iterable[str]] = None):
+        self.extensions = frozenset(e.lower().lstrip('.') for e in (extensions or DEFAULT_EXTENSIONS))
+        self._include = _compile_globs(include)
+        self._exclude = _compile_globs(exclude)
+
+    def accepts_dir(self, rel_dir: str) -> bool:
+        """Ob der Walker ein Unterverzeichnis betreten soll."""
+        return self._exclude is None or not self._exclude.match(rel_dir)
+
+    def accepts(self, rel_path: str) -> bool:
+        """Ob eine Datei (Pfad relativ zum gescannten Verzeichnis) zum Scan gehört."""
+        if rel_path.rsplit('.', 1)[-1].lower() not in self.extensions:
+            return False
+        if self._exclude is not None:
+            if self._exclude.match(rel_path):
+                return False
+            # Dateien in ausgeschlossenen Verzeichnissen
+            index = rel_path.find('/')
+            while index != -1:
+                if self._exclude.match(rel_path[:index]):
+                    return False
+                index = rel_path.find('/', index + 1)
+        return self._include is None or self._include.match(rel_path) is not None
+
+
+def iter_media_files(directory: str, extensions: Optional[Iterable[str]] = None,
+                     path_filter: Optional[PathFilter] = None) -> Iterator[str]:
+    """
+    Walker-Stufe: liefert alle Mediendateien unterhalb von directory.
+
+    Args:
+        directory: Das zu durchsuchende Verzeichnis
+        extensions: Zu suchende Dateiendungen (ohne Punkt), falls kein path_filter angegeben ist
+        path_filter: Optionale Auswahl über Dateiendungen und Globs
+    """
+    if path_filter is None:
+        extensions = frozenset(extensions or DEFAULT_EXTENSIONS)
+        for root, _, files in os.walk(directory):
+            for file in files:
+                if file.rsplit('.', 1)[-1].lower() in extensions:
+                    yield os.path.join(root, file)
+        return
+
+    prefix_length = len(os.path.join(directory, ''))
+    for root, dirs, files in os.walk(directory):
+        rel_root = root[prefix_length:].replace(os.sep, '/')
+        rel_prefix = f"{rel_root}/" if rel_root else ""
+        dirs[:] = [d for d in dirs if path_filter.accepts_dir(rel_prefix + d)]
+        for file in files:
+            if path_filter.accepts(rel_prefix + file):
+                yield os.path.join(root, file)
+
+
+def parse_batch(paths: List[str]) -> List[ParsedEntry]:
+    """
+    Parst und normalisiert einen Batch von Pfaden.
+
+    Läuft in den Worker-Prozessen und darf daher nur reine CPU-Arbeit enthalten.
+    """
+    results = []
+    for path in paths:
+        parsed = parse_filename(path)
+        normalized = normalize_title(parsed.title) if parsed and parsed.title else None
+        results.append((path, parsed, normalized))
+    return results
+
+
+def _batched(paths: Iterable[str], size: int) -> Iterator[List[str]]:
+    batch = []
+    for path in paths:
+        batch.append(path)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_parsed_batches(paths: Iterable[str], batch_size: int, workers: int = 1) -> Iterator[List[ParsedEntry]]:
+    """
+    Parser-Stufe: verteilt die Pfade in Batches auf einen Prozess-Pool.
+
+    Es sind höchstens zwei Batches pro Worker gleichzeitig unterwegs, damit der
+    Speicherbedarf auch bei sehr großen Bibliotheken begrenzt bleibt. Die
+    Ergebnisse werden in der Reihenfolge des Walkers geliefert.
+
+    Args:
+        paths: Dateipfade, typischerweise aus iter_media_files()
+        batch_size: Anzahl der Pfade pro Batch
+        workers: Anzahl der Worker-Prozesse; bei 1 wird im aktuellen Prozess geparst
+    """
+    batches = _batched(paths, batch_size)
+    if workers <= 1:
+        for batch in batches:
+            yield parse_batch(batch)
+        return
+
+    logger.info("Starte Parser-Pool mit %d Prozessen", workers)
+    # Kein fork: der Pool entsteht im Thread eines Scan-Jobs, während andere Threads
+    # (Scheduler, Prefetcher, HTTP-Pools) Locks halten können, z.B. den Logging-Lock
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver")) as pool:
+        in_flight = deque()
+        for batch in batches:
+            in_flight.append(pool.submit(parse_batch, batch))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
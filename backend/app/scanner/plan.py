@@ -0,0 +1,105 @@
+"""
+Ergebnis eines Probelaufs (dry run) von scan_and_update.
+
+Der Plan hält nur kompakte Daten (IDs, Titel, Episodennummern, Pfade) und keine
+ORM-Objekte, damit auch Probeläufe über 100.000 Dateien wenig Speicher brauchen.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set, Tuple
+
+# Maximale Anzahl Pfade je Liste (verschoben, verschwunden, nicht zugeordnet) in as_dict()
+PLAN_SAMPLE_SIZE = 1000
+
+
+def _by_season(episodes: Set[Tuple[int, int]]) -> Dict[str, List[int]]:
+    """Gruppiert (staffel, episode) für die Ausgabe, z.B. {"1": [1, 2], "2": [1]}."""
+    grouped: Dict[str, List[int]] = {}
+    for season, episode in sorted(episodes):
+        grouped.setdefault(str(season), []).append(episode)
+    return grouped
+
+
+class ScanPlan:
+    """Was ein Scan anlegen und ändern würde, inklusive Laufzeit je Stufe."""
+
+    def __init__(self, timings: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            timings: Optionales Dictionary für die Laufzeiten, z.B. das des ScanProgress,
+                damit Fortschritt und Plan dieselben Werte zeigen
+        """
+        self.timings: Dict[str, float] = timings if timings is not None else {}
+        self.moved: List[Tuple[str, str]] = []
+        self.vanished: List[str] = []
+        self.unmatched: List[str] = []
+        # Bereits verplante (anime_id, staffel, episode) über alle Chunks hinweg
+        self.seen_episodes: Set[Tuple[int, int, int]] = set()
+        self._creates: Dict[int, dict] = {}
+        self._updates: Dict[int, dict] = {}
+        self._started_at = time.perf_counter()
+        self._finished_at: Optional[float] = None
+
+    def finish(self) -> None:
+        self._finished_at = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Misst die Laufzeit einer Stufe; mehrere Abschnitte einer Stufe werden addiert."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def plan_anime(self, titel_de: str, local_path: str) -> int:
+        """Verplant einen neuen Anime und liefert eine vorläufige (negative) ID."""
+        anime_id = -(len(self._creates) + 1)
+        self._creates[anime_id] = {"titel_de": titel_de, "local_path": local_path, "episodes": set()}
+        return anime_id
+
+    def add_episode(self, anime_id: int, titel_de: Optional[str], season: int, episode_number: int,
+                    action: str) -> None:
+        """
+        Verplant eine Episode.
+
+        Args:
+            anime_id: ID eines vorhandenen oder vorläufige ID eines verplanten Animes
+            titel_de: Titel des Animes (für die Ausgabe)
+            season: Die Staffel
+            episode_number: Die Episodennummer innerhalb der Staffel
+            action: "inserted" oder "updated"
+        """
+        if anime_id < 0:
+            self._creates[anime_id]["episodes"].add((season, episode_number))
+            return
+        entry = self._updates.get(anime_id)
+        if entry is None:
+            entry = self._updates[anime_id] = {"titel_de": titel_de, "inserted": set(), "updated": set()}
+        entry[action].add((season, episode_number))
+
+    def as_dict(self, summary: Optional[dict] = None, sample_size: int = PLAN_SAMPLE_SIZE) -> dict:
+        timings = {name: round(seconds, 3) for name, seconds in self.timings.items()}
+        end = self._finished_at if self._finished_at is not None else time.perf_counter()
+        timings["total"] = round(end - self._started_at, 3)
+        # Kopien, da ein laufender Scan-Thread den Plan weiter befüllt
+        creates = list(self._creates.values())
+        updates = sorted(self._updates.items())
+        return {
+            "summary": summary,
+            "timings": timings,
+            "creates": [
+                {"titel_de": entry["titel_de"], "local_path": entry["local_path"],
+                 "episodes": _by_season(entry["episodes"])}
+                for entry in creates
+            ],
+            "updates": [
+                {"anime_id": anime_id, "titel_de": entry["titel_de"],
+                 "inserted": _by_season(entry["inserted"]), "updated": _by_season(entry["updated"])}
+                for anime_id, entry in updates
+            ],
+            "moved": [{"from": old, "to": new} for old, new in self.moved[:sample_size]],
+            "vanished": self.vanished[:sample_size],
+            "unmatched": self.unmatched[:sample_size],
+        }
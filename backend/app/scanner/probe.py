@@ -0,0 +1,370 @@
+"""
+Auslesen der Stream-Eigenschaften (Auflösung, Video-Codec, Audio-Format) aus den
+Container-Headern von Matroska- (MKV/WebM) und MP4-Dateien.
+
+Es werden nur die Header-Strukturen gelesen; große Elemente wie Cluster, mdat oder
+Anhänge werden per seek übersprungen. Es gibt keine Abhängigkeit zu ffprobe/mediainfo
+und kein Dekodieren.
+"""
+
+import os
+import struct
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Obergrenze für Elemente, die komplett in den Speicher gelesen werden (Tracks, moov)
+MAX_HEADER_BYTES = 64 * 1024 * 1024
+
+# Anzahl der Top-Level-Elemente, nach denen die Suche abgebrochen wird
+MAX_TOP_LEVEL_ELEMENTS = 256
+
+# Matroska-Element-IDs (inklusive Marker-Bits)
+EBML_HEADER = 0x1A45DFA3
+MKV_SEGMENT = 0x18538067
+MKV_CLUSTER = 0x1F43B675
+MKV_TRACKS = 0x1654AE6B
+MKV_TRACK_ENTRY = 0xAE
+MKV_TRACK_TYPE = 0x83
+MKV_CODEC_ID = 0x86
+MKV_FLAG_DEFAULT = 0x88
+MKV_VIDEO = 0xE0
+MKV_AUDIO = 0xE1
+MKV_PIXEL_WIDTH = 0xB0
+MKV_PIXEL_HEIGHT = 0xBA
+MKV_CHANNELS = 0x9F
+
+MKV_VIDEO_CODECS = {
+    'V_MPEGH/ISO/HEVC': 'HEVC',
+    'V_MPEG4/ISO/AVC': 'AVC',
+    'V_AV1': 'AV1',
+    'V_VP9': 'VP9',
+    'V_VP8': 'VP8',
+    'V_MPEG4/ISO/ASP': 'MPEG-4',
+    'V_MPEG4/ISO/SP': 'MPEG-4',
+    'V_MS/VFW/FOURCC': 'VFW',
+    'V_MPEG2': 'MPEG-2',
+}
+
+MKV_AUDIO_CODECS = {
+    'A_AAC': 'AAC',
+    'A_FLAC': 'FLAC',
+    'A_OPUS': 'Opus',
+    'A_VORBIS': 'Vorbis',
+    'A_AC3': 'AC3',
+    'A_EAC3': 'EAC3',
+    'A_DTS': 'DTS',
+    'A_TRUEHD': 'TrueHD',
+    'A_MPEG/L3': 'MP3',
+    'A_MPEG/L2': 'MP2',
+    'A_PCM/INT/LIT': 'PCM',
+}
+
+MP4_VIDEO_CODECS = {
+    b'avc1': 'AVC', b'avc3': 'AVC',
+    b'hvc1': 'HEVC', b'hev1': 'HEVC',
+    b'av01': 'AV1',
+    b'vp09': 'VP9',
+    b'mp4v': 'MPEG-4',
+}
+
+MP4_AUDIO_CODECS = {
+    b'mp4a': 'AAC',
+    b'ac-3': 'AC3',
+    b'ec-3': 'EAC3',
+    b'Opus': 'Opus',
+    b'fLaC': 'FLAC',
+    b'dtsc': 'DTS', b'dtsh': 'DTS', b'dtsl': 'DTS',
+    b'.mp3': 'MP3',
+}
+
+# Container-Boxen, in die beim Suchen der Sample-Beschreibungen abgestiegen wird
+MP4_CONTAINER_BOXES = {b'trak', b'mdia', b'minf', b'stbl'}
+
+
+class MediaInfo:
+    """Stream-Eigenschaften einer Datei; Felder sind None, wenn nicht ermittelbar."""
+
+    __slots__ = ('width', 'height', 'video_codec', 'audio_codec', 'audio_channels')
+
+    def __init__(self, width: Optional[int] = None, height: Optional[int] = None,
+                 video_codec: Optional[str] = None, audio_codec: Optional[str] = None,
+                 audio_channels: Optional[int] = None):
+        self.width = width
+        self.height = height
+        self.video_codec = video_codec
+        self.audio_codec = audio_codec
+        self.audio_channels = audio_channels
+
+    @property
+    def resolution(self) -> Optional[str]:
+        """Auflösung in der Schreibweise der Dateinamen (z.B. "1080p")."""
+        if not self.width or not self.height:
+            return None
+        # Breite berücksichtigen, damit z.B. 1920x800 (Cinemascope) als 1080p gilt
+        if self.width >= 3800 or self.height >= 2100:
+            return '2160p'
+        if self.width >= 1900 or self.height >= 1060:
+            return '1080p'
+        if self.width >= 1260 or self.height >= 700:
+            return '720p'
+        return f"{self.height}p"
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"MediaInfo({fields})"
+
+
+# --- Matroska ---
+
+def _read_vint(data: bytes, pos: int, keep_marker: bool) -> Tuple[Optional[int], int]:
+    """Liest eine EBML-Ganzzahl variabler Länge; liefert (Wert, neue Position)."""
+    first = data[pos]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8 or pos + length > len(data):
+        raise ValueError("Ungültige EBML-Längenangabe")
+    value = first if keep_marker else first & (mask - 1)
+    for byte in data[pos + 1:pos + length]:
+        value = (value << 8) | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        # Alle Bits gesetzt: unbekannte Größe
+        value = None
+    return value, pos + length
+
+
+def _read_element_header(f) -> Optional[Tuple[int, Optional[int]]]:
+    """Liest ID und Größe des nächsten Elements direkt aus der Datei."""
+    head = f.read(12)
+    if len(head) < 2:
+        return None
+    element_id, pos = _read_vint(head, 0, keep_marker=True)
+    size, pos = _read_vint(head, pos, keep_marker=False)
+    f.seek(pos - len(head), os.SEEK_CUR)
+    return element_id, size
+
+
+def _iter_elements(data: bytes):
+    """Iteriert über die direkten Kindelemente eines im Speicher liegenden Elements."""
+    pos = 0
+    while pos < len(data):
+        element_id, pos = _read_vint(data, pos, keep_marker=True)
+        size, pos = _read_vint(data, pos, keep_marker=False)
+        if size is None:
+            size = len(data) - pos
+        yield element_id, data[pos:pos + size]
+        pos += size
+
+
+def _uint(payload: bytes) -> int:
+    return int.from_bytes(payload, 'big')
+
+
+def _parse_mkv_tracks(data: bytes) -> MediaInfo:
+    info = MediaInfo()
+    audio_default = False
+    for element_id, entry in _iter_elements(data):
+        if element_id != MKV_TRACK_ENTRY:
+            continue
+        track_type = codec_id = None
+        is_default = True
+        width = height = channels = None
+        for child_id, payload in _iter_elements(entry):
+            if child_id == MKV_TRACK_TYPE:
+                track_type = _uint(payload)
+            elif child_id == MKV_CODEC_ID:
+                codec_id = payload.rstrip(b'\x00').decode('ascii', 'replace')
+            elif child_id == MKV_FLAG_DEFAULT:
+                is_default = bool(_uint(payload))
+            elif child_id == MKV_VIDEO:
+                for video_id, value in _iter_elements(payload):
+                    if video_id == MKV_PIXEL_WIDTH:
+                        width = _uint(value)
+                    elif video_id == MKV_PIXEL_HEIGHT:
+                        height = _uint(value)
+            elif child_id == MKV_AUDIO:
+                for audio_id, value in _iter_elements(payload):
+                    if audio_id == MKV_CHANNELS:
+                        channels = _uint(value)
+
+        if track_type == 1 and info.video_codec is None and codec_id:
+            info.video_codec = MKV_VIDEO_CODECS.get(codec_id, codec_id[2:][:20])
+            info.width, info.height = width, height
+        elif track_type == 2 and codec_id and (info.audio_codec is None or (is_default and not audio_default)):
+            # Die erste Standard-Tonspur gewinnt, sonst die erste Tonspur
+            codec = next((name for prefix, name in MKV_AUDIO_CODECS.items() if codec_id.startswith(prefix)), None)
+            info.audio_codec = codec or codec_id[2:][:20]
+            info.audio_channels = channels
+            audio_default = is_default
+    return info
+
+
+def probe_matroska(f) -> Optional[MediaInfo]:
+    """Liest die Track-Informationen einer Matroska-Datei."""
+    header = _read_element_header(f)
+    if not header or header[0] != EBML_HEADER or header[1] is None:
+        return None
+    f.seek(header[1], os.SEEK_CUR)
+
+    header = _read_element_header(f)
+    if not header or header[0] != MKV_SEGMENT:
+        return None
+
+    for _ in range(MAX_TOP_LEVEL_ELEMENTS):
+        header = _read_element_header(f)
+        if not header:
+            break
+        element_id, size = header
+        if element_id == MKV_TRACKS:
+            if size is None or size > MAX_HEADER_BYTES:
+                return None
+            return _parse_mkv_tracks(f.read(size))
+        if element_id == MKV_CLUSTER or size is None:
+            # Die Track-Beschreibung steht immer vor den Clustern
+            break
+        f.seek(size, os.SEEK_CUR)
+    return None
+
+
+# --- MP4 / ISO BMFF ---
+
+def _iter_boxes(data: bytes):
+    """Iteriert über die Boxen eines im Speicher liegenden Box-Inhalts."""
+    pos = 0
+    while pos + 8 <= len(data):
+        size, box_type = struct.unpack_from('>I4s', data, pos)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from('>Q', data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = len(data) - pos
+        if size < header:
+            break
+        yield box_type, data[pos + header:pos + size]
+        pos += size
+
+
+def _parse_mp4_track(trak: bytes, info: MediaInfo) -> None:
+    handler = None
+    sample_entries: List[Tuple[bytes, bytes]] = []
+
+    def walk(data: bytes) -> None:
+        nonlocal handler
+        for box_type, payload in _iter_boxes(data):
+            if box_type in MP4_CONTAINER_BOXES:
+                walk(payload)
+            elif box_type == b'hdlr' and len(payload) >= 12:
+                handler = payload[8:12]
+            elif box_type == b'stsd' and len(payload) >= 8:
+                # version/flags (4) + entry_count (4), danach die Sample-Einträge als Boxen
+                sample_entries.extend(_iter_boxes(payload[8:]))
+
+    walk(trak)
+    for box_type, entry in sample_entries:
+        if handler == b'vide' and info.video_codec is None:
+            info.video_codec = MP4_VIDEO_CODECS.get(box_type, box_type.decode('ascii', 'replace').strip())
+            if len(entry) >= 28:
+                info.width, info.height = struct.unpack_from('>HH', entry, 24)
+        elif handler == b'soun' and info.audio_codec is None:
+            info.audio_codec = MP4_AUDIO_CODECS.get(box_type, box_type.decode('ascii', 'replace').strip())
+            if len(entry) >= 18:
+                info.audio_channels = struct.unpack_from('>H', entry, 16)[0]
+
+
+def probe_mp4(f) -> Optional[MediaInfo]:
+    """Liest die Sample-Beschreibungen aus der moov-Box einer MP4-Datei."""
+    for _ in range(MAX_TOP_LEVEL_ELEMENTS):
+        head = f.read(8)
+        if len(head) < 8:
+            break
+        size, box_type = struct.unpack('>I4s', head)
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+            header = 16
+        elif size == 0:
+            # Box reicht bis zum Dateiende
+            size = os.fstat(f.fileno()).st_size - f.tell() + header
+        if size < header:
+            break
+        if box_type == b'moov':
+            if size - header > MAX_HEADER_BYTES:
+                return None
+            info = MediaInfo()
+            for child_type, payload in _iter_boxes(f.read(size - header)):
+                if child_type == b'trak':
+                    _parse_mp4_track(payload, info)
+            return info
+        # mdat und andere Boxen überspringen; moov kann auch am Dateiende stehen
+        f.seek(size - header, os.SEEK_CUR)
+    return None
+
+
+def probe_file(path: str) -> Optional[MediaInfo]:
+    """
+    Ermittelt die Stream-Eigenschaften einer Mediendatei aus ihren Container-Headern.
+
+    Args:
+        path: Pfad zur Datei
+
+    Returns:
+        MediaInfo oder None, wenn das Format nicht unterstützt oder der Header defekt ist
+
+    Raises:
+        OSError: wenn die Datei nicht gelesen werden kann
+    """
+    with open(path, 'rb') as f:
+        magic = f.read(8)
+        f.seek(0)
+        try:
+            if magic[:4] == b'\x1a\x45\xdf\xa3':
+                return probe_matroska(f)
+            if magic[4:8] in (b'ftyp', b'moov', b'free', b'skip', b'wide'):
+                return probe_mp4(f)
+        except (ValueError, struct.error, IndexError) as e:
+            logger.debug("Defekter Container-Header in %s: %s", path, e)
+    return None
+
+
+class MediaProber:
+    """Liest die Container-Header mehrerer Dateien parallel in einem Thread-Pool."""
+
+    def __init__(self, workers: int = 4):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prober")
+
+    def probe_many(self, paths: Iterable[str]) -> Dict[str, Optional[MediaInfo]]:
+        """
+        Liest alle Pfade. Nicht unterstützte Formate sind mit None im Ergebnis
+        enthalten, nicht lesbare Dateien fehlen.
+        """
+        paths = list(paths)
+        results = {}
+        for path, outcome in zip(paths, self._pool.map(self._safe_probe, paths)):
+            if outcome is not False:
+                results[path] = outcome
+        return results
+
+    def _safe_probe(self, path: str):
+        try:
+            return probe_file(path)
+        except OSError as e:
+            logger.warning("Container-Header konnte nicht gelesen werden: %s (%s)", path, e)
+            return False
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,135 @@
+"""
+Abgleich verschwundener und neu aufgetauchter Dateien eines Scans.
+
+Wird eine Mediathek umsortiert, verschwinden bekannte Pfade und neue tauchen auf.
+Die Zuordnung erfolgt mengenbasiert in drei Stufen:
+1. gleiche Inode und Größe (Verschieben/Umbenennen im selben Dateisystem)
+2. gleiche Größe und gleicher Inhalts-Hash, sofern ein Hash gespeichert ist
+3. gleiche Größe, wenn sie auf beiden Seiten eindeutig ist und die neue Datei
+   derselben Episode zugeordnet würde (Bestätigung durch den Aufrufer); sonst
+   gilt die alte Datei als verschwunden und die neue als neu
+"""
+
+import os
+import logging
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class KnownFile(NamedTuple):
+    """In der Datenbank gespeicherte Angaben zu einer verschwundenen Datei."""
+    path: str
+    inode: Optional[int]
+    size: Optional[int]
+    file_hash: Optional[str]
+    hash_mode: Optional[str]
+
+
+class FoundFile(NamedTuple):
+    """Inode und Größe einer neu aufgetauchten Datei."""
+    path: str
+    inode: int
+    size: int
+
+
+# Berechnet die Hashes mehrerer Dateien in einem Modus: (Pfade, Modus) -> {Pfad: Hash}
+HashFunction = Callable[[List[str], str], Dict[str, str]]
+
+# Bestätigt eine Zuordnung nur über die Größe: (alter Pfad, neuer Pfad) -> gleiche Episode?
+ConfirmFunction = Callable[[str, str], bool]
+
+
+def diff_manifest(known_paths: Iterable[str], manifest: Set[str]) -> Tuple[Set[str], Set[str]]:
+    """
+    Vergleicht die bekannten Pfade mit dem Manifest des aktuellen Scans.
+
+    Returns:
+        Tuple (verschwundene Pfade, neu aufgetauchte Pfade)
+    """
+    known = set(known_paths)
+    return known - manifest, manifest - known
+
+
+def stat_files(paths: Iterable[str]) -> Dict[str, FoundFile]:
+    """Ermittelt Inode und Größe; nicht lesbare Dateien fehlen im Ergebnis."""
+    found = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        found[path] = FoundFile(path, stat.st_ino, stat.st_size)
+    return found
+
+
+def match_moved_files(vanished: Dict[str, KnownFile], appeared: Dict[str, FoundFile],
+                      hash_files: Optional[HashFunction] = None,
+                      confirm: Optional[ConfirmFunction] = None) -> Dict[str, str]:
+    """
+    Ordnet verschwundene Dateien neu aufgetauchten zu.
+
+    Args:
+        vanished: Verschwundene Dateien nach altem Pfad
+        appeared: Neu aufgetauchte Dateien nach neuem Pfad
+        hash_files: Optional; berechnet Hashes der Kandidaten für den Vergleich mit
+            gespeicherten Hashes. Ohne diese Funktion entfällt Stufe 2.
+        confirm: Bestätigt Paare, die nur über die Größe gefunden wurden (Stufe 3);
+            None schaltet Stufe 3 ab
+
+    Returns:
+        Dictionary alter Pfad -> neuer Pfad
+    """
+    moves: Dict[str, str] = {}
+    remaining_new = dict(appeared)
+
+    # Stufe 1: Inode und Größe
+    by_inode = {(found.inode, found.size): path for path, found in remaining_new.items()}
+    for old_path, known in vanished.items():
+        if known.inode is None:
+            continue
+        new_path = by_inode.get((known.inode, known.size))
+        if new_path is not None and new_path in remaining_new:
+            moves[old_path] = new_path
+            del remaining_new[new_path]
+
+    # Übrige Dateien beider Seiten nach Größe gruppieren
+    old_by_size: Dict[int, List[KnownFile]] = {}
+    for old_path, known in vanished.items():
+        if old_path not in moves and known.size is not None:
+            old_by_size.setdefault(known.size, []).append(known)
+    new_by_size: Dict[int, List[str]] = {}
+    for new_path, found in remaining_new.items():
+        new_by_size.setdefault(found.size, []).append(new_path)
+    sizes = old_by_size.keys() & new_by_size.keys()
+
+    # Stufe 2: Inhalts-Hash bei gleicher Größe
+    if hash_files:
+        candidates_by_mode: Dict[str, Set[str]] = {}
+        for size in sizes:
+            for known in old_by_size[size]:
+                if known.file_hash and known.hash_mode:
+                    candidates_by_mode.setdefault(known.hash_mode, set()).update(new_by_size[size])
+        for mode, candidates in candidates_by_mode.items():
+            new_by_hash = {}
+            for path, file_hash in hash_files(sorted(candidates), mode).items():
+                new_by_hash.setdefault(file_hash, path)
+            for size in sizes:
+                for known in old_by_size[size]:
+                    if known.path in moves or known.hash_mode != mode:
+                        continue
+                    new_path = new_by_hash.get(known.file_hash)
+                    if new_path is not None and new_path in remaining_new:
+                        moves[known.path] = new_path
+                        del remaining_new[new_path]
+
+    # Stufe 3: eindeutige Größe auf beiden Seiten, bestätigt über den Dateinamen
+    for size in sizes if confirm else ():
+        old_left = [known for known in old_by_size[size] if known.path not in moves]
+        new_left = [path for path in new_by_size[size] if path in remaining_new]
+        if (len(old_left) == 1 and len(new_left) == 1 and not old_left[0].file_hash
+                and confirm(old_left[0].path, new_left[0])):
+            moves[old_left[0].path] = new_left[0]
+            del remaining_new[new_left[0]]
+
+    return moves
@@ -0,0 +1,151 @@
+"""
+Fortschrittsanzeige und maschinenlesbare Zusammenfassung für die Kommandozeile.
+
+Der ProgressReporter schreibt während eines Scans in festen Abständen eine
+Statuszeile mit Durchsatz, Parse- und Match-Rate sowie der Latenz der
+Schreibzugriffe. build_run_summary fasst einen oder mehrere Scans mit ihren
+Laufzeiten je Stufe als JSON zusammen, damit aufeinanderfolgende Läufe
+verglichen werden können.
+"""
+
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, Optional, TextIO
+
+from .jobs import ScanProgress
+
+# Version des JSON-Formats von build_run_summary
+RUN_SUMMARY_FORMAT = 1
+
+
+def format_progress(progress: ScanProgress, label: Optional[str] = None) -> str:
+    """
+    Formatiert den Fortschritt eines Scans als einzeilige Statusmeldung.
+
+    Args:
+        progress: Der Fortschritt des laufenden Scans
+        label: Optionale Bezeichnung, z.B. das Verzeichnis oder die Medienwurzel
+
+    Returns:
+        Die Statuszeile
+    """
+    parts = [f"[{label}]"] if label else []
+    parts.append(f"{progress.files_parsed}/{progress.files_walked} Dateien")
+    parts.append(f"{progress.files_per_second:.0f} Dateien/s")
+    parts.append(f"Parsen {progress.stage_rate('parse', progress.files_parsed):.0f}/s")
+    parts.append(f"Matching {progress.stage_rate('match', progress.files_parsed):.0f}/s")
+    if progress.db_writes:
+        parts.append(f"DB {progress.db_write_avg_ms:.1f} ms Ø / {progress.db_write_max_seconds * 1000:.1f} ms max")
+    if progress.files_hashed:
+        parts.append(f"{progress.files_hashed} gehasht")
+    if progress.files_probed:
+        parts.append(f"{progress.files_probed} ausgelesen")
+    parts.append(f"{progress.elapsed_seconds:.1f} s")
+    return " | ".join(parts)
+
+
+class ProgressReporter:
+    """
+    Gibt in einem Hintergrund-Thread regelmäßig den Fortschritt der laufenden Scans aus.
+
+    Auf einem Terminal wird bei einem einzelnen Scan die Zeile überschrieben, sonst
+    (mehrere parallele Scans, Ausgabe in eine Logdatei) jeweils eine neue Zeile
+    pro Scan geschrieben.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, interval: float = 2.0):
+        """
+        Args:
+            stream: Ziel der Ausgabe (Standard: sys.stderr)
+            interval: Abstand der Ausgaben in Sekunden
+        """
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self._runs: Dict[str, ScanProgress] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._tty = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self._line_open = False
+
+    def track(self, label: str, progress: ScanProgress) -> None:
+        """Nimmt einen (neu gestarteten) Scan in die Ausgabe auf; threadsicher."""
+        with self._lock:
+            self._runs[label] = progress
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="scan-progress", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Beendet die Ausgabe und schreibt den letzten Stand aller Scans."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._write(final=True)
+
+    def _loop(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self._write()
+
+    def _write(self, final: bool = False) -> None:
+        with self._lock:
+            runs = list(self._runs.items())
+        if not final:
+            # Abgeschlossene Scans nur einmal am Ende ausgeben
+            runs = [(label, progress) for label, progress in runs if progress.finished_at is None]
+        if not runs:
+            return
+        lines = [format_progress(progress, label if len(self._runs) > 1 else None) for label, progress in runs]
+        if self._tty and len(lines) == 1 and not final:
+            # Rest einer längeren vorherigen Zeile löschen
+            self.stream.write("\r\x1b[K" + lines[0])
+            self._line_open = True
+        else:
+            if self._line_open:
+                self.stream.write("\r\x1b[K")
+                self._line_open = False
+            self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+
+
+def build_run_summary(runs: Dict[str, ScanProgress], started_at: datetime, options: Optional[dict] = None) -> dict:
+    """
+    Fasst die Scans eines CLI-Aufrufs für den Vergleich mit früheren Läufen zusammen.
+
+    Args:
+        runs: Bezeichnung (Verzeichnis oder Medienwurzel) -> Fortschritt des Scans
+        started_at: Beginn des Aufrufs
+        options: Relevante Optionen des Aufrufs (Worker, Chunk-Größe, ...)
+
+    Returns:
+        Dictionary mit Optionen, Zählern, Raten und Laufzeiten je Stufe, pro Scan und gesamt
+    """
+    finished_at = datetime.now()
+    totals: Dict[str, int] = {}
+    timings: Dict[str, float] = {}
+    scans = {}
+    for label, progress in runs.items():
+        summary = progress.summary.as_dict()
+        for key, value in summary.items():
+            totals[key] = totals.get(key, 0) + value
+        for stage, seconds in progress.timings.items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+        scans[label] = {
+            "summary": summary,
+            "progress": progress.as_dict(),
+        }
+
+    elapsed = (finished_at - started_at).total_seconds()
+    return {
+        "format": RUN_SUMMARY_FORMAT,
+        "started_at": started_at.isoformat(),
+        "finished_at": finished_at.isoformat(),
+        "elapsed_seconds": round(elapsed, 3),
+        "options": options or {},
+        "totals": totals,
+        "files_per_second": round(totals.get("total_files", 0) / elapsed, 1) if elapsed > 0 else 0.0,
+        "timings": {stage: round(seconds, 3) for stage, seconds in timings.items()},
+        "scans": scans,
+    }
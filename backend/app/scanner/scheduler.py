@@ -0,0 +1,133 @@
+"""
+Zeitgesteuerte Scans der Medienwurzeln.
+
+Ein Hintergrund-Thread prüft in festen Abständen, welche aktivierten Wurzeln ihr
+Scan-Intervall überschritten haben, und startet für jede einen eigenen Scan-Job.
+Die Wurzeln laufen damit unabhängig voneinander: ein langsames Netzlaufwerk hält
+eine schnelle lokale Platte nicht auf. Je Wurzel läuft höchstens ein Scan, und
+insgesamt höchstens max_parallel Scans gleichzeitig; die Worker-Limits innerhalb
+eines Scans stellt jede Wurzel selbst ein (workers, io_workers).
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from .jobs import MediaRootUnavailableError, ScanAlreadyRunningError, ScanJob
+
+logger = logging.getLogger(__name__)
+
+
+def next_scan_at(root: Any) -> Optional[datetime]:
+    """Zeitpunkt des nächsten geplanten Scans einer Wurzel (None: nur manuell)."""
+    if not root.enabled or not root.scan_interval_minutes:
+        return None
+    if root.last_scan_at is None:
+        return datetime.min
+    return root.last_scan_at + timedelta(minutes=root.scan_interval_minutes)
+
+
+class MediaRootScheduler:
+    """Startet fällige Scans der Medienwurzeln in einem Hintergrund-Thread."""
+
+    def __init__(self, session_factory: Callable[[], Any], load_roots: Callable[[Any], List[Any]],
+                 start_scan: Callable[[Any, Any], ScanJob], tick_seconds: int = 60, max_parallel: int = 2):
+        """
+        Args:
+            session_factory: Erzeugt eine Datenbankverbindung (z.B. SessionLocal)
+            load_roots: Lädt die aktivierten Medienwurzeln über die Verbindung
+            start_scan: Startet den Scan-Job einer Wurzel: (db, root) -> ScanJob
+            tick_seconds: Abstand der Prüfungen in Sekunden
+            max_parallel: Höchstzahl gleichzeitig laufender geplanter Scans
+        """
+        self._session_factory = session_factory
+        self._load_roots = load_roots
+        self._start_scan = start_scan
+        self.tick_seconds = tick_seconds
+        self.max_parallel = max_parallel
+        self._jobs: Dict[int, ScanJob] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="media-root-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("Scan-Scheduler gestartet (Prüfung alle %s s, höchstens %s Wurzeln parallel)",
+                    self.tick_seconds, self.max_parallel)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_pending()
+            except Exception:
+                logger.exception("Fehler im Scan-Scheduler")
+            self._stop.wait(self.tick_seconds)
+
+    def active_jobs(self) -> Dict[int, ScanJob]:
+        """Laufende geplante Scans je Wurzel-ID."""
+        with self._lock:
+            self._jobs = {root_id: job for root_id, job in self._jobs.items() if not job.finished}
+            return dict(self._jobs)
+
+    def run_pending(self, now: Optional[datetime] = None) -> List[ScanJob]:
+        """
+        Startet die Scans aller fälligen Wurzeln (ein Durchlauf des Schedulers).
+
+        Returns:
+            Die gestarteten Jobs
+        """
+        now = now or datetime.now()
+        active = self.active_jobs()
+        started = []
+        db = self._session_factory()
+        try:
+            for root in self._load_roots(db):
+                if len(active) >= self.max_parallel:
+                    break
+                due_at = next_scan_at(root)
+                if root.id in active or due_at is None or due_at > now:
+                    continue
+                try:
+                    job = self._start_scan(db, root)
+                except ScanAlreadyRunningError as e:
+                    # z.B. ein manueller Scan desselben Verzeichnisses
+                    logger.info("Geplanter Scan von '%s' übersprungen: %s", root.name, e)
+                    continue
+                except MediaRootUnavailableError as e:
+                    # Status "unavailable" ist gespeichert; nächster Versuch nach dem Intervall
+                    logger.warning("Geplanter Scan von '%s' übersprungen: %s", root.name, e)
+                    continue
+                except Exception as e:
+                    logger.warning("Geplanter Scan von '%s' konnte nicht gestartet werden: %s", root.name, e)
+                    continue
+                active[root.id] = job
+                started.append(job)
+                logger.info("Geplanter Scan von '%s' gestartet (Job %s)", root.name, job.id)
+        finally:
+            db.close()
+        with self._lock:
+            self._jobs.update({job.root_id: job for job in started})
+        return started
+
+    def status(self) -> dict:
+        return {
+            "running": self.running,
+            "tick_seconds": self.tick_seconds,
+            "max_parallel": self.max_parallel,
+            "active_jobs": {root_id: job.id for root_id, job in self.active_jobs().items()},
+        }
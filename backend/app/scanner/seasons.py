@@ -0,0 +1,107 @@
+"""
+Staffeln und absolute Episodennummern.
+
+Eine Episode wird über (anime_id, staffel, episoden_nummer) identifiziert; die Nummer
+zählt innerhalb der Staffel. Die absolute Nummer ergibt sich aus der Summe der
+Längen aller vorherigen Staffeln, wobei als Länge einer Staffel ihre höchste
+bekannte Episodennummer gilt. Specials (Staffel 0) haben keine absolute Nummer.
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+# Staffel für Dateien und Episoden ohne Staffelangabe
+DEFAULT_SEASON = 1
+SPECIALS_SEASON = 0
+
+
+def season_offsets(lengths: Dict[int, int]) -> Dict[int, int]:
+    """
+    Berechnet, wie viele Episoden vor jeder regulären Staffel liegen.
+
+    Args:
+        lengths: Höchste Episodennummer je Staffel
+
+    Returns:
+        Dictionary Staffel -> Anzahl der Episoden aller vorherigen Staffeln
+    """
+    offsets = {}
+    total = 0
+    for season in sorted(s for s in lengths if s > SPECIALS_SEASON):
+        offsets[season] = total
+        total += lengths[season]
+    return offsets
+
+
+def assign_absolute_numbers(rows: Iterable[Tuple[int, int, int, int]]) -> Dict[int, Optional[int]]:
+    """
+    Ermittelt die absoluten Nummern aller übergebenen Episoden.
+
+    Args:
+        rows: Tupel (episode_id, anime_id, staffel, episoden_nummer); für ein korrektes
+            Ergebnis müssen alle Episoden der betroffenen Animes enthalten sein
+
+    Returns:
+        Dictionary episode_id -> absolute Nummer (None für Specials)
+    """
+    rows = list(rows)
+    lengths: Dict[int, Dict[int, int]] = {}
+    for _, anime_id, season, episode in rows:
+        anime_lengths = lengths.setdefault(anime_id, {})
+        if episode > anime_lengths.get(season, 0):
+            anime_lengths[season] = episode
+    offsets = {anime_id: season_offsets(anime_lengths) for anime_id, anime_lengths in lengths.items()}
+
+    numbers = {}
+    for episode_id, anime_id, season, episode in rows:
+        offset = offsets[anime_id].get(season)
+        numbers[episode_id] = offset + episode if offset is not None else None
+    return numbers
+
+
+class SeasonLayout:
+    """
+    Höchste bekannte Episodennummer je Anime und Staffel, einmal zu Beginn eines Scans geladen.
+
+    Dient dazu, Dateien ohne Staffelangabe (absolut nummeriert, z.B. "Frieren - 15.mkv")
+    der richtigen Staffel zuzuordnen, sofern für den Anime mehrere Staffeln bekannt sind.
+    Da die Länge einer Staffel auch aus solchen Dateien hervorgeht, liefern
+    wiederholte Scans dieselbe Zuordnung.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, int, int]] = ()):
+        """
+        Args:
+            rows: Tupel (anime_id, staffel, höchste episoden_nummer)
+        """
+        self._lengths: Dict[int, Dict[int, int]] = {}
+        for anime_id, season, max_episode in rows:
+            self._lengths.setdefault(anime_id, {})[season] = max_episode
+
+    def resolve(self, anime_id: int, season: Optional[int], episode: int) -> Tuple[int, int]:
+        """
+        Liefert Staffel und Episodennummer innerhalb der Staffel für eine Datei.
+
+        Args:
+            anime_id: Der zugeordnete Anime
+            season: Die geparste Staffel oder None
+            episode: Die geparste Episodennummer
+
+        Returns:
+            Tuple (staffel, episoden_nummer)
+        """
+        if season is not None:
+            return season, episode
+        lengths = self._lengths.get(anime_id)
+        if not lengths:
+            return DEFAULT_SEASON, episode
+        regular = sorted(s for s in lengths if s > SPECIALS_SEASON)
+        # Nur bei lückenlos bekannten Staffeln ab 1 ist die absolute Nummer eindeutig
+        if len(regular) < 2 or regular != list(range(1, len(regular) + 1)):
+            return DEFAULT_SEASON, episode
+
+        remaining = episode
+        for season in regular[:-1]:
+            if remaining <= lengths[season]:
+                return season, remaining
+            remaining -= lengths[season]
+        return regular[-1], remaining
@@ -0,0 +1,31 @@
+"""
+Zusammenfassung eines Scan-Durchlaufs von scan_and_update.
+"""
+
+from dataclasses import dataclass, asdict
+
+
+@dataclass
+class ScanSummary:
+    """Zähler eines Scans; wird nach jedem Chunk fortgeschrieben."""
+
+    total_files: int = 0
+    matched_animes: int = 0
+    created_animes: int = 0
+    inserted_episodes: int = 0
+    updated_episodes: int = 0
+    unchanged_episodes: int = 0
+    unmatched_files: int = 0
+    hashed_files: int = 0
+    unchanged_hashes: int = 0
+    probed_files: int = 0
+    unchanged_probes: int = 0
+    moved_files: int = 0
+    vanished_episodes: int = 0
+    committed_chunks: int = 0
+    failed_chunks: int = 0
+    # Dateien in zurückgerollten Chunks (weder geschrieben noch als nicht zugeordnet gezählt)
+    failed_files: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
@@ -0,0 +1,40 @@
+"""
+Titel-Normalisierung für den Abgleich lokaler Dateien mit der Datenbank.
+
+Alternative Titel werden nicht hier, sondern als Aliase in der Tabelle
+title_aliases gepflegt (siehe TitleSnapshot).
+"""
+
+import re
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Maximale Anzahl zwischengespeicherter Titel; ein Scan sieht meist nur wenige
+# tausend verschiedene Titel, auch wenn er hunderttausende Dateien verarbeitet.
+NORMALIZE_CACHE_SIZE = 65536
+
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_title(title: str) -> str:
+    """
+    Normalisiert einen Titel für den Vergleich (Kleinbuchstaben, keine Sonderzeichen).
+    
+    Das Ergebnis wird zwischengespeichert (normalize_title.cache_info() zeigt die Trefferquote).
+    
+    Args:
+        title: Der zu normalisierende Titel
+        
+    Returns:
+        Normalisierter Titel
+    """
+    if not title:
+        return ""
+    
+    # Zu Kleinbuchstaben konvertieren und Sonderzeichen entfernen
+    normalized = _SPECIAL_CHARS_RE.sub('', title.lower())
+    return _WHITESPACE_RE.sub(' ', normalized).strip()
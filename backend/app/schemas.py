@@ -1,5 +1,5 @@
 from pydantic import BaseModel, HttpUrl
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime, date
 from .models import AnimeStatus, EpisodeStatus
 
@@ -7,7 +7,8 @@ from .models import AnimeStatus, EpisodeStatus
 
 # Base schema for Episode data (common fields)
 class EpisodeBase(BaseModel):
-    episoden_nummer: int
+    staffel: int = 1  # 0 = Specials
+    episoden_nummer: int  # Nummer innerhalb der Staffel
     titel: Optional[str] = None
     status: EpisodeStatus = EpisodeStatus.missing
     air_date: Optional[date] = None
@@ -19,6 +20,7 @@ class EpisodeCreate(EpisodeBase):
 
 # Schema for updating an existing Episode (all fields optional)
 class EpisodeUpdate(BaseModel):
+    staffel: Optional[int] = None
     episoden_nummer: Optional[int] = None
     titel: Optional[str] = None
     status: Optional[EpisodeStatus] = None
@@ -29,6 +31,7 @@ class EpisodeUpdate(BaseModel):
 class Episode(EpisodeBase):
     id: int
     anime_id: int
+    absolute_nummer: Optional[int] = None
     hinzugefuegt_am: datetime
     zuletzt_aktualisiert_am: datetime
 
@@ -121,3 +124,85 @@ class AnimeRelation(AnimeRelationBase):
 class AnimeWithRelations(Anime):
     source_relations: List[AnimeRelation] = []
     target_relations: List[AnimeRelation] = []
+
+# --- Scan Schemas ---
+
+# Schema for submitting a background scan of a local media directory
+class ScanJobCreate(BaseModel):
+    media_dir: str
+    create_missing: bool = False
+    workers: int = 1
+    hash_mode: Optional[Literal["partial", "full"]] = None
+    probe_media: Optional[bool] = None
+    dry_run: bool = False
+
+# --- Duplikat-Schemas ---
+
+class DuplicateFile(BaseModel):
+    episode_id: int
+    anime_id: int
+    staffel: int
+    episoden_nummer: int
+    local_path: str
+    file_size: Optional[int] = None
+
+class DuplicateGroup(BaseModel):
+    file_hash: str
+    hash_mode: Optional[str] = None
+    files: List[DuplicateFile]
+
+# --- Titel-Aliase ---
+
+class TitleAliasCreate(BaseModel):
+    alias: str
+    anime_id: int
+
+class TitleAlias(TitleAliasCreate):
+    id: int
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# --- Medienwurzeln ---
+
+class MediaRootBase(BaseModel):
+    name: str
+    path: str
+    include_globs: Optional[List[str]] = None  # Globs relativ zu path, z.B. "*/Season */*"
+    exclude_globs: Optional[List[str]] = None  # z.B. "*/Extras/*"
+    extensions: Optional[List[str]] = None  # Standard: mkv, mp4, avi
+    scan_interval_minutes: Optional[int] = None  # None = nur manuell
+    workers: int = 1  # Parser-Prozesse
+    io_workers: Optional[int] = None  # Threads für Hashen/Auslesen
+    create_missing: bool = True
+    hash_mode: Optional[Literal["partial", "full"]] = None
+    probe_media: Optional[bool] = None
+    enabled: bool = True
+
+class MediaRootCreate(MediaRootBase):
+    pass
+
+class MediaRootUpdate(BaseModel):
+    name: Optional[str] = None
+    path: Optional[str] = None
+    include_globs: Optional[List[str]] = None
+    exclude_globs: Optional[List[str]] = None
+    extensions: Optional[List[str]] = None
+    scan_interval_minutes: Optional[int] = None
+    workers: Optional[int] = None
+    io_workers: Optional[int] = None
+    create_missing: Optional[bool] = None
+    hash_mode: Optional[Literal["partial", "full"]] = None
+    probe_media: Optional[bool] = None
+    enabled: Optional[bool] = None
+
+class MediaRoot(MediaRootBase):
+    id: int
+    last_scan_at: Optional[datetime] = None
+    last_scan_status: Optional[str] = None
+    last_job_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -14,10 +14,10 @@ from urllib.parse import urljoin, urlparse
 from datetime import datetime
 from typing import List, Dict, Optional, Any, Tuple
 import base64
-import os
 
 from .. import schemas
 from ..models import AnimeStatus
+from ..utils.http import get_random_user_agent
 from playwright.sync_api import sync_playwright, Error as PlaywrightError
 
 # Logger konfigurieren
@@ -28,18 +28,6 @@ logger = logging.getLogger(__name__)
 # Konstanten
 BASE_URL = "https://www.anime-loads.org"
 
-# Browser Headers - zufällige Auswahl für jede Anfrage
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Safari/605.1.15",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36",
-]
-
-def get_random_user_agent():
-    """Gibt einen zufälligen User-Agent zurück."""
-    return random.choice(USER_AGENTS)
-
 def get_page_content(url: str) -> Optional[BeautifulSoup]:
     """Fetches page content using Playwright and returns a BeautifulSoup object."""
     user_agent = get_random_user_agent()
@@ -100,273 +88,17 @@ def save_debug_screenshot(page, filename: str = "debug_screenshot.png"):
     except Exception as e:
         logger.error(f"Fehler beim Speichern des Screenshots: {e}")
 
-def download_image(url: str) -> Optional[bytes]:
-    """
-    Lädt ein Bild von einer URL herunter und gibt es als Binärdaten zurück.
-    Verwendet verschiedene Methoden, um DDoS-Schutzmaßnahmen zu umgehen.
-    
-    Args:
-        url: Die URL des Bildes
-        
-    Returns:
-        Binärdaten des Bildes oder None bei Fehler
-    """
-    try:
-        # Method 1: Use FlareSolverr proxy
-        flaresolverr_url = "http://localhost:8191/v1"
-        payload = {
-            "cmd": "request.get",
-            "url": url,
-            "maxTimeout": 60000
-        }
-        headers = {"Content-Type": "application/json"}
-        response = requests.post(flaresolverr_url, json=payload, headers=headers, timeout=60)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("status") == "ok":
-                image_url = data["solution"]["url"]
-                image_response = requests.get(image_url, timeout=10)
-                if image_response.status_code == 200:
-                    return image_response.content
-        logger.warning(f"FlareSolverr failed for {url}")
-    except Exception as e:
-        logger.error(f"Error using FlareSolverr for {url}: {str(e)}")
-
-    # Spezialmethode für anime-loads.org Bilder
-    if "anime-loads.org" in url and "/files/image/" in url:
-        try:
-            logger.info(f"Versuche spezielle Methode für anime-loads.org Bilder: {url}")
-            # Extrahiere den Bildnamen aus der URL
-            image_name = url.split('/')[-1]
-            referer_url = "https://www.anime-loads.org/"
-            
-            # 1. Methode: Versuche mit speziellen Headern
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
-                'Accept-Language': 'de,en-US;q=0.9,en;q=0.8',
-                'Referer': referer_url,
-                'Origin': 'https://www.anime-loads.org',
-                'Connection': 'keep-alive',
-                'Sec-Fetch-Dest': 'image',
-                'Sec-Fetch-Mode': 'no-cors',
-                'Sec-Fetch-Site': 'same-origin',
-                'Cache-Control': 'max-age=0',
-            }
-            
-            session = requests.Session()
-            # Besuche zuerst die Hauptseite, um Cookies zu setzen
-            main_page = session.get(referer_url, headers=headers, timeout=10)
-            if main_page.status_code == 200:
-                # Dann versuche das Bild zu holen
-                img_response = session.get(url, headers=headers, timeout=10)
-                if img_response.status_code == 200:
-                    logger.info(f"Spezielle Methode für anime-loads.org erfolgreich: {len(img_response.content)} Bytes")
-                    return img_response.content
-                    
-            # Versuch mit korrigierter URL (falls Bindestrich falsch ist)
-            corrected_url = url.replace("/w200-", "/w200/")
-            if corrected_url != url:
-                logger.info(f"Versuche mit korrigierter URL: {corrected_url}")
-                img_response = session.get(corrected_url, headers=headers, timeout=10)
-                if img_response.status_code == 200:
-                    logger.info(f"Spezielle Methode mit korrigierter URL erfolgreich: {len(img_response.content)} Bytes")
-                    return img_response.content
-        except Exception as e:
-            logger.error(f"Fehler bei spezieller anime-loads.org Methode: {str(e)}")
-            
-    # Versuch, das Bild aus der Anime-Detailseite zu extrahieren
-    if "anime-loads.org" in url:
-        try:
-            # Extrahiere die Anime-ID oder den Namen aus der URL
-            parts = url.split('/')
-            if len(parts) >= 5:
-                # Versuche die Anime-Detailseite aus dem Bildpfad abzuleiten
-                anime_id = None
-                for part in parts:
-                    if part.startswith("ore-dake") or "level-up" in part:
-                        anime_id = part
-                        break
-                
-                if anime_id:
-                    # Konstruiere die URL zur Anime-Detailseite
-                    anime_url = f"https://www.anime-loads.org/media/{anime_id}"
-                    logger.info(f"Versuche Anime-Detailseite zu laden: {anime_url}")
-                    
-                    # Verwende Playwright, um die Seite zu laden und einen Screenshot zu machen
-                    with sync_playwright() as p:
-                        browser = p.firefox.launch(headless=True)
-                        context = browser.new_context(
-                            user_agent=get_random_user_agent(),
-                            viewport={'width': 1366, 'height': 768}
-                        )
-                        page = context.new_page()
-                        
-                        try:
-                            # Cookies akzeptieren
-                            page.goto("https://www.anime-loads.org")
-                            page.wait_for_timeout(random.randint(2000, 4000))
-                            cookie_accept_button = page.query_selector("button.btn-primary")
-                            if cookie_accept_button:
-                                cookie_accept_button.click()
-                                logger.info("Clicked on cookie consent using selector: button.btn-primary")
-                                page.wait_for_timeout(random.randint(1000, 2000))
-                        except Exception as e:
-                            logger.warning(f"Error handling cookie banner: {e}")
-                        
-                        # Navigiere zur Anime-Seite
-                        response = page.goto(anime_url, wait_until="domcontentloaded", timeout=30000)
-                        
-                        if response.status == 200:
-                            # Warte auf das Laden der Seite
-                            page.wait_for_timeout(random.randint(3000, 5000))
-                            
-                            # Finde das Cover-Element
-                            cover_element = page.query_selector(".cover-image img, .anime-cover img, .cover img")
-                            if cover_element:
-                                # Mache einen Screenshot des Cover-Elements
-                                screenshot = cover_element.screenshot()
-                                browser.close()
-                                logger.info(f"Cover-Screenshot erfolgreich: {len(screenshot)} Bytes")
-                                return screenshot
-                        
-                        browser.close()
-        except Exception as e:
-            logger.error(f"Fehler beim Extrahieren des Cover-Bildes aus der Detailseite: {str(e)}")
-
-    # Fallback to previous methods if FlareSolverr fails
-    # Zuerst mit normalen HTTP-Anfragen versuchen
-    try:
-        logger.info(f"Lade Bild herunter (Methode 1 - Requests): {url}")
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:90.0) Gecko/20100101 Firefox/90.0',
-            'Referer': 'https://www.anime-loads.org/',
-            'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
-            'Accept-Language': 'de,en-US;q=0.7,en;q=0.3',
-            'Cache-Control': 'max-age=0',
-            'Connection': 'keep-alive',
-            'Sec-Fetch-Dest': 'image',
-            'Sec-Fetch-Mode': 'no-cors',
-            'Sec-Fetch-Site': 'same-origin',
-            'Pragma': 'no-cache',
-        }
-        
-        session = requests.Session()
-        # Zuerst die Hauptseite besuchen, um Cookies zu erhalten
-        session.get('https://www.anime-loads.org/', headers=headers, timeout=15)
-        
-        # Dann das Bild anfordern
-        response = session.get(url, headers=headers, timeout=15)
-        if response.status_code == 200:
-            logger.info(f"Bild erfolgreich heruntergeladen: {len(response.content)} Bytes")
-            return response.content
-        else:
-            logger.warning(f"Konnte Bild nicht mit Requests herunterladen: Status {response.status_code}")
-    except Exception as e:
-        logger.warning(f"Fehler bei Methode 1: {e}")
-    
-    # Wenn das fehlschlägt, versuche es mit Playwright
-    try:
-        logger.info(f"Lade Bild herunter (Methode 2 - Playwright): {url}")
-        with sync_playwright() as playwright:
-            browser = playwright.firefox.launch(headless=True)
-            context = browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:90.0) Gecko/20100101 Firefox/90.0'
-            )
-            page = context.new_page()
-            
-            # Besuche die Hauptseite
-            page.goto('https://www.anime-loads.org/', wait_until='domcontentloaded', timeout=30000)
-            
-            # Klicke den Cookie-Banner weg, falls vorhanden
-            try:
-                page.click('button.btn-primary', timeout=5000)
-                logger.info("Clicked on cookie consent using selector: button.btn-primary")
-            except Exception:
-                pass  # Ignoriere Fehler, wenn der Banner nicht existiert
-            
-            # Lade das Bild herunter
-            response = page.goto(url, wait_until='domcontentloaded', timeout=30000)
-            
-            if response and response.status == 200:
-                # Verwende Playwright, um den Binärinhalt zu erhalten
-                image_data = page.content()  # Dies ist nicht der richtige Ansatz für Bilder
-                
-                # Alternative Methode: Screenshot der Seite machen (funktioniert, aber nicht optimal)
-                buffer = page.screenshot(full_page=True)
-                
-                browser.close()
-                logger.info(f"Bild erfolgreich mit Playwright heruntergeladen")
-                return buffer  # Verwende das Screenshot als Fallback
-            
-            browser.close()
-            logger.warning(f"Konnte Bild nicht mit Playwright herunterladen")
-    except Exception as e:
-        logger.error(f"Fehler bei Methode 2: {e}")
-    
-    # Letzte Chance: Erstelle einen Screenshot des Bildes
-    try:
-        logger.info(f"Lade Bild herunter (Methode 3 - Screenshot): {url}")
-        with sync_playwright() as playwright:
-            browser = playwright.firefox.launch(headless=True)
-            context = browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:90.0) Gecko/20100101 Firefox/90.0'
-            )
-            
-            page = context.new_page()
-            
-            # Setze die Viewport-Größe groß genug für das Bild
-            page.set_viewport_size({"width": 1280, "height": 1024})
-            
-            # Besuche die Hauptseite und akzeptiere Cookies
-            page.goto('https://www.anime-loads.org/', wait_until='domcontentloaded', timeout=30000)
-            
-            # Klicke den Cookie-Banner weg, falls vorhanden
-            try:
-                page.click('button.btn-primary', timeout=5000)
-                logger.info("Clicked on cookie consent using selector: button.btn-primary")
-            except Exception:
-                pass
-            
-            # Besuche die Bildseite
-            response = page.goto(url, wait_until='domcontentloaded', timeout=30000)
-            
-            if response and response.status == 200:
-                # Mache einen Screenshot des Bildes
-                logger.info("Bild erfolgreich geladen, erstelle Screenshot")
-                screenshot = page.screenshot(full_page=True)
-                browser.close()
-                logger.info(f"Bild erfolgreich per Screenshot erfasst: {len(screenshot)} Bytes")
-                return screenshot
-            else:
-                browser.close()
-                logger.warning(f"Konnte Bild nicht laden: Status {response.status if response else 'unbekannt'}")
-    except Exception as e:
-        logger.error(f"Fehler bei Methode 3: {e}")
-    
-    # Fallback: Verwende ein lokales Standardbild als Platzhalter
-    try:
-        logger.warning(f"Alle Methoden zum Herunterladen des Bildes fehlgeschlagen, verwende Platzhalter")
-        placeholder_path = os.path.join(os.path.dirname(__file__), "..", "..", "static", "placeholder.jpg")
-        if os.path.exists(placeholder_path):
-            with open(placeholder_path, "rb") as f:
-                placeholder_data = f.read()
-                logger.info(f"Verwende Platzhalter-Bild: {len(placeholder_data)} Bytes")
-                return placeholder_data
-    except Exception as e:
-        logger.error(f"Fehler beim Lesen des Platzhalter-Bildes: {e}")
-    
-    logger.error(f"Alle Methoden zum Herunterladen des Bildes von {url} sind fehlgeschlagen")
-    return None
-
-def extract_anime_info(soup: BeautifulSoup, url: str, skip_cover_download: bool = False) -> Dict[str, Any]:
+def extract_anime_info(soup: BeautifulSoup, url: str) -> Dict[str, Any]:
     """
     Extrahiert Anime-Informationen aus einem BeautifulSoup-Objekt.
     
+    Das Cover wird dabei nicht heruntergeladen, "cover_image" enthält nur die URL.
+    Die Bilddaten lädt der Cover-Prefetcher (app.utils.cover_prefetch) im Hintergrund,
+    nachdem der Anime gespeichert wurde.
+    
     Args:
         soup: BeautifulSoup-Objekt mit dem HTML-Inhalt
         url: Original-URL der Anime-Seite
-        skip_cover_download: Wenn True, wird der Cover-Download übersprungen
         
     Returns:
         Dictionary mit Anime-Informationen
@@ -387,7 +119,6 @@ def extract_anime_info(soup: BeautifulSoup, url: str, skip_cover_download: bool
         "nebengenres": "",
         "tags": "",
         "cover_image": "Kein Bild",
-        "cover_image_data": None,
         "url": url,
         "anime_loads_id": url.split('/')[-1] if url else "",
         "anisearch_url": "",
@@ -455,7 +186,6 @@ def extract_anime_info(soup: BeautifulSoup, url: str, skip_cover_download: bool
         
         # Cover-Bild
         cover_url = None
-        cover_image_data = None
         
         # 1. Versuche, das Cover-Bild aus dem OpenGraph-Tag zu extrahieren
         og_image = soup.select_one('meta[property="og:image"]')
@@ -483,12 +213,7 @@ def extract_anime_info(soup: BeautifulSoup, url: str, skip_cover_download: bool
         if cover_url and not cover_url.startswith(('http://', 'https://')):
             cover_url = urljoin(BASE_URL, cover_url)
         
-        # Lade das Cover-Bild herunter, wenn eine URL gefunden wurde und das Überspringen nicht aktiviert ist
-        if cover_url and not skip_cover_download:
-            cover_image_data = download_image(cover_url)
-        
         anime_info["cover_image"] = cover_url
-        anime_info["cover_image_data"] = cover_image_data
         
         # Metadaten extrahieren (Typ, Jahr, Episoden, etc.)
         info_rows = soup.select('div.info-table tr') or soup.select('table.info-table tr')
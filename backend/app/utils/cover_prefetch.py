@@ -0,0 +1,265 @@
+"""
+Hintergrund-Prefetch der Cover.
+
+Statt beim ersten Aufruf einer Bibliotheksseite Dutzende Cover nacheinander über
+FlareSolverr/Playwright zu laden, füllt eine Warteschlange mit einer begrenzten
+Anzahl Worker-Threads den Cover-Cache (static/covers) für alle Animes mit
+cover_image_url, aber ohne cover_local_path. Gespeist wird sie von import_anime,
+den Scan-Endpunkten und beim Start der Anwendung. Fehlgeschlagene Downloads
+werden mit exponentiell wachsender Wartezeit wiederholt.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Anime
+from app.utils.covers import cache_cover, generate_variants
+from app.utils.image import hash_url
+from app.utils.image_cache import image_cache
+
+logger = logging.getLogger(__name__)
+
+# Anzahl endgültig fehlgeschlagener Animes, die im Status angezeigt werden
+MAX_FAILURES = 50
+
+
+class CoverPrefetcher:
+    """Warteschlange mit Worker-Threads, die Cover in den lokalen Cache laden."""
+
+    def __init__(self, session_factory: Callable[[], Session], workers: int = 2, max_attempts: int = 3,
+                 backoff_seconds: float = 30.0, max_queue: int = 10000):
+        """
+        Args:
+            session_factory: Erzeugt die Datenbankverbindungen der Worker
+            workers: Anzahl gleichzeitiger Downloads
+            max_attempts: Versuche je Cover, bevor es als fehlgeschlagen gilt
+            backoff_seconds: Wartezeit vor dem ersten erneuten Versuch; verdoppelt sich je Versuch
+            max_queue: Obergrenze der Warteschlange; weitere Animes werden verworfen
+        """
+        self.session_factory = session_factory
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_queue = max_queue
+        # Heap aus (frühester Zeitpunkt, Reihenfolge, anime_id, Versuch)
+        self._queue: List[Tuple[float, int, int, int]] = []
+        self._queued_ids = set()
+        self._in_progress = set()
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.completed = 0
+        self.skipped = 0
+        self.retried = 0
+        self.dropped = 0
+        self.failures: "OrderedDict[int, Dict]" = OrderedDict()
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"cover-prefetch-{i}", daemon=True)
+            for i in range(max(1, self.workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info("Cover-Prefetcher gestartet (%s Worker)", len(self._threads))
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def enqueue(self, anime_ids: Iterable[int]) -> int:
+        """
+        Reiht Animes ein; bereits wartende oder laufende werden übersprungen.
+
+        Ob ein Cover tatsächlich fehlt, prüft erst der Worker.
+
+        Returns:
+            Anzahl neu eingereihter Animes
+        """
+        added = 0
+        with self._condition:
+            for anime_id in anime_ids:
+                if anime_id is None or anime_id <= 0 or anime_id in self._queued_ids or anime_id in self._in_progress:
+                    continue
+                if len(self._queued_ids) >= self.max_queue:
+                    self.dropped += 1
+                    continue
+                self._push(anime_id, attempt=1, not_before=0.0)
+                self.failures.pop(anime_id, None)
+                added += 1
+            if added:
+                self._condition.notify_all()
+        return added
+
+    def enqueue_missing(self, db: Session, anime_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Reiht Animes mit Cover-URL, aber ohne lokales Cover ein.
+
+        Args:
+            db: Die Datenbankverbindung
+            anime_ids: Nur diese Animes berücksichtigen (z.B. die eines Scans); None = alle
+
+        Returns:
+            Anzahl neu eingereihter Animes
+        """
+        query = db.query(Anime.id).filter(
+            Anime.cover_image_url.isnot(None),
+            Anime.cover_image_url != "",
+            Anime.cover_local_path.is_(None),
+        ).order_by(Anime.id)
+        if anime_ids is None:
+            missing = [anime_id for (anime_id,) in query]
+        else:
+            # Nur die gewünschten Animes abfragen, in Blöcken wegen der Parametergrenze von SQLite
+            wanted = sorted(set(anime_ids))
+            size = settings.scan_chunk_size
+            missing = [
+                anime_id
+                for start in range(0, len(wanted), size)
+                for (anime_id,) in query.filter(Anime.id.in_(wanted[start:start + size]))
+            ]
+        return self.enqueue(missing)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wartet, bis Warteschlange und Worker leer sind (z.B. am Ende eines CLI-Imports)."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._condition:
+            while self._queue or self._in_progress:
+                if not self.running:
+                    return False
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def status(self) -> Dict:
+        with self._condition:
+            now = time.monotonic()
+            waiting = sum(1 for not_before, _, _, _ in self._queue if not_before > now)
+            return {
+                "running": self.running,
+                "workers": self.workers,
+                "queued": len(self._queue),
+                "waiting_for_retry": waiting,
+                "in_progress": sorted(self._in_progress),
+                "completed": self.completed,
+                "skipped": self.skipped,
+                "retried": self.retried,
+                "dropped": self.dropped,
+                "failed": len(self.failures),
+                "failures": list(self.failures.values()),
+            }
+
+    def _push(self, anime_id: int, attempt: int, not_before: float) -> None:
+        self._sequence += 1
+        heapq.heappush(self._queue, (not_before, self._sequence, anime_id, attempt))
+        self._queued_ids.add(anime_id)
+
+    def _next(self) -> Optional[Tuple[int, int]]:
+        """Wartet auf das nächste fällige Cover; None, wenn der Prefetcher beendet wird."""
+        with self._condition:
+            while not self._stop_event.is_set():
+                if self._queue:
+                    not_before, _, anime_id, attempt = self._queue[0]
+                    delay = not_before - time.monotonic()
+                    if delay <= 0:
+                        heapq.heappop(self._queue)
+                        self._queued_ids.discard(anime_id)
+                        self._in_progress.add(anime_id)
+                        return anime_id, attempt
+                    self._condition.wait(delay)
+                else:
+                    self._condition.wait()
+            return None
+
+    def _done(self, anime_id: int) -> None:
+        with self._condition:
+            self._in_progress.discard(anime_id)
+            self._condition.notify_all()
+
+    def _worker(self) -> None:
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            anime_id, attempt = item
+            try:
+                self._prefetch(anime_id, attempt)
+            finally:
+                self._done(anime_id)
+
+    def _prefetch(self, anime_id: int, attempt: int) -> None:
+        db = self.session_factory()
+        try:
+            anime = db.get(Anime, anime_id)
+            if anime is None or not anime.cover_image_url:
+                self.skipped += 1
+                return
+            # Nur überspringen, wenn das vorhandene Cover zur aktuellen URL gehört
+            cached_path = image_cache.path_for(hash_url(anime.cover_image_url))
+            if anime.cover_local_path == cached_path and image_cache.verify_file(cached_path):
+                self.skipped += 1
+                return
+            try:
+                path = cache_cover(db, anime)
+                error = None if path else "Cover konnte nicht geladen werden"
+            except Exception as e:
+                db.rollback()
+                path, error = None, str(e)
+            if path:
+                # Varianten gleich mit erzeugen, damit das Raster sofort kleine Bilder bekommt
+                generate_variants(path, hash_url(anime.cover_image_url))
+                self.completed += 1
+                logger.debug("Cover für Anime %s geladen: %s", anime_id, path)
+                return
+            self._retry_or_fail(anime_id, attempt, error)
+        finally:
+            db.close()
+
+    def _retry_or_fail(self, anime_id: int, attempt: int, error: str) -> None:
+        with self._condition:
+            if attempt < self.max_attempts:
+                delay = self.backoff_seconds * 2 ** (attempt - 1)
+                logger.info("Cover für Anime %s fehlgeschlagen (Versuch %s), neuer Versuch in %.0f s: %s",
+                            anime_id, attempt, delay, error)
+                self.retried += 1
+                self._push(anime_id, attempt + 1, time.monotonic() + delay)
+                self._condition.notify_all()
+                return
+            logger.warning("Cover für Anime %s nach %s Versuchen nicht geladen: %s", anime_id, attempt, error)
+            self.failures[anime_id] = {"anime_id": anime_id, "attempts": attempt, "error": error,
+                                       "failed_at": datetime.now().isoformat()}
+            while len(self.failures) > MAX_FAILURES:
+                self.failures.popitem(last=False)
+
+
+# Gemeinsamer Prefetcher der Anwendung (gestartet in main.py bzw. von import_anime)
+cover_prefetcher = CoverPrefetcher(
+    SessionLocal,
+    workers=settings.cover_prefetch_workers,
+    max_attempts=settings.cover_prefetch_max_attempts,
+    backoff_seconds=settings.cover_prefetch_backoff_seconds,
+    max_queue=settings.cover_prefetch_max_queue,
+)
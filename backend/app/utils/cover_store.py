@@ -0,0 +1,430 @@
+"""
+Aufräumen des Cover-Speichers (image_cache_dir).
+
+Ohne Aufräumen wächst static/covers unbegrenzt: Cover gelöschter Animes, alte
+Dateien nach einer geänderten cover_image_url, gespeicherte Platzhalter und Bilder
+des Bild-Proxys bleiben liegen. Ein Lauf von CoverStore.collect
+
+1. liest einmal das Verzeichnis (Originale und variants/) und fasst alle Dateien
+   eines Schlüssels (hash_url) zusammen,
+2. holt die referenzierten Schlüssel mit einer einzigen Abfrage über
+   animes.cover_local_path und animes.cover_image_url,
+3. löscht übrig gebliebene temporäre Dateien, gespeicherte Platzhalter,
+   nicht referenzierte Dateien nach einer Schonfrist und (optional) lange nicht
+   genutzte Cover,
+4. verdrängt bei Überschreiten der Obergrenze die am längsten nicht genutzten
+   Einträge: zuerst nicht referenzierte, dann Varianten (lassen sich ohne Download
+   neu erzeugen), zuletzt Originale.
+
+Der letzte Zugriff kommt aus dem Bild-Cache (seit dem Start der Anwendung) und
+sonst aus Zugriffs- bzw. Änderungszeit der Dateien. Werden Originale gelöscht, auf
+die ein Anime verweist, wird dessen cover_local_path mit einer Abfrage geleert;
+/api/cover lädt das Cover beim nächsten Abruf neu.
+"""
+
+import os
+import re
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Anime
+from app.utils.cover_prefetch import cover_prefetcher
+from app.utils.image import hash_url
+from app.utils.image_cache import ImageCache, image_cache
+
+logger = logging.getLogger(__name__)
+
+# Dateinamen der Originale ({hash_url}.png) und Varianten ({hash_url}_w{Breite}.{Endung})
+ORIGINAL_RE = re.compile(r"^([0-9a-f]{32})\.png$")
+VARIANT_RE = re.compile(r"^([0-9a-f]{32})_w\d+\.(?:avif|webp|jpg)$")
+
+# Temporäre Dateien, die länger liegen, stammen von abgebrochenen Schreibvorgängen
+TMP_MAX_AGE_SECONDS = 3600
+
+# Bei Überschreiten der Obergrenze wird bis auf diesen Anteil verdrängt
+LOW_WATER = 0.9
+
+# Maximale Anzahl Werte in einer IN-Liste (SQLite erlaubt je Abfrage nur begrenzt viele)
+IN_CHUNK = 500
+
+PLACEHOLDER_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "static", "placeholder.jpg")
+
+
+class CoverEntry:
+    """Alle Dateien eines Cover-Schlüssels."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.original: Optional[Tuple[str, int]] = None
+        self.variants: List[Tuple[str, int]] = []
+        self.file_time = 0.0
+
+    def add(self, path: str, stat: os.stat_result, is_variant: bool) -> None:
+        if is_variant:
+            self.variants.append((path, stat.st_size))
+        else:
+            self.original = (path, stat.st_size)
+        self.file_time = max(self.file_time, stat.st_mtime, stat.st_atime)
+
+    @property
+    def original_bytes(self) -> int:
+        return self.original[1] if self.original else 0
+
+    @property
+    def variant_bytes(self) -> int:
+        return sum(size for _, size in self.variants)
+
+    @property
+    def size(self) -> int:
+        return self.original_bytes + self.variant_bytes
+
+    @property
+    def files(self) -> int:
+        return len(self.variants) + (1 if self.original else 0)
+
+
+def _chunks(values: List[str], size: int = IN_CHUNK) -> Iterable[List[str]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class CoverStore:
+    """Größenbegrenzung, Verdrängung und Aufräumen des Cover-Speichers."""
+
+    def __init__(self, cache: ImageCache, session_factory: Callable[[], Session], max_bytes: int = 0,
+                 max_age_seconds: float = 0, orphan_grace_seconds: float = 86400,
+                 interval_seconds: float = 0):
+        """
+        Args:
+            cache: Der Bild-Cache, dessen Verzeichnis verwaltet wird
+            session_factory: Erzeugt die Datenbankverbindung der automatischen Läufe
+            max_bytes: Obergrenze für alle Dateien (0 = unbegrenzt)
+            max_age_seconds: Einträge ohne Zugriff seit dieser Zeit werden gelöscht (0 = aus)
+            orphan_grace_seconds: Nicht referenzierte Dateien bleiben so lange nach dem letzten Zugriff liegen
+            interval_seconds: Abstand der automatischen Läufe (0 = nur manuell)
+        """
+        self.cache = cache
+        self.session_factory = session_factory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.orphan_grace_seconds = orphan_grace_seconds
+        self.interval_seconds = interval_seconds
+        self._gc_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._placeholder: Optional[Tuple[int, str]] = None
+        self.runs = 0
+        self.last_run: Optional[Dict] = None
+
+    @property
+    def variants_dir(self) -> str:
+        return os.path.join(self.cache.directory, "variants")
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running or self.interval_seconds <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="cover-store-gc", daemon=True)
+        self._thread.start()
+        logger.info("Aufräumen des Cover-Speichers alle %.0f min gestartet", self.interval_seconds / 60)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                self.collect(db)
+            except Exception:
+                logger.exception("Fehler beim Aufräumen des Cover-Speichers")
+            finally:
+                db.close()
+            self._stop.wait(self.interval_seconds)
+
+    def scan(self) -> Tuple[Dict[str, CoverEntry], List[Tuple[str, int]]]:
+        """
+        Liest Originale und Varianten (blockierend).
+
+        Fremde Dateien im Verzeichnis werden nicht angefasst.
+
+        Returns:
+            Tuple (Einträge je Schlüssel, verwaiste temporäre Dateien als (Pfad, Größe))
+        """
+        entries: Dict[str, CoverEntry] = {}
+        stale_tmp = []
+        now = time.time()
+        for directory, pattern, is_variant in ((self.cache.directory, ORIGINAL_RE, False),
+                                               (self.variants_dir, VARIANT_RE, True)):
+            try:
+                items = os.scandir(directory)
+            except OSError:
+                continue
+            with items:
+                for item in items:
+                    try:
+                        if not item.is_file(follow_symlinks=False):
+                            continue
+                        stat = item.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if item.name.endswith(".tmp"):
+                        if now - stat.st_mtime > TMP_MAX_AGE_SECONDS:
+                            stale_tmp.append((item.path, stat.st_size))
+                        continue
+                    match = pattern.match(item.name)
+                    if match is None:
+                        continue
+                    key = match.group(1)
+                    entry = entries.get(key)
+                    if entry is None:
+                        entry = entries[key] = CoverEntry(key)
+                    entry.add(item.path, stat, is_variant)
+        return entries, stale_tmp
+
+    def last_access(self, entry: CoverEntry) -> float:
+        return max(self.cache.last_access(entry.key) or 0.0, entry.file_time)
+
+    def references(self, db: Session) -> Dict[str, List[Tuple[int, Optional[str]]]]:
+        """
+        Referenzierte Schlüssel mit einer Abfrage über alle Animes.
+
+        Referenziert ist die Datei in cover_local_path und die zur aktuellen
+        cover_image_url gehörende (auch wenn der Pfad noch nicht gespeichert ist).
+
+        Returns:
+            Dict Schlüssel -> Liste (anime_id, cover_local_path) der verweisenden Animes
+        """
+        referenced: Dict[str, List[Tuple[int, Optional[str]]]] = {}
+        rows = db.query(Anime.id, Anime.cover_local_path, Anime.cover_image_url).filter(
+            or_(Anime.cover_local_path.isnot(None), Anime.cover_image_url.isnot(None))
+        ).all()
+        for anime_id, local_path, cover_url in rows:
+            keys = set()
+            if local_path:
+                match = ORIGINAL_RE.match(os.path.basename(local_path))
+                if match:
+                    keys.add(match.group(1))
+            if cover_url:
+                keys.add(hash_url(cover_url))
+            for key in keys:
+                referenced.setdefault(key, []).append((anime_id, local_path))
+        return referenced
+
+    def _placeholder_signature(self) -> Optional[Tuple[int, str]]:
+        if self._placeholder is None:
+            try:
+                with open(PLACEHOLDER_PATH, "rb") as f:
+                    data = f.read()
+            except OSError:
+                return None
+            self._placeholder = (len(data), hashlib.sha256(data).hexdigest())
+        return self._placeholder
+
+    def _is_placeholder(self, entry: CoverEntry) -> bool:
+        """Gespeicherter Platzhalter statt eines Covers (Ersatzbild früherer Importe)."""
+        signature = self._placeholder_signature()
+        if signature is None or entry.original is None or entry.original_bytes != signature[0]:
+            return False
+        try:
+            with open(entry.original[0], "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest() == signature[1]
+        except OSError:
+            return False
+
+    def _remove(self, paths: Iterable[str]) -> int:
+        removed = 0
+        for path in paths:
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("Cover-Datei %s konnte nicht gelöscht werden: %s", path, e)
+        return removed
+
+    def _reset_cover_paths(self, db: Session, paths: Set[str]) -> int:
+        """Leert cover_local_path aller Animes, deren Datei gelöscht wurde (mengenbasiert)."""
+        reset = 0
+        for chunk in _chunks(sorted(paths)):
+            reset += db.query(Anime).filter(Anime.cover_local_path.in_(chunk)).update(
+                {Anime.cover_local_path: None}, synchronize_session=False)
+        db.commit()
+        return reset
+
+    def collect(self, db: Session, dry_run: bool = False) -> Dict:
+        """
+        Ein Aufräumlauf (blockierend); gleichzeitige Läufe warten aufeinander.
+
+        Args:
+            db: Die Datenbankverbindung
+            dry_run: Nur berechnen, was gelöscht würde
+
+        Returns:
+            Dict mit gelöschten Dateien und Bytes je Grund sowie Belegung vorher/nachher
+        """
+        with self._gc_lock:
+            started = time.monotonic()
+            now = time.time()
+            entries, stale_tmp = self.scan()
+            referenced = self.references(db)
+            bytes_before = sum(entry.size for entry in entries.values()) + sum(size for _, size in stale_tmp)
+            files_before = sum(entry.files for entry in entries.values()) + len(stale_tmp)
+
+            removed = {reason: {"files": 0, "bytes": 0}
+                       for reason in ("temp_files", "placeholders", "orphans", "expired", "evicted")}
+            # Zu löschende Dateien und Einträge, deren Original dabei wegfällt
+            doomed: List[str] = []
+            dropped_keys: Set[str] = set()
+            retry_ids: Set[int] = set()
+
+            def drop(entry: CoverEntry, reason: str, variants_only: bool = False) -> None:
+                files = list(entry.variants)
+                if not variants_only and entry.original:
+                    files.append(entry.original)
+                    dropped_keys.add(entry.key)
+                doomed.extend(path for path, _ in files)
+                removed[reason]["files"] += len(files)
+                removed[reason]["bytes"] += sum(size for _, size in files)
+
+            for path, size in stale_tmp:
+                doomed.append(path)
+                removed["temp_files"]["files"] += 1
+                removed["temp_files"]["bytes"] += size
+
+            remaining: List[CoverEntry] = []
+            for entry in entries.values():
+                idle = now - self.last_access(entry)
+                if self._is_placeholder(entry):
+                    drop(entry, "placeholders")
+                    # Das echte Cover erneut laden lassen
+                    retry_ids.update(anime_id for anime_id, _ in referenced.get(entry.key, []))
+                elif entry.key not in referenced:
+                    if idle > self.orphan_grace_seconds:
+                        drop(entry, "orphans")
+                    else:
+                        remaining.append(entry)
+                elif self.max_age_seconds and idle > self.max_age_seconds:
+                    drop(entry, "expired")
+                else:
+                    remaining.append(entry)
+
+            total = sum(entry.size for entry in remaining)
+            if self.max_bytes and total > self.max_bytes:
+                target = self.max_bytes * LOW_WATER
+                # Nicht referenzierte Einträge, dann Varianten, dann Originale; jeweils zuerst die ältesten
+                candidates = []
+                for entry in remaining:
+                    last_access = self.last_access(entry)
+                    if entry.key not in referenced:
+                        candidates.append((0, last_access, entry, False))
+                        continue
+                    if entry.variants:
+                        candidates.append((1, last_access, entry, True))
+                    if entry.original:
+                        candidates.append((2, last_access, entry, False))
+                candidates.sort(key=lambda candidate: (candidate[0], candidate[1]))
+                for _, _, entry, variants_only in candidates:
+                    if total <= target:
+                        break
+                    # Originale kommen erst nach allen Varianten an die Reihe (diese sind dann schon weg)
+                    size = entry.variant_bytes if variants_only else entry.size
+                    drop(entry, "evicted", variants_only=variants_only)
+                    if variants_only:
+                        entry.variants = []
+                    total -= size
+
+            reset_paths = {local_path for key in dropped_keys
+                           for _, local_path in referenced.get(key, []) if local_path}
+            reset = 0
+            if not dry_run:
+                self._remove(doomed)
+                for key in dropped_keys:
+                    self.cache.forget(key)
+                if reset_paths:
+                    reset = self._reset_cover_paths(db, reset_paths)
+                if retry_ids:
+                    cover_prefetcher.enqueue(sorted(retry_ids))
+
+            freed = sum(reason["bytes"] for reason in removed.values())
+            result = {
+                "dry_run": dry_run,
+                "finished_at": datetime.now().isoformat(),
+                "duration_seconds": round(time.monotonic() - started, 3),
+                "files_before": files_before,
+                "bytes_before": bytes_before,
+                "files_after": files_before - sum(reason["files"] for reason in removed.values()),
+                "bytes_after": bytes_before - freed,
+                "bytes_freed": freed,
+                "removed": removed,
+                "reset_cover_paths": reset if not dry_run else len(reset_paths),
+                "requeued": len(retry_ids),
+            }
+            if not dry_run:
+                self.runs += 1
+                self.last_run = result
+            if freed:
+                logger.info("Cover-Speicher aufgeräumt%s: %s Dateien, %.1f MB",
+                            " (Probelauf)" if dry_run else "",
+                            files_before - result["files_after"], freed / 1024 ** 2)
+            return result
+
+    def stats(self, db: Session) -> Dict:
+        """Belegung des Cover-Speichers, referenzierte/verwaiste Einträge und Trefferquote des Caches."""
+        entries, stale_tmp = self.scan()
+        referenced = self.references(db)
+        originals = [entry for entry in entries.values() if entry.original]
+        orphans = [entry for entry in entries.values() if entry.key not in referenced]
+        total = sum(entry.size for entry in entries.values()) + sum(size for _, size in stale_tmp)
+        return {
+            "directory": self.cache.directory,
+            "files": sum(entry.files for entry in entries.values()) + len(stale_tmp),
+            "bytes": total,
+            "max_bytes": self.max_bytes or None,
+            "usage": round(total / self.max_bytes, 3) if self.max_bytes else None,
+            "originals": {"files": len(originals), "bytes": sum(entry.original_bytes for entry in originals)},
+            "variants": {
+                "files": sum(len(entry.variants) for entry in entries.values()),
+                "bytes": sum(entry.variant_bytes for entry in entries.values()),
+            },
+            "temp_files": {"files": len(stale_tmp), "bytes": sum(size for _, size in stale_tmp)},
+            "referenced_covers": sum(1 for entry in entries.values() if entry.key in referenced),
+            "orphans": {"entries": len(orphans), "bytes": sum(entry.size for entry in orphans)},
+            "max_age_seconds": self.max_age_seconds or None,
+            "orphan_grace_seconds": self.orphan_grace_seconds,
+            "gc": {
+                "running": self.running,
+                "interval_seconds": self.interval_seconds or None,
+                "runs": self.runs,
+                "last_run": self.last_run,
+            },
+            "cache": self.cache.stats(),
+        }
+
+
+# Gemeinsamer Cover-Speicher der Anwendung (gestartet in main.py)
+cover_store = CoverStore(
+    image_cache,
+    SessionLocal,
+    max_bytes=settings.cover_store_max_bytes,
+    max_age_seconds=settings.cover_store_max_age_days * 86400,
+    orphan_grace_seconds=settings.cover_store_orphan_grace_hours * 3600,
+    interval_seconds=settings.cover_store_gc_interval_minutes * 60,
+)
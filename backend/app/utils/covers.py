@@ -0,0 +1,267 @@
+"""
+Größenvarianten der Cover mit Auswahl des Formats über den Accept-Header.
+
+Das Original eines Covers wird einmal dekodiert und daraus alle konfigurierten
+Breiten in allen verfügbaren Formaten (AVIF, WebP, JPEG) erzeugt und unter
+static/covers/variants abgelegt. Eine Anfrage mit w= bekommt die kleinste
+Variante, die mindestens so breit ist, im besten Format, das der Browser
+akzeptiert. Auch übergroße Originale (z.B. Screenshots früherer Download-Methoden)
+werden dabei auf Cover-Größe gebracht. cache_cover lädt das Original selbst in
+den Bild-Cache (genutzt von /api/cover und dem Cover-Prefetcher).
+
+describe_cover liefert für /api/covers/batch ohne Download versionierte URLs und
+ETags, damit ein Raster mit vielen Karten alle Cover mit einer Anfrage auflöst.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Anime
+from app.utils.image import guess_image_type, hash_url
+from app.utils.image_cache import image_cache
+from app.utils.image_fetch import image_fetcher
+from app.utils.singleflight import SingleFlight
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow fehlt: es wird immer das Original ausgeliefert
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Format -> (Pillow-Format, Dateiendung, Content-Type, Encoder-Optionen); Reihenfolge = Vorrang
+FORMATS = {
+    "avif": ("AVIF", "avif", "image/avif", {"quality": 55}),
+    "webp": ("WEBP", "webp", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "jpg", "image/jpeg", {"quality": 85, "optimize": True, "progressive": True}),
+}
+
+# Verhindert, dass zwei Anfragen dieselben Varianten gleichzeitig erzeugen;
+# Anfragen für verschiedene Cover laufen parallel
+_generation = SingleFlight()
+
+
+def available_formats() -> List[str]:
+    """Formate, die das installierte Pillow schreiben kann (in der Reihenfolge des Vorrangs)."""
+    if Image is None:
+        return []
+    return [name for name in FORMATS if name == "jpeg" or features.check(name)]
+
+
+def variant_width(requested: int, widths: Optional[List[int]] = None) -> int:
+    """Kleinste konfigurierte Breite, die mindestens der angefragten entspricht (sonst die größte)."""
+    widths = sorted(widths or settings.cover_variant_widths)
+    for width in widths:
+        if width >= requested:
+            return width
+    return widths[-1]
+
+
+def negotiate_format(accept: Optional[str], formats: Optional[List[str]] = None) -> str:
+    """
+    Wählt das Format anhand des Accept-Headers.
+
+    AVIF und WebP werden nur geliefert, wenn der Browser sie ausdrücklich (mit q > 0)
+    nennt; JPEG versteht jeder Browser.
+
+    Args:
+        accept: Der Accept-Header der Anfrage
+        formats: Verfügbare Formate (Standard: available_formats())
+
+    Returns:
+        Name des Formats ("avif", "webp" oder "jpeg")
+    """
+    formats = formats if formats is not None else available_formats()
+    accepted = set()
+    for part in (accept or "").lower().split(","):
+        media_type, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(media_type.strip())
+    for name in formats:
+        if name != "jpeg" and FORMATS[name][2] in accepted:
+            return name
+    return "jpeg"
+
+
+def cache_cover(db: Session, anime: Anime) -> Optional[str]:
+    """
+    Lädt das Cover eines Animes über den gemeinsamen Bild-Fetcher (blockierend), legt es
+    im Bild-Cache ab und speichert den Pfad in cover_local_path.
+
+    Gleichzeitige Aufrufe für dasselbe Cover (mehrere Browser-Anfragen, Prefetcher)
+    teilen sich einen Download. Vorhandene Dateien werden auf Vollständigkeit geprüft.
+
+    Args:
+        db: Die Datenbankverbindung
+        anime: Der Anime (mit cover_image_url)
+
+    Returns:
+        Pfad der Datei oder None, wenn das Cover nicht geladen werden konnte
+    """
+    url = anime.cover_image_url
+    key = hash_url(url)
+    path = image_cache.path_for(key)
+    image_cache.touch(key)
+    if not image_cache.verify_file(path):
+        image = image_fetcher.load(url)
+        if image is None:
+            return None
+        if not image_cache.verify_file(path):
+            # Nur noch im Speicher-Cache (Datei gelöscht oder defekt): Datei neu schreiben
+            image_cache.store(key, image.data, image.content_type)
+            if not image_cache.verify_file(path):
+                return None
+    if anime.cover_local_path != path:
+        anime.cover_local_path = path
+        db.commit()
+    return path
+
+
+def variant_path(key: str, width: int, format_name: str) -> str:
+    return os.path.join(settings.image_cache_dir, "variants", f"{key}_w{width}.{FORMATS[format_name][1]}")
+
+
+def generate_variants(source_path: str, key: str) -> bool:
+    """
+    Dekodiert das Original einmal und schreibt alle Breiten in allen verfügbaren Formaten.
+
+    Args:
+        source_path: Pfad zum heruntergeladenen Original
+        key: Cache-Schlüssel (hash_url der Cover-URL)
+
+    Returns:
+        True, wenn die Varianten erzeugt wurden; False, wenn das Original kein lesbares Bild ist
+    """
+    if Image is None:
+        return False
+    try:
+        with Image.open(source_path) as original:
+            # EXIF-Drehung anwenden und Animationen auf das erste Bild reduzieren
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning("Cover %s ist kein lesbares Bild: %s", source_path, e)
+        return False
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    os.makedirs(os.path.join(settings.image_cache_dir, "variants"), exist_ok=True)
+    for width in sorted(settings.cover_variant_widths):
+        resized = image
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for format_name in available_formats():
+            pil_format, _, _, options = FORMATS[format_name]
+            encoded = resized
+            if format_name == "jpeg" and resized.mode == "RGBA":
+                # JPEG hat keinen Alphakanal: auf weißen Hintergrund legen
+                encoded = Image.new("RGB", resized.size, (255, 255, 255))
+                encoded.paste(resized, mask=resized.getchannel("A"))
+            path = variant_path(key, width, format_name)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                encoded.save(tmp_path, pil_format, **options)
+                os.replace(tmp_path, path)
+            except (OSError, ValueError) as e:
+                logger.error("Cover-Variante %s konnte nicht geschrieben werden: %s", path, e)
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+    return True
+
+
+def get_cover_variant(source_path: str, key: str, requested_width: int,
+                      accept: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    Liefert die passende Variante eines Covers und erzeugt die Varianten bei Bedarf.
+
+    Args:
+        source_path: Pfad zum heruntergeladenen Original
+        key: Cache-Schlüssel (hash_url der Cover-URL)
+        requested_width: Angefragte Breite in Pixeln (w=)
+        accept: Accept-Header der Anfrage
+
+    Returns:
+        Tuple (Pfad, Content-Type) oder None, wenn nur das Original ausgeliefert werden kann
+    """
+    if Image is None:
+        return None
+    width = variant_width(requested_width)
+    format_name = negotiate_format(accept)
+    path = variant_path(key, width, format_name)
+    if not os.path.exists(path):
+        # Wer auf eine laufende Erzeugung gewartet hat, prüft unten nur noch den Pfad
+        _generation.do(key, lambda: os.path.exists(path) or generate_variants(source_path, key))
+    if not os.path.exists(path):
+        return None
+    return path, FORMATS[format_name][2]
+
+
+def cover_version(key: str) -> str:
+    """Kurze Version eines Covers für URLs (ändert sich mit der Cover-URL)."""
+    return key[:16]
+
+
+def file_etag(path: str) -> Optional[str]:
+    """ETag einer Datei, wie ihn FileResponse für /api/cover setzt (mtime und Größe)."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    etag_base = f"{stat.st_mtime}-{stat.st_size}"
+    return '"' + hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest() + '"'
+
+
+def describe_cover(anime_id: int, cover_url: Optional[str], local_path: Optional[str],
+                   requested_width: int, format_name: str) -> Dict:
+    """
+    Beschreibt das Thumbnail eines Animes für /api/covers/batch, ohne etwas herunterzuladen
+    oder Varianten zu erzeugen.
+
+    Args:
+        anime_id: ID des Animes
+        cover_url: Gespeicherte Cover-URL
+        local_path: Gespeichertes cover_local_path
+        requested_width: Angefragte Breite in Pixeln (w=)
+        format_name: Für den Browser ausgehandeltes Format (negotiate_format)
+
+    Returns:
+        Dict mit status ("ready", "pending" oder "none"), url und, sobald die Datei
+        existiert, etag und content_type
+    """
+    if not cover_url:
+        return {"status": "none", "url": None, "etag": None, "content_type": None}
+    key = hash_url(cover_url)
+    width = variant_width(requested_width)
+    url = f"/api/cover/{anime_id}?w={width}&v={cover_version(key)}"
+    path = image_cache.path_for(key)
+    # Ein angezeigtes Raster zählt als Zugriff (schützt vor Verdrängung im Cover-Speicher)
+    image_cache.touch(key)
+    if local_path != path or not image_cache.verify_file(path):
+        # Noch nicht im Cache: /api/cover lädt es beim ersten Abruf
+        return {"status": "pending", "url": url, "etag": None, "content_type": None}
+    if Image is None:
+        with open(path, "rb") as f:
+            content_type = guess_image_type(f.read(16))
+        return {"status": "ready", "url": url, "etag": file_etag(path), "content_type": content_type}
+    # Die Variante entsteht erst beim ersten Abruf; bis dahin ist das ETag unbekannt
+    return {
+        "status": "ready",
+        "url": url,
+        "etag": file_etag(variant_path(key, width, format_name)),
+        "content_type": FORMATS[format_name][2],
+    }
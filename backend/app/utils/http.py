@@ -0,0 +1,150 @@
+"""
+Gemeinsame HTTP-Clients für Bild-Downloads.
+
+Alle Anfragen laufen über einen httpx.AsyncClient (Bild-Proxy) bzw. einen
+threadsicheren httpx.Client (Cover-Cache, Prefetcher, Scraper) mit
+Verbindungspool und Keep-Alive (auch zu FlareSolverr). Gleichzeitige Anfragen
+werden je Zielhost begrenzt, damit eine Seite mit vielen Covern einen Host nicht
+überlastet und FlareSolverr (ein Browser) nicht mit Dutzenden Anfragen
+gleichzeitig belegt wird.
+"""
+
+import random
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Browser Headers - zufällige Auswahl für jede Anfrage
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36",
+]
+
+
+def get_random_user_agent():
+    """Gibt einen zufälligen User-Agent zurück."""
+    return random.choice(USER_AGENTS)
+
+
+class HttpPool:
+    """Geteilte httpx-Clients (asynchron und blockierend) mit Begrenzung gleichzeitiger Anfragen je Host."""
+
+    def __init__(self, max_connections: int, keepalive_seconds: float, timeout_seconds: float,
+                 per_host_limit: int, host_limits: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            max_connections: Maximale Anzahl offener Verbindungen insgesamt
+            keepalive_seconds: Wie lange ungenutzte Verbindungen offen bleiben
+            timeout_seconds: Standard-Timeout je Anfrage
+            per_host_limit: Gleichzeitige Anfragen je Host
+            host_limits: Abweichende Limits für einzelne Hosts (z.B. FlareSolverr)
+        """
+        self.max_connections = max_connections
+        self.keepalive_seconds = keepalive_seconds
+        self.timeout_seconds = timeout_seconds
+        self.per_host_limit = per_host_limit
+        self.host_limits = host_limits or {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._sync_client: Optional[httpx.Client] = None
+        self._sync_lock = threading.Lock()
+        self._sync_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_connections,
+                            keepalive_expiry=self.keepalive_seconds)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Der Client der laufenden Event-Loop; wird beim ersten Zugriff angelegt."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # Client und Semaphoren sind an die Event-Loop gebunden (z.B. neue Loop im TestClient)
+            self._client = httpx.AsyncClient(limits=self._limits(), timeout=self.timeout_seconds,
+                                             follow_redirects=True)
+            self._loop = loop
+            self._semaphores = {}
+        return self._client
+
+    @asynccontextmanager
+    async def host_slot(self, url: str):
+        """Wartet auf einen freien Platz für den Host der URL."""
+        client = self.client  # legt bei Bedarf Client und Semaphoren für diese Loop an
+        host = urlparse(url).netloc
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.host_limits.get(host, self.per_host_limit))
+        async with semaphore:
+            yield client
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        async with self.host_slot(url) as client:
+            return await client.get(url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        async with self.host_slot(url) as client:
+            return await client.post(url, **kwargs)
+
+    @property
+    def sync_client(self) -> httpx.Client:
+        """Blockierender Client für Threads (threadsicher, wird beim ersten Zugriff angelegt)."""
+        with self._sync_lock:
+            if self._sync_client is None:
+                self._sync_client = httpx.Client(limits=self._limits(), timeout=self.timeout_seconds,
+                                                 follow_redirects=True)
+            return self._sync_client
+
+    @contextmanager
+    def sync_host_slot(self, url: str):
+        """Wie host_slot, aber für Threads."""
+        client = self.sync_client
+        host = urlparse(url).netloc
+        with self._sync_lock:
+            semaphore = self._sync_semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._sync_semaphores[host] = threading.BoundedSemaphore(
+                    self.host_limits.get(host, self.per_host_limit))
+        with semaphore:
+            yield client
+
+    def sync_get(self, url: str, **kwargs) -> httpx.Response:
+        with self.sync_host_slot(url) as client:
+            return client.get(url, **kwargs)
+
+    def sync_post(self, url: str, **kwargs) -> httpx.Response:
+        with self.sync_host_slot(url) as client:
+            return client.post(url, **kwargs)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+        self._semaphores = {}
+        with self._sync_lock:
+            if self._sync_client is not None:
+                self._sync_client.close()
+            self._sync_client = None
+
+
+# Gemeinsamer Pool für Bild-Proxy und Cover-Downloads
+image_http = HttpPool(
+    max_connections=settings.image_proxy_max_connections,
+    keepalive_seconds=settings.image_proxy_keepalive_seconds,
+    timeout_seconds=settings.image_proxy_timeout_seconds,
+    per_host_limit=settings.image_proxy_per_host_limit,
+    host_limits={urlparse(settings.flaresolverr_url).netloc: settings.flaresolverr_max_concurrent},
+)
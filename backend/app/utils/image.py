@@ -1,12 +1,13 @@
-import os
 import hashlib
 import logging
-import requests
-import base64
-from app.scraper.scraper import download_image
 
 logger = logging.getLogger(__name__)
-FLARESOLVERR_URL = "http://localhost:8191/v1"
+
+# Header für direkte Bildanfragen (ohne sie lehnen manche Hosts ab)
+IMAGE_REQUEST_HEADERS = {
+    "Accept": "image/avif,image/webp,image/apng,image/*,*/*;q=0.8",
+    "Accept-Language": "de,en-US;q=0.9,en;q=0.8",
+}
 
 
 def hash_url(url: str) -> str:
@@ -14,28 +15,16 @@ def hash_url(url: str) -> str:
     return hashlib.sha256(url.encode()).hexdigest()[:32]
 
 
-def download_or_proxy(url: str) -> bytes | None:
-    """Versucht das Bild über verschiedene Methoden herunterzuladen."""
-    # Direktversuch
-    try:
-        r = requests.get(url, timeout=20)
-        if r.status_code == 200 and r.content:
-            return r.content
-    except Exception:
-        pass
-    # FlareSolverr
-    try:
-        payload = {"cmd": "request.get", "url": url, "maxTimeout": 60000, "responseType": "binary"}
-        r = requests.post(FLARESOLVERR_URL, json=payload, timeout=60)
-        if r.status_code == 200:
-            data = r.json()
-            if data.get("status") == "ok":
-                return base64.b64decode(data["solution"]["response"])
-    except Exception:
-        pass
-    # Fallback
-    try:
-        return download_image(url)
-    except Exception as e:
-        logger.error(f"download_image fehlgeschlagen: {e}")
-    return None
+def guess_image_type(data: bytes, url: str = "") -> str:
+    """Bestimmt den Content-Type anhand der Signatur der Bilddaten (Fallback: Dateiendung)."""
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if data[4:12] in (b"ftypavif", b"ftypavis"):
+        return "image/avif"
+    return "image/png" if url.lower().endswith(".png") else "image/jpeg"
@@ -0,0 +1,285 @@
+"""
+Zweistufiger Cache für Bilder des Bild-Proxys.
+
+Schlüssel ist hash_url(url). Vorne liegt ein begrenzter LRU-Cache im Speicher für
+häufig angefragte Thumbnails, dahinter der Dateispeicher static/covers (dieselben
+Dateinamen wie bei /api/cover, sodass ein Cover nur einmal gespeichert wird).
+Jeder Eintrag hat ein ETag aus dem Inhalt, damit Browser mit If-None-Match
+bedingt anfragen können und eine 304-Antwort erhalten. Der letzte Zugriff je
+Schlüssel wird gemerkt, damit der Cover-Speicher (cover_store) selten genutzte
+Dateien zuerst verdrängt.
+
+Dateien werden über eine temporäre Datei und os.replace geschrieben, sodass nie
+eine halb geschriebene Datei gelesen wird. Beim Lesen prüft is_complete_image
+Signatur und Dateiende; abgeschnittene oder fremde Dateien (z.B. HTML-Seiten
+eines DDoS-Schutzes oder Reste älterer, nicht atomarer Schreibvorgänge) werden
+verworfen und neu geladen.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.utils.image import guess_image_type
+
+logger = logging.getLogger(__name__)
+
+# Anzahl Bytes, die für die Integritätsprüfung am Anfang und Ende gelesen werden
+CHECK_BYTES = 32
+
+
+class CachedImage(NamedTuple):
+    data: bytes
+    content_type: str
+    etag: str
+
+
+def make_etag(data: bytes) -> str:
+    """Starkes ETag aus dem Inhalt des Bildes."""
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Prüft einen If-None-Match-Header (Liste, "*" und schwache ETags) gegen das ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag == etag or tag == "W/" + etag for tag in candidates)
+
+
+def is_complete_image(head: bytes, tail: bytes, size: int) -> bool:
+    """
+    Günstige Plausibilitätsprüfung eines Bildes anhand von Anfang und Ende.
+
+    Args:
+        head: Die ersten CHECK_BYTES Bytes
+        tail: Die letzten CHECK_BYTES Bytes
+        size: Gesamtgröße in Bytes
+
+    Returns:
+        True, wenn die Signatur bekannt ist und das Dateiende vollständig aussieht
+    """
+    if size < 16:
+        return False
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return b"IEND" in tail
+    if head.startswith(b"\xff\xd8"):
+        # Manche Encoder hängen nach dem End-Marker noch Füllbytes an
+        return b"\xff\xd9" in tail
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return int.from_bytes(head[4:8], "little") + 8 <= size
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return tail.endswith(b";")
+    if head[4:8] == b"ftyp":
+        # AVIF/ISO-BMFF hat kein festes Dateiende; nur die Signatur prüfen
+        return True
+    return False
+
+
+def is_complete_image_data(data: bytes) -> bool:
+    return bool(data) and is_complete_image(data[:CHECK_BYTES], data[-CHECK_BYTES:], len(data))
+
+
+class ImageCache:
+    """LRU-Cache im Speicher vor dem Dateispeicher der Cover."""
+
+    def __init__(self, directory: str, memory_max_bytes: int, memory_item_max_bytes: int):
+        """
+        Args:
+            directory: Verzeichnis des Dateispeichers
+            memory_max_bytes: Obergrenze für alle Bilder im Speicher
+            memory_item_max_bytes: Größere Bilder werden nur auf der Platte gehalten
+        """
+        self.directory = directory
+        self.memory_max_bytes = memory_max_bytes
+        self.memory_item_max_bytes = memory_item_max_bytes
+        self._memory: "OrderedDict[str, CachedImage]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        # Bereits geprüfte Dateien: Pfad -> (mtime_ns, Größe)
+        self._verified = {}
+        # Letzter Zugriff je Schlüssel (Unix-Zeit), für die Verdrängung im Cover-Speicher
+        self._accessed: Dict[str, float] = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.corrupt_files = 0
+
+    def path_for(self, key: str) -> str:
+        # Gleiche Dateinamen wie /api/cover (Endung unabhängig vom tatsächlichen Format)
+        return os.path.join(self.directory, f"{key}.png")
+
+    def touch(self, key: str) -> None:
+        """Merkt den Zugriff auf ein Bild (auch wenn es direkt als Datei ausgeliefert wird)."""
+        with self._lock:
+            self._accessed[key] = time.time()
+
+    def last_access(self, key: str) -> Optional[float]:
+        """Letzter Zugriff seit dem Start der Anwendung (Unix-Zeit) oder None."""
+        with self._lock:
+            return self._accessed.get(key)
+
+    def forget(self, key: str) -> None:
+        """Vergisst alles zu einem Schlüssel, nachdem seine Datei gelöscht wurde."""
+        with self._lock:
+            image = self._memory.pop(key, None)
+            if image is not None:
+                self._memory_bytes -= len(image.data)
+            self._verified.pop(self.path_for(key), None)
+            self._accessed.pop(key, None)
+
+    def _remember(self, key: str, image: CachedImage) -> None:
+        if len(image.data) > self.memory_item_max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous.data)
+            self._memory[key] = image
+            self._memory_bytes += len(image.data)
+            while self._memory_bytes > self.memory_max_bytes and self._memory:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted.data)
+
+    def _discard_corrupt(self, path: str) -> None:
+        logger.warning("Cache-Datei %s ist unvollständig oder kein Bild und wird verworfen", path)
+        self.corrupt_files += 1
+        with self._lock:
+            self._verified.pop(path, None)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def verify_file(self, path: str) -> bool:
+        """
+        Prüft, ob die Datei existiert und ein vollständiges Bild ist (blockierend).
+
+        Gelesen werden nur Anfang und Ende; das Ergebnis wird bis zur nächsten Änderung
+        der Datei gemerkt. Defekte Dateien werden gelöscht.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if self._verified.get(path) == signature:
+                return True
+        try:
+            with open(path, "rb") as f:
+                head = f.read(CHECK_BYTES)
+                f.seek(max(0, stat.st_size - CHECK_BYTES))
+                tail = f.read(CHECK_BYTES)
+        except OSError as e:
+            logger.warning("Cache-Datei %s nicht lesbar: %s", path, e)
+            return False
+        if not is_complete_image(head, tail, stat.st_size):
+            self._discard_corrupt(path)
+            return False
+        with self._lock:
+            self._verified[path] = signature
+        return True
+
+    def get_memory(self, key: str) -> Optional[CachedImage]:
+        with self._lock:
+            image = self._memory.get(key)
+            if image is not None:
+                self._memory.move_to_end(key)
+                self._accessed[key] = time.time()
+            return image
+
+    def load(self, key: str) -> Optional[CachedImage]:
+        """Sucht das Bild im Speicher, dann auf der Platte (blockierend)."""
+        image = self.get_memory(key)
+        if image is not None:
+            self.memory_hits += 1
+            return image
+        path = self.path_for(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except OSError as e:
+            logger.warning("Cache-Datei %s nicht lesbar: %s", path, e)
+            self.misses += 1
+            return None
+        if not is_complete_image_data(data):
+            self._discard_corrupt(path)
+            self.misses += 1
+            return None
+        image = CachedImage(data, guess_image_type(data), make_etag(data))
+        self.disk_hits += 1
+        self.touch(key)
+        self._remember(key, image)
+        return image
+
+    def store(self, key: str, data: bytes, content_type: str) -> CachedImage:
+        """
+        Legt das Bild im Speicher und (über eine temporäre Datei) auf der Platte ab (blockierend).
+
+        Daten, die kein vollständiges Bild sind, werden zurückgegeben, aber nicht gespeichert.
+        """
+        image = CachedImage(data, content_type, make_etag(data))
+        if not is_complete_image_data(data):
+            logger.warning("Daten für %s sind kein vollständiges Bild und werden nicht gespeichert", key)
+            return image
+        path = self.path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error("Bild konnte nicht im Cache gespeichert werden (%s): %s", path, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.touch(key)
+        self._remember(key, image)
+        return image
+
+    async def aload(self, key: str) -> Optional[CachedImage]:
+        # Treffer im Speicher ohne Umweg über den Threadpool
+        image = self.get_memory(key)
+        if image is not None:
+            self.memory_hits += 1
+            return image
+        return await run_in_threadpool(self.load, key)
+
+    async def astore(self, key: str, data: bytes, content_type: str) -> CachedImage:
+        return await run_in_threadpool(self.store, key, data, content_type)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            requests = hits + self.misses
+            return {
+                "memory_items": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_max_bytes": self.memory_max_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / requests, 3) if requests else None,
+                "corrupt_files": self.corrupt_files,
+            }
+
+
+# Gemeinsamer Cache für Bild-Proxy und Cover
+image_cache = ImageCache(
+    settings.image_cache_dir,
+    memory_max_bytes=settings.image_cache_memory_bytes,
+    memory_item_max_bytes=settings.image_cache_memory_item_bytes,
+)
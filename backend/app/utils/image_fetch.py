@@ -0,0 +1,400 @@
+"""
+Gemeinsames Laden von Bildern (Cover) über austauschbare Methoden.
+
+Früher gab es drei eigene Download-Wege (Bild-Proxy, download_or_proxy für
+/api/cover und download_image im Scraper), jeweils mit blockierenden
+requests-Aufrufen und fest eingetragenem FlareSolverr. Jetzt laden alle über
+image_fetcher:
+
+- Methoden (Backends) sind Klassen mit fetch (blockierend) und afetch (asynchron):
+  direct, flaresolverr, anime_loads_session und browser. Welche in welcher
+  Reihenfolge genutzt werden, legt settings.image_fetch_backends fest.
+- HTTP-Methoden teilen sich die Verbindungspools aus app.utils.http.
+- Die Reihenfolge je Host und die Circuit Breaker kommen aus StrategySelector.
+- load/aload lesen zuerst den Bild-Cache, fassen gleichzeitige Downloads je URL
+  zusammen und speichern nur vollständige Bilder.
+"""
+
+import base64
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import urlparse
+
+import httpx
+from playwright.sync_api import sync_playwright, Error as PlaywrightError
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.utils.http import HttpPool, get_random_user_agent, image_http
+from app.utils.image import IMAGE_REQUEST_HEADERS, guess_image_type, hash_url
+from app.utils.image_cache import CachedImage, ImageCache, image_cache, is_complete_image_data
+from app.utils.singleflight import AsyncSingleFlight, SingleFlight
+from app.utils.strategy import Strategy, StrategySelector, StrategyUnavailable
+
+logger = logging.getLogger(__name__)
+
+ANIME_LOADS_URL = "https://www.anime-loads.org/"
+
+
+class ImageBackend(ABC):
+    """Basisklasse einer Download-Methode."""
+
+    name = ""
+
+    def applies(self, url: str) -> bool:
+        """Ob die Methode für diese URL in Frage kommt."""
+        return True
+
+    @abstractmethod
+    def fetch(self, url: str) -> Optional[bytes]:
+        """
+        Lädt das Bild (blockierend).
+
+        Returns:
+            Die Bilddaten oder None
+
+        Raises:
+            StrategyUnavailable: Die Methode ist gerade für alle Hosts unbrauchbar
+        """
+
+    async def afetch(self, url: str) -> Optional[bytes]:
+        """Lädt das Bild, ohne die Event-Loop zu blockieren (Standard: fetch im Threadpool)."""
+        return await run_in_threadpool(self.fetch, url)
+
+
+def _image_content(response: httpx.Response) -> Optional[bytes]:
+    """Bilddaten einer Antwort; HTML-Antworten (z.B. DDoS-Schutz) zählen als Fehlschlag."""
+    content_type = response.headers.get("content-type", "").split(";")[0].strip()
+    if response.status_code == 200 and response.content and not content_type.startswith("text/"):
+        return response.content
+    logger.debug("Abruf von %s: Status %s, Content-Type %s", response.url, response.status_code, content_type)
+    return None
+
+
+class DirectBackend(ImageBackend):
+    """Direkter Abruf über die gemeinsamen Verbindungspools."""
+
+    name = "direct"
+
+    def __init__(self, http: HttpPool):
+        self.http = http
+
+    def _headers(self) -> Dict[str, str]:
+        return dict(IMAGE_REQUEST_HEADERS, **{"User-Agent": get_random_user_agent()})
+
+    def fetch(self, url: str) -> Optional[bytes]:
+        try:
+            return _image_content(self.http.sync_get(url, headers=self._headers()))
+        except httpx.HTTPError as e:
+            logger.debug("Direkter Abruf von %s fehlgeschlagen: %s", url, e)
+            return None
+
+    async def afetch(self, url: str) -> Optional[bytes]:
+        try:
+            return _image_content(await self.http.get(url, headers=self._headers()))
+        except httpx.HTTPError as e:
+            logger.debug("Direkter Abruf von %s fehlgeschlagen: %s", url, e)
+            return None
+
+
+class FlareSolverrBackend(ImageBackend):
+    """Abruf über FlareSolverr (Keep-Alive-Verbindung aus dem gemeinsamen Pool)."""
+
+    name = "flaresolverr"
+
+    def __init__(self, http: HttpPool, endpoint: str, timeout_seconds: int):
+        self.http = http
+        self.endpoint = endpoint
+        self.timeout_seconds = timeout_seconds
+
+    def _payload(self, url: str) -> Dict:
+        return {
+            "cmd": "request.get",
+            "url": url,
+            "maxTimeout": self.timeout_seconds * 1000,
+            "responseType": "binary"
+        }
+
+    def _decode(self, url: str, response: httpx.Response) -> Optional[bytes]:
+        try:
+            if response.status_code != 200:
+                return None
+            data = response.json()
+            solution = data.get("solution") or {}
+            if data.get("status") != "ok" or not solution.get("response"):
+                return None
+            return base64.b64decode(solution["response"])
+        except (ValueError, TypeError) as e:
+            logger.warning("FlareSolverr-Abruf von %s fehlgeschlagen: %s", url, e)
+            return None
+
+    def fetch(self, url: str) -> Optional[bytes]:
+        try:
+            response = self.http.sync_post(self.endpoint, json=self._payload(url), timeout=self.timeout_seconds + 5)
+        except (httpx.ConnectError, httpx.TimeoutException) as e:
+            raise StrategyUnavailable(f"FlareSolverr nicht erreichbar: {e}")
+        except httpx.HTTPError as e:
+            logger.warning("FlareSolverr-Abruf von %s fehlgeschlagen: %s", url, e)
+            return None
+        return self._decode(url, response)
+
+    async def afetch(self, url: str) -> Optional[bytes]:
+        try:
+            response = await self.http.post(self.endpoint, json=self._payload(url), timeout=self.timeout_seconds + 5)
+        except (httpx.ConnectError, httpx.TimeoutException) as e:
+            raise StrategyUnavailable(f"FlareSolverr nicht erreichbar: {e}")
+        except httpx.HTTPError as e:
+            logger.warning("FlareSolverr-Abruf von %s fehlgeschlagen: %s", url, e)
+            return None
+        return self._decode(url, response)
+
+
+class AnimeLoadsSessionBackend(ImageBackend):
+    """
+    Abruf von anime-loads.org mit Referer, Browser-Headern und den Cookies der Hauptseite.
+
+    Die Cookies bleiben im gemeinsamen Client erhalten, sodass die Hauptseite nicht
+    vor jedem Bild erneut geladen werden muss.
+    """
+
+    name = "anime_loads_session"
+
+    HEADERS = {
+        'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
+        'Accept-Language': 'de,en-US;q=0.9,en;q=0.8',
+        'Referer': ANIME_LOADS_URL,
+        'Origin': 'https://www.anime-loads.org',
+        'Sec-Fetch-Dest': 'image',
+        'Sec-Fetch-Mode': 'no-cors',
+        'Sec-Fetch-Site': 'same-origin',
+        'Cache-Control': 'max-age=0',
+    }
+
+    def __init__(self, http: HttpPool):
+        self.http = http
+        self._warmed_up = False
+
+    def applies(self, url: str) -> bool:
+        return "anime-loads.org" in url
+
+    def _get(self, url: str) -> Optional[bytes]:
+        headers = dict(self.HEADERS, **{"User-Agent": get_random_user_agent()})
+        return _image_content(self.http.sync_get(url, headers=headers))
+
+    def fetch(self, url: str) -> Optional[bytes]:
+        try:
+            if not self._warmed_up:
+                # Besuche zuerst die Hauptseite, um Cookies zu setzen
+                self.http.sync_get(ANIME_LOADS_URL, headers={"User-Agent": get_random_user_agent()})
+                self._warmed_up = True
+            data = self._get(url)
+            # Versuch mit korrigierter URL (falls Bindestrich falsch ist)
+            corrected_url = url.replace("/w200-", "/w200/")
+            if data is None and corrected_url != url:
+                logger.info("Versuche mit korrigierter URL: %s", corrected_url)
+                data = self._get(corrected_url)
+        except httpx.HTTPError as e:
+            logger.debug("anime-loads-Abruf von %s fehlgeschlagen: %s", url, e)
+            return None
+        if data is None:
+            # Cookies könnten abgelaufen sein: beim nächsten Mal die Hauptseite neu laden
+            self._warmed_up = False
+        return data
+
+
+class BrowserBackend(ImageBackend):
+    """
+    Abruf mit Playwright (Firefox): Hauptseite der Bild-Domain öffnen, Cookie-Banner
+    wegklicken und die Bild-URL im Browser laden. Geliefert wird der Antwort-Body,
+    also das Originalbild und kein Screenshot.
+    """
+
+    name = "browser"
+
+    def __init__(self, timeout_seconds: int, max_concurrent: int):
+        self.timeout_seconds = timeout_seconds
+        # Browser sind teuer: nur wenige gleichzeitig starten
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrent))
+
+    def fetch(self, url: str) -> Optional[bytes]:
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}/"
+        timeout_ms = self.timeout_seconds * 1000
+        with self._slots, sync_playwright() as playwright:
+            try:
+                browser = playwright.firefox.launch(headless=True)
+            except PlaywrightError as e:
+                raise StrategyUnavailable(f"Firefox konnte nicht gestartet werden: {e}")
+            try:
+                context = browser.new_context(user_agent=get_random_user_agent())
+                page = context.new_page()
+                page.goto(origin, wait_until="domcontentloaded", timeout=timeout_ms)
+                # Klicke den Cookie-Banner weg, falls vorhanden
+                try:
+                    page.click("button.btn-primary", timeout=5000)
+                except PlaywrightError:
+                    pass
+                response = page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+                if response is None or not response.ok:
+                    logger.warning("Browser konnte Bild %s nicht laden: Status %s",
+                                   url, response.status if response else "unbekannt")
+                    return None
+                if not response.headers.get("content-type", "").startswith("image/"):
+                    return None
+                return response.body()
+            finally:
+                browser.close()
+
+
+def create_backend(name: str, http: HttpPool) -> ImageBackend:
+    """Erzeugt eine Methode aus ihrem Namen in settings.image_fetch_backends."""
+    if name == "direct":
+        return DirectBackend(http)
+    if name == "flaresolverr":
+        return FlareSolverrBackend(http, settings.flaresolverr_url, settings.flaresolverr_timeout_seconds)
+    if name == "anime_loads_session":
+        return AnimeLoadsSessionBackend(http)
+    if name == "browser":
+        return BrowserBackend(settings.image_browser_timeout_seconds, settings.image_browser_max_concurrent)
+    raise ValueError(f"Unbekannte Bild-Download-Methode: {name}")
+
+
+def _complete(name: str, url: str, data: Optional[bytes]) -> Optional[bytes]:
+    """Nur vollständige Bilder gelten als Erfolg der Methode."""
+    if data and not is_complete_image_data(data):
+        logger.debug("Methode %s lieferte für %s kein vollständiges Bild", name, url)
+        return None
+    return data
+
+
+class FetchedImage(NamedTuple):
+    data: bytes
+    content_type: str
+    backend: str
+
+
+class ImageFetcher:
+    """Lädt Bilder über die konfigurierten Methoden, mit Cache und zusammengefassten Downloads."""
+
+    def __init__(self, backends: List[ImageBackend], cache: ImageCache,
+                 failure_threshold: int = 3, reset_seconds: float = 300.0):
+        """
+        Args:
+            backends: Methoden in Standardreihenfolge
+            cache: Bild-Cache, in dem geladene Bilder abgelegt werden
+            failure_threshold: Fehlschläge in Folge, nach denen eine Methode übersprungen wird
+            reset_seconds: Dauer, bis eine übersprungene Methode erneut probiert wird
+        """
+        self.backends = {backend.name: backend for backend in backends}
+        self.cache = cache
+        self.strategies = StrategySelector(
+            [Strategy(backend.name, self._checked(backend), backend.applies) for backend in backends],
+            failure_threshold=failure_threshold,
+            reset_seconds=reset_seconds,
+        )
+        self._downloads = SingleFlight()
+        self._async_downloads = AsyncSingleFlight()
+
+    @staticmethod
+    def _checked(backend: ImageBackend):
+        def fetch(url: str) -> Optional[bytes]:
+            return _complete(backend.name, url, backend.fetch(url))
+        return fetch
+
+    def fetch(self, url: str) -> Optional[FetchedImage]:
+        """
+        Lädt ein Bild ohne Cache (blockierend).
+
+        Returns:
+            FetchedImage oder None, wenn keine Methode ein vollständiges Bild geliefert hat
+        """
+        result = self.strategies.run(url)
+        if not result:
+            return None
+        name, data = result
+        return FetchedImage(data, guess_image_type(data, url), name)
+
+    async def afetch(self, url: str) -> Optional[FetchedImage]:
+        """Wie fetch, ohne die Event-Loop zu blockieren."""
+        plan = self.strategies.plan(url)
+        forced = self.strategies.last_resort(url, plan)
+        for strategy in plan:
+            backend = self.backends[strategy.name]
+
+            async def fetch(target: str, backend: ImageBackend = backend) -> Optional[bytes]:
+                return _complete(backend.name, target, await backend.afetch(target))
+
+            data = await self.strategies.aattempt(strategy.name, url, fetch, ignore_host=strategy is forced)
+            if data:
+                return FetchedImage(data, guess_image_type(data, url), strategy.name)
+        return None
+
+    def load(self, url: str) -> Optional[CachedImage]:
+        """
+        Liefert das Bild aus dem Cache oder lädt und speichert es (blockierend).
+
+        Gleichzeitige Aufrufe für dieselbe URL teilen sich einen Download, auch mit
+        einem laufenden aload.
+        """
+        key = hash_url(url)
+        image = self.cache.load(key)
+        if image is not None:
+            return image
+        return self._downloads.do(key, lambda: self._download(url, key))
+
+    def _download(self, url: str, key: str) -> Optional[CachedImage]:
+        # Ein anderer Aufrufer kann das Bild inzwischen geladen haben
+        if self.cache.verify_file(self.cache.path_for(key)):
+            return self.cache.load(key)
+        logger.info("Lade Bild %s", url)
+        fetched = self.fetch(url)
+        if fetched is None:
+            return None
+        return self.cache.store(key, fetched.data, fetched.content_type)
+
+    async def aload(self, url: str) -> Optional[CachedImage]:
+        """Wie load, ohne die Event-Loop zu blockieren (Bild-Proxy)."""
+        key = hash_url(url)
+        image = await self.cache.aload(key)
+        if image is not None:
+            return image
+        return await self._async_downloads.do(key, lambda: self._adownload(url, key))
+
+    async def _adownload(self, url: str, key: str) -> Optional[CachedImage]:
+        # Ein anderer Aufrufer kann das Bild inzwischen geladen haben
+        if await run_in_threadpool(self.cache.verify_file, self.cache.path_for(key)):
+            return await self.cache.aload(key)
+        # Über die Tabelle der blockierenden Downloads, damit load und aload für
+        # dieselbe URL nur einmal laden
+        call, leader = self._downloads.begin(key)
+        if not leader:
+            return await run_in_threadpool(self._downloads.wait, call)
+        try:
+            logger.info("Lade Bild %s", url)
+            fetched = await self.afetch(url)
+            image = None if fetched is None else await self.cache.astore(key, fetched.data, fetched.content_type)
+        except BaseException as e:
+            self._downloads.finish(key, call, error=e)
+            raise
+        self._downloads.finish(key, call, image)
+        return image
+
+    def metrics(self) -> Dict:
+        """Methoden, deren Statistik und Circuit Breaker sowie zusammengefasste Downloads."""
+        return {
+            "backends": list(self.backends),
+            **self.strategies.metrics(),
+            "coalesced_downloads": self._downloads.stats(),
+            "coalesced_async_downloads": self._async_downloads.stats(),
+        }
+
+
+# Gemeinsamer Fetcher für /api/cover, den Bild-Proxy und den Cover-Prefetcher
+image_fetcher = ImageFetcher(
+    [create_backend(name, image_http) for name in settings.image_fetch_backends],
+    image_cache,
+    failure_threshold=settings.image_strategy_failure_threshold,
+    reset_seconds=settings.image_strategy_reset_seconds,
+)
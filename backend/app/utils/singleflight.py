@@ -0,0 +1,126 @@
+"""
+Zusammenfassen gleichzeitiger Anfragen je Schlüssel ("single flight").
+
+Fragen mehrere Aufrufer gleichzeitig dasselbe Bild an, läuft nur ein Download;
+die übrigen warten auf dessen Ergebnis (oder dessen Fehler). SingleFlight ist für
+Threads (get_cover, Cover-Prefetcher), AsyncSingleFlight für Coroutinen (Bild-Proxy).
+Über SingleFlight.begin/finish kann eine Coroutine einen Aufruf übernehmen, auf den
+auch Threads warten, sodass beide Seiten sich einen Download teilen.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Führt je Schlüssel höchstens einen Aufruf gleichzeitig aus (threadsicher)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: str, function: Callable[[], Any]) -> Any:
+        """
+        Ruft function auf oder wartet auf den bereits laufenden Aufruf für key.
+
+        Returns:
+            Das Ergebnis des (gemeinsamen) Aufrufs; dessen Ausnahme wird an alle Wartenden weitergereicht
+        """
+        call, leader = self.begin(key)
+        if not leader:
+            return self.wait(call)
+        try:
+            result = function()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result)
+        return result
+
+    def begin(self, key: str) -> Tuple[_Call, bool]:
+        """
+        Meldet einen Aufruf für key an, ohne ihn auszuführen (blockiert nicht).
+
+        Damit kann auch eine Coroutine einen Aufruf übernehmen, auf den blockierende
+        Aufrufer über do warten.
+
+        Returns:
+            (call, leader): Ist leader True, muss der Aufrufer finish(key, call, ...) aufrufen,
+            sonst wartet er mit wait(call) auf den laufenden Aufruf
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            self.calls += 1
+            return call, True
+
+    def finish(self, key: str, call: _Call, result: Any = None, error: Optional[BaseException] = None) -> None:
+        """Beendet einen mit begin übernommenen Aufruf und weckt alle Wartenden."""
+        call.result = result
+        call.error = error
+        with self._lock:
+            del self._calls[key]
+        call.event.set()
+
+    @staticmethod
+    def wait(call: _Call) -> Any:
+        """Wartet auf einen laufenden Aufruf (blockierend) und liefert dessen Ergebnis."""
+        call.event.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """Wie SingleFlight, aber für Coroutinen innerhalb einer Event-Loop."""
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Startet factory() als Task oder wartet auf den laufenden Task für key.
+
+        Bricht ein Aufrufer ab (z.B. Browser schließt die Verbindung), läuft der
+        gemeinsame Download für die übrigen weiter.
+        """
+        task = self._tasks.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Ausnahme als abgerufen markieren, falls alle Wartenden abgebrochen haben
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._tasks)}
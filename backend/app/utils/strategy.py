@@ -0,0 +1,340 @@
+"""
+Auswahl der Download-Methoden für Bilder mit Statistik und Circuit Breakern.
+
+Der Bild-Fetcher (app.utils.image_fetch) probiert mehrere Methoden nacheinander
+(direkt, FlareSolverr, Browser, ...), jede mit eigenem Timeout. Ohne
+Gedächtnis wartet jedes Bild erneut auf dieselben Fehlschläge, z.B. eine Minute
+auf ein hängendes FlareSolverr. StrategySelector merkt sich je Methode und Host
+Erfolgsquote und Dauer:
+
+- Die Methode, die für einen Host zuletzt funktioniert hat, wird zuerst versucht.
+- Nach failure_threshold Fehlschlägen in Folge öffnet der Circuit Breaker der
+  Methode für diesen Host; sie wird reset_seconds lang übersprungen und danach mit
+  einem einzelnen Probeversuch wieder zugelassen.
+- Meldet eine Methode StrategyUnavailable (Dienst nicht erreichbar, Browser
+  startet nicht), öffnet der Breaker der Methode für alle Hosts.
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Gewicht eines neuen Messwerts im gleitenden Mittel der Dauer
+LATENCY_SMOOTHING = 0.3
+
+
+class StrategyUnavailable(Exception):
+    """Die Methode ist gerade für alle Hosts unbrauchbar (z.B. FlareSolverr nicht erreichbar)."""
+
+
+class Strategy(NamedTuple):
+    name: str
+    function: Callable[[str], Optional[bytes]]
+    # Nur für passende URLs versuchen (z.B. Sonderwege für anime-loads.org)
+    applies: Callable[[str], bool] = lambda url: True
+
+
+def url_host(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+class CircuitBreaker:
+    """
+    Einfacher Circuit Breaker: closed -> open nach failure_threshold Fehlschlägen in
+    Folge, nach reset_seconds half_open (ein Probeversuch), bei Erfolg wieder closed.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        # Beginn des laufenden Probeversuchs (verfällt nach reset_seconds, falls nie verbucht)
+        self.probe_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def available(self) -> bool:
+        """Ob ein Versuch zulässig wäre (ohne den Probeversuch zu belegen)."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open":
+            return self.probe_started is None or time.monotonic() - self.probe_started >= self.reset_seconds
+        return False
+
+    def allow(self) -> bool:
+        if not self.available():
+            return False
+        if self.state == "half_open":
+            self.probe_started = time.monotonic()
+        return True
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_started = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.probe_started is not None or self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.probe_started = None
+
+    def as_dict(self) -> Dict:
+        retry_in = None
+        if self.state == "open":
+            retry_in = round(self.reset_seconds - (time.monotonic() - self.opened_at), 1)
+        return {"state": self.state, "consecutive_failures": self.consecutive_failures, "retry_in_seconds": retry_in}
+
+
+class StrategyStats:
+    """Zähler und Dauer einer Methode (gesamt oder für einen Host)."""
+
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.failures = 0
+        self.skipped = 0
+        self.total_seconds = 0.0
+        self.avg_seconds: Optional[float] = None
+        self.last_success_at: Optional[datetime] = None
+        self.last_failure_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def success_rate(self) -> float:
+        # Geglättet, damit unversuchte Methoden bei 0.5 starten
+        return (self.successes + 1) / (self.attempts + 2)
+
+    def record(self, ok: bool, seconds: float, error: Optional[str]) -> None:
+        self.attempts += 1
+        self.total_seconds += seconds
+        if self.avg_seconds is None:
+            self.avg_seconds = seconds
+        else:
+            self.avg_seconds += LATENCY_SMOOTHING * (seconds - self.avg_seconds)
+        if ok:
+            self.successes += 1
+            self.last_success_at = datetime.now()
+        else:
+            self.failures += 1
+            self.last_failure_at = datetime.now()
+            self.last_error = error
+
+    def as_dict(self) -> Dict:
+        return {
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "success_rate": round(self.successes / self.attempts, 3) if self.attempts else None,
+            "avg_seconds": round(self.avg_seconds, 3) if self.avg_seconds is not None else None,
+            "total_seconds": round(self.total_seconds, 3),
+            "last_success_at": self.last_success_at.isoformat() if self.last_success_at else None,
+            "last_failure_at": self.last_failure_at.isoformat() if self.last_failure_at else None,
+            "last_error": self.last_error,
+        }
+
+
+class StrategySelector:
+    """Führt Download-Methoden in gelernter Reihenfolge aus und überspringt bekannte Fehlschläge."""
+
+    def __init__(self, strategies: List[Strategy], failure_threshold: int = 3, reset_seconds: float = 300.0):
+        """
+        Args:
+            strategies: Methoden für run() in Standardreihenfolge
+            failure_threshold: Fehlschläge in Folge, nach denen eine Methode übersprungen wird
+            reset_seconds: Dauer, bis eine übersprungene Methode erneut probiert wird
+        """
+        self.strategies = strategies
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._totals: Dict[str, StrategyStats] = {}
+        self._services: Dict[str, CircuitBreaker] = {}
+        self._hosts: Dict[Tuple[str, str], Tuple[StrategyStats, CircuitBreaker]] = {}
+        self._winners: Dict[str, str] = {}
+
+    def _breaker(self) -> CircuitBreaker:
+        return CircuitBreaker(self.failure_threshold, self.reset_seconds)
+
+    def _entry(self, name: str, host: str) -> Tuple[StrategyStats, CircuitBreaker]:
+        entry = self._hosts.get((name, host))
+        if entry is None:
+            entry = self._hosts[(name, host)] = (StrategyStats(), self._breaker())
+            self._totals.setdefault(name, StrategyStats())
+            self._services.setdefault(name, self._breaker())
+        return entry
+
+    def allowed(self, name: str, host: str, ignore_host: bool = False) -> bool:
+        """
+        Prüft die Circuit Breaker der Methode (gesamt und für den Host); zählt Übersprünge.
+
+        Mit ignore_host=True zählt nur der Breaker der Methode für alle Hosts (siehe last_resort).
+        """
+        with self._lock:
+            stats, breaker = self._entry(name, host)
+            service = self._services[name]
+            if service.available() and (ignore_host or breaker.available()):
+                service.allow()
+                if not ignore_host:
+                    breaker.allow()
+                return True
+            stats.skipped += 1
+            self._totals[name].skipped += 1
+            return False
+
+    def record(self, name: str, host: str, ok: bool, seconds: float,
+               error: Optional[str] = None, unavailable: bool = False) -> None:
+        """Verbucht einen Versuch; unavailable=True zählt gegen die Methode für alle Hosts."""
+        with self._lock:
+            stats, breaker = self._entry(name, host)
+            stats.record(ok, seconds, error)
+            self._totals[name].record(ok, seconds, error)
+            service = self._services[name]
+            if ok:
+                breaker.record_success()
+                service.record_success()
+                self._winners[host] = name
+                return
+            if unavailable:
+                service.record_failure()
+                if service.state == "open":
+                    logger.warning("Download-Methode %s wird für %.0f s übersprungen: %s",
+                                   name, self.reset_seconds, error)
+            else:
+                service.record_success()
+                breaker.record_failure()
+                if breaker.state == "open":
+                    logger.info("Download-Methode %s wird für %s %.0f s übersprungen", name, host, self.reset_seconds)
+            if self._winners.get(host) == name:
+                del self._winners[host]
+
+    def attempt(self, name: str, url: str, function: Callable[[str], Optional[bytes]],
+                ignore_host: bool = False) -> Optional[bytes]:
+        """
+        Führt eine einzelne Methode aus, sofern ihr Circuit Breaker das zulässt.
+
+        Returns:
+            Die Bilddaten oder None (übersprungen, leer oder Fehler)
+        """
+        host = url_host(url)
+        if not self.allowed(name, host, ignore_host):
+            logger.debug("Download-Methode %s für %s übersprungen (Circuit Breaker offen)", name, host)
+            return None
+        started = time.monotonic()
+        try:
+            data = function(url)
+        except StrategyUnavailable as e:
+            self.record(name, host, False, time.monotonic() - started, str(e), unavailable=True)
+            return None
+        except Exception as e:
+            logger.error("Download-Methode %s für %s fehlgeschlagen: %s", name, url, e)
+            self.record(name, host, False, time.monotonic() - started, str(e))
+            return None
+        self.record(name, host, bool(data), time.monotonic() - started, None if data else "keine Daten")
+        return data or None
+
+    async def aattempt(self, name: str, url: str, function: Callable[[str], Awaitable[Any]],
+                       ignore_host: bool = False) -> Any:
+        """Wie attempt, aber für Coroutinen (Bild-Proxy)."""
+        host = url_host(url)
+        if not self.allowed(name, host, ignore_host):
+            logger.debug("Download-Methode %s für %s übersprungen (Circuit Breaker offen)", name, host)
+            return None
+        started = time.monotonic()
+        try:
+            data = await function(url)
+        except StrategyUnavailable as e:
+            self.record(name, host, False, time.monotonic() - started, str(e), unavailable=True)
+            return None
+        except Exception as e:
+            logger.error("Download-Methode %s für %s fehlgeschlagen: %s", name, url, e)
+            self.record(name, host, False, time.monotonic() - started, str(e))
+            return None
+        self.record(name, host, bool(data), time.monotonic() - started, None if data else "keine Daten")
+        return data or None
+
+    def plan(self, url: str) -> List[Strategy]:
+        """Reihenfolge für url: letzter Gewinner des Hosts zuerst, dann nach Erfolgsquote."""
+        host = url_host(url)
+        candidates = [strategy for strategy in self.strategies if strategy.applies(url)]
+        with self._lock:
+            winner = self._winners.get(host)
+            rates = {}
+            for strategy in candidates:
+                entry = self._hosts.get((strategy.name, host))
+                # Grob gerundet, damit ohne klare Unterschiede die Standardreihenfolge gilt
+                rates[strategy.name] = round(entry[0].success_rate, 1) if entry else 0.5
+        order = {strategy.name: index for index, strategy in enumerate(candidates)}
+        return sorted(candidates, key=lambda s: (s.name != winner, -rates[s.name], order[s.name]))
+
+    def last_resort(self, url: str, plan: List[Strategy]) -> Optional[Strategy]:
+        """
+        Sind alle Methoden nur für den Host der URL gesperrt (z.B. nach einigen defekten
+        Bild-URLs), wird die erste trotzdem versucht, statt das Bild gar nicht zu laden.
+
+        Returns:
+            Die trotz Host-Breaker zu versuchende Methode oder None
+        """
+        host = url_host(url)
+        candidates = []
+        with self._lock:
+            for strategy in plan:
+                service = self._services.get(strategy.name)
+                if service is not None and not service.available():
+                    continue
+                entry = self._hosts.get((strategy.name, host))
+                if entry is None or entry[1].available():
+                    return None
+                candidates.append(strategy)
+        return candidates[0] if candidates else None
+
+    def run(self, url: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Versucht die Methoden in gelernter Reihenfolge, bis eine Bilddaten liefert.
+
+        Returns:
+            Tuple (Name der Methode, Bilddaten) oder None
+        """
+        plan = self.plan(url)
+        forced = self.last_resort(url, plan)
+        for strategy in plan:
+            data = self.attempt(strategy.name, url, strategy.function, ignore_host=strategy is forced)
+            if data:
+                return strategy.name, data
+        return None
+
+    def metrics(self) -> Dict:
+        """Statistik je Methode (gesamt und je Host), Zustand der Circuit Breaker und Gewinner je Host."""
+        with self._lock:
+            hosts: Dict[str, Dict] = {}
+            for (name, host), (stats, breaker) in sorted(self._hosts.items(), key=lambda item: item[0]):
+                hosts.setdefault(host, {})[name] = dict(stats.as_dict(), breaker=breaker.as_dict())
+            return {
+                "strategies": {
+                    name: dict(stats.as_dict(), breaker=self._services[name].as_dict())
+                    for name, stats in self._totals.items()
+                },
+                "hosts": hosts,
+                "winners": dict(self._winners),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+            self._services.clear()
+            self._hosts.clear()
+            self._winners.clear()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark für normalize_title
+
+Vergleicht den Durchsatz (Normalisierungen pro Sekunde) der früheren Implementierung
+(re.sub mit Muster-String und f-String-Debug-Logging je Aufruf) mit der aktuellen
+Implementierung ohne und mit Cache. Die Titel stammen aus dem Korpus von
+bench_parse_filename; wie bei einem Scan kommt jeder Titel viele Male vor.
+"""
+
+import os
+import re
+import sys
+import time
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.scanner.parser import parse_filename
+from app.scanner.titles import normalize_title
+from bench_parse_filename import load_corpus
+
+legacy_logger = logging.getLogger('bench.legacy_normalize_title')
+
+
+def legacy_normalize_title(title: str) -> str:
+    """Frühere Implementierung als Vergleichswert."""
+    if not title:
+        return ""
+    normalized = re.sub(r'[^\w\s]', '', title.lower())
+    normalized = re.sub(r'\s+', ' ', normalized).strip()
+    legacy_logger.debug(f"Normalisierter Titel: '{title}' -> '{normalized}'")
+    return normalized
+
+
+def load_titles():
+    """Geparste Titel des Korpus (ohne unparsbare Einträge)."""
+    titles = []
+    for file_path, _ in load_corpus():
+        parsed = parse_filename(file_path)
+        if parsed and parsed.title:
+            titles.append(parsed.title)
+    return titles
+
+
+def measure(function, titles, iterations: int) -> float:
+    """Misst den Durchsatz einer Normalisierungsfunktion in Aufrufen pro Sekunde."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for title in titles:
+            function(title)
+    elapsed = time.perf_counter() - start
+    return len(titles) * iterations / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark für normalize_title')
+    parser.add_argument('--iterations', type=int, default=200, help='Anzahl der Durchläufe über die Titel')
+    args = parser.parse_args()
+
+    # Warnungen für absichtlich unparsbare Korpus-Einträge unterdrücken
+    logging.disable(logging.WARNING)
+    titles = load_titles()
+    logging.disable(logging.NOTSET)
+    # Wie im Produktivbetrieb: Debug-Ausgaben sind abgeschaltet
+    logging.basicConfig(level=logging.INFO)
+
+    mismatches = [t for t in set(titles) if legacy_normalize_title(t) != normalize_title(t)]
+    print(f"Titel: {len(titles)} ({len(set(titles))} verschiedene), {len(mismatches)} Abweichungen")
+    if mismatches:
+        sys.exit(1)
+
+    results = [
+        ("vorher (re.sub, f-String-Logging)", measure(legacy_normalize_title, titles, args.iterations)),
+        ("ohne Cache (vorkompiliert)", measure(normalize_title.__wrapped__, titles, args.iterations)),
+    ]
+    normalize_title.cache_clear()
+    results.append(("mit Cache", measure(normalize_title, titles, args.iterations)))
+
+    baseline = results[0][1]
+    for name, per_second in results:
+        print(f"{name:<36} {per_second:>14,.0f} Normalisierungen/s  ({per_second / baseline:.1f}x)")
+    print(f"Cache: {normalize_title.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark für parse_filename
+
+Prüft zuerst alle Einträge des Fixture-Korpus (fixtures/filenames.tsv) gegen die
+erwarteten Werte und misst anschließend den Durchsatz in Dateien pro Sekunde.
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.scanner.parser import ParsedFile, parse_filename
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'filenames.tsv')
+INT_FIELDS = ('episode', 'season', 'version')
+
+
+def load_corpus(path: str = CORPUS_PATH):
+    """Liest den Korpus als Liste von (Pfad, erwartetes ParsedFile oder None)."""
+    corpus = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line or line.startswith('#'):
+                continue
+            columns = line.split('\t')
+            file_path, values = columns[0], columns[1:]
+            if all(v == '-' for v in values):
+                corpus.append((file_path, None))
+                continue
+            fields = {}
+            for name, value in zip(ParsedFile.__slots__, values):
+                if value == '-':
+                    fields[name] = None
+                elif name in INT_FIELDS:
+                    fields[name] = int(value)
+                else:
+                    fields[name] = value
+            corpus.append((file_path, ParsedFile(**fields)))
+    return corpus
+
+
+def verify(corpus) -> int:
+    """Vergleicht die Parser-Ergebnisse mit dem Korpus und gibt die Anzahl der Abweichungen zurück."""
+    failures = 0
+    for file_path, expected in corpus:
+        result = parse_filename(file_path)
+        if result != expected:
+            failures += 1
+            print(f"ABWEICHUNG: {file_path}\n  erwartet: {expected}\n  erhalten: {result}")
+    return failures
+
+
+def measure(corpus, iterations: int) -> float:
+    """Misst den Durchsatz von parse_filename in Dateien pro Sekunde."""
+    paths = [file_path for file_path, _ in corpus]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for file_path in paths:
+            parse_filename(file_path)
+    elapsed = time.perf_counter() - start
+    return len(paths) * iterations / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark für parse_filename')
+    parser.add_argument('--iterations', type=int, default=2000, help='Anzahl der Durchläufe über den Korpus')
+    args = parser.parse_args()
+
+    # Warnungen für absichtlich unparsbare Korpus-Einträge unterdrücken
+    logging.disable(logging.WARNING)
+
+    corpus = load_corpus()
+    failures = verify(corpus)
+    print(f"Korpus: {len(corpus)} Dateien, {failures} Abweichungen")
+    if failures:
+        sys.exit(1)
+
+    files_per_second = measure(corpus, args.iterations)
+    print(f"Durchsatz: {files_per_second:,.0f} Dateien/s ({args.iterations} Durchläufe)")
+
+
+if __name__ == "__main__":
+    main()
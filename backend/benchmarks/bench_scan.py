@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark für den lokalen Scanner mit synthetischen Verzeichnisbäumen
+
+Erzeugt für jede Größe (z.B. 1.000 bis 200.000 Dateien) in einem temporären
+Verzeichnis einen Mediathek-Baum mit realistischen Release-Dateinamen
+(SubsPlease, Erai-raws, Scene-Releases mit SxxEyy, Staffel-Ordner, Extras und
+Nicht-Mediendateien) und eine frische Datenbank mit N bekannten Animes. Gemessen
+werden find_anime_files, parse_filename, find_matching_anime, das Matching gegen
+die Titel-Momentaufnahme sowie scan_and_update als Erst- und als Folgescan.
+
+Das Ergebnis wird als JSON ausgegeben, damit Läufe verglichen werden können:
+
+    python benchmarks/bench_scan.py --files 1000 10000 100000 --output bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+
+# scan_local_files liest die Konfiguration beim Import; der Benchmark nutzt aber eine eigene Datenbank
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Anime
+from app.scanner.jobs import ScanProgress
+from app.scanner.parser import parse_filename
+from app.scanner.titles import normalize_title
+from scan_local_files import find_anime_files, find_matching_anime, load_title_snapshot, scan_and_update
+
+# Version des JSON-Formats
+RESULT_FORMAT = 1
+
+# Episoden je Staffel; längere Serien bekommen Staffel-Ordner
+EPISODES_PER_SEASON = 24
+
+# Anzahl der Aufrufe von find_matching_anime (lädt bei jedem Aufruf die Titel neu)
+MATCH_SAMPLE_SIZE = 200
+
+TITLE_WORDS = [
+    'Akane', 'Blade', 'Chronicle', 'Dragon', 'Eternal', 'Frontier', 'Garden', 'Hunter', 'Island', 'Journey',
+    'Kingdom', 'Legend', 'Magic', 'Night', 'Ocean', 'Phantom', 'Quest', 'Rising', 'Sword', 'Tales',
+    'Usagi', 'Violet', 'Wandering', 'Xeno', 'Youth', 'Zero', 'no', 'Sekai', 'Shoujo', 'Tensei',
+    'Academy', 'Alchemist', 'Spirit', 'Witch', 'Moon', 'Star', 'Knight', 'Demon', 'Hero', 'Summer',
+]
+RELEASE_GROUPS = ['SubsPlease', 'Erai-raws', 'HorribleSubs', 'Judas', 'ASW', 'EMBER']
+SCENE_GROUPS = ['TVS', 'AniMeGer', 'GERMAN-DL', 'iND', 'WvF']
+
+# Extras ohne Episodennummer; bewusst ohne Ziffern, damit der Parser sie nicht zuordnet
+EXTRA_NAMES = ['Creditless Opening', 'Creditless Ending', 'Trailer', 'Making of', 'Interview']
+
+
+def make_titles(count: int, rng: random.Random):
+    """Erzeugt eindeutige, plausible Serientitel."""
+    titles = set()
+    while len(titles) < count:
+        words = rng.sample(TITLE_WORDS, rng.randint(2, 4))
+        title = ' '.join(words)
+        if rng.random() < 0.1:
+            title += f" {rng.randint(2, 9)}"
+        titles.add(title)
+    return sorted(titles)
+
+
+def release_name(title: str, style: int, season: int, episode: int, rng: random.Random) -> str:
+    """Dateiname im Stil einer typischen Release-Gruppe."""
+    if style == 0:
+        return f"[{rng.choice(RELEASE_GROUPS)}] {title} - {episode:02d} (1080p) [{rng.getrandbits(32):08X}].mkv"
+    if style == 1:
+        dotted = title.replace(' ', '.')
+        return f"{dotted}.S{season:02d}E{episode:02d}.German.DL.1080p.WEB.h264-{rng.choice(SCENE_GROUPS)}.mkv"
+    if style == 2:
+        return f"[Erai-raws] {title} - {episode:02d} [720p][Multiple Subtitle].mkv"
+    return f"{title} - {episode:02d} [v2].mp4"
+
+
+def generate_tree(root: str, files: int, titles, rng: random.Random) -> dict:
+    """
+    Legt einen synthetischen Mediathek-Baum mit leeren Dateien an.
+
+    Args:
+        root: Zielverzeichnis (enthält danach den Ordner "Anime")
+        files: Anzahl der Mediendateien
+        titles: Serientitel; die Dateien werden reihum auf die Serien verteilt
+        rng: Zufallsgenerator (für reproduzierbare Bäume)
+
+    Returns:
+        Dictionary mit Verzeichnis und Anzahl der erzeugten Dateien
+    """
+    media_dir = os.path.join(root, 'Anime')
+    styles = {title: rng.randrange(4) for title in titles}
+    episode_counts = {}
+    created_dirs = set()
+    extra_files = 0
+
+    for index in range(files):
+        title = titles[index % len(titles)]
+        position = episode_counts.get(title, 0)
+        episode_counts[title] = position + 1
+        season, episode = divmod(position, EPISODES_PER_SEASON)
+        season += 1
+        episode += 1
+
+        series_dir = os.path.join(media_dir, title)
+        # Serien mit mehreren Staffeln liegen in Staffel-Ordnern
+        directory = os.path.join(series_dir, f"Season {season:02d}") if season > 1 else series_dir
+        if directory not in created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            created_dirs.add(directory)
+            if directory == series_dir:
+                # Nicht-Mediendateien, die der Walker überspringen muss
+                open(os.path.join(series_dir, 'tvshow.nfo'), 'w').close()
+                extra_files += 1
+        open(os.path.join(directory, release_name(title, styles[title], season, episode, rng)), 'w').close()
+
+        # Gelegentlich Extras, die als nicht zugeordnete Dateien im Ergebnis landen
+        if rng.random() < 0.01:
+            extras_dir = os.path.join(series_dir, 'Extras')
+            os.makedirs(extras_dir, exist_ok=True)
+            extra_path = os.path.join(extras_dir, f"{rng.choice(EXTRA_NAMES)}.mkv")
+            if not os.path.exists(extra_path):
+                open(extra_path, 'w').close()
+                extra_files += 1
+
+    return {"media_dir": media_dir, "media_files": files, "extra_files": extra_files}
+
+
+def seed_database(database_url: str, known_titles):
+    """Legt eine frische Datenbank mit den bekannten Animes an und liefert die Session-Factory."""
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = session_factory()
+    try:
+        db.bulk_insert_mappings(Anime, [{"titel_de": title} for title in known_titles])
+        db.commit()
+    finally:
+        db.close()
+    return engine, session_factory
+
+
+def timed(function, *args, **kwargs):
+    """Führt die Funktion aus und liefert (Ergebnis, Sekunden)."""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def rate(count: int, seconds: float) -> float:
+    return round(count / seconds, 1) if seconds > 0 else 0.0
+
+
+def run_scan(session_factory, media_dir: str, workers: int, chunk_size: int) -> dict:
+    """Misst einen vollständigen scan_and_update-Lauf."""
+    db = session_factory()
+    try:
+        progress = ScanProgress()
+        summary, seconds = timed(scan_and_update, media_dir, db, create_missing=True, chunk_size=chunk_size,
+                                 workers=workers, progress=progress, probe_media=False)
+    finally:
+        db.close()
+    return {
+        "seconds": round(seconds, 3),
+        "files_per_second": rate(summary.total_files, seconds),
+        "summary": summary.as_dict(),
+        "progress": progress.as_dict(),
+    }
+
+
+def bench_size(files: int, args, work_dir: str) -> dict:
+    """Erzeugt Baum und Datenbank für eine Größe und misst alle Stufen."""
+    rng = random.Random(args.seed + files)
+    series_count = max(1, min(files, args.animes + int(args.animes * args.unknown_ratio)))
+    titles = make_titles(series_count, rng)
+    # Nur ein Teil der Serien ist bekannt; der Rest wird beim Scan neu angelegt
+    known_titles = titles[:max(1, min(args.animes, series_count))]
+
+    tree_root = os.path.join(work_dir, f"tree_{files}")
+    tree, generate_seconds = timed(generate_tree, tree_root, files, titles, rng)
+    database_url = args.database_url or f"sqlite:///{os.path.join(work_dir, f'bench_{files}.db')}"
+    engine, session_factory = seed_database(database_url, known_titles)
+
+    result = {
+        "files": files,
+        "series": len(titles),
+        "known_animes": len(known_titles),
+        "generate_seconds": round(generate_seconds, 3),
+        "extra_files": tree["extra_files"],
+    }
+    try:
+        paths, seconds = timed(find_anime_files, tree["media_dir"])
+        result["find_anime_files"] = {"seconds": round(seconds, 3), "files": len(paths),
+                                      "files_per_second": rate(len(paths), seconds)}
+
+        parsed, seconds = timed(lambda: [parse_filename(path) for path in paths])
+        result["parse_filename"] = {"seconds": round(seconds, 3), "files_per_second": rate(len(paths), seconds)}
+
+        parsed_titles = [p.title for p in parsed if p and p.title]
+        db = session_factory()
+        try:
+            snapshot, snapshot_seconds = timed(load_title_snapshot, db)
+            _, seconds = timed(lambda: [snapshot.match(title, normalize_title(title)) for title in parsed_titles])
+            result["title_snapshot_match"] = {"load_seconds": round(snapshot_seconds, 3), "seconds": round(seconds, 3),
+                                              "matches_per_second": rate(len(parsed_titles), seconds)}
+
+            sample = parsed_titles[:MATCH_SAMPLE_SIZE]
+            matches, seconds = timed(lambda: [find_matching_anime(db, title) for title in sample])
+            result["find_matching_anime"] = {
+                "calls": len(sample),
+                "matched": sum(1 for anime in matches if anime is not None),
+                "seconds": round(seconds, 3),
+                "ms_per_call": round(seconds / len(sample) * 1000, 3) if sample else 0.0,
+            }
+        finally:
+            db.close()
+
+        result["scan_initial"] = run_scan(session_factory, tree["media_dir"], args.workers, args.chunk_size)
+        result["scan_rescan"] = run_scan(session_factory, tree["media_dir"], args.workers, args.chunk_size)
+    finally:
+        engine.dispose()
+        if not args.keep:
+            shutil.rmtree(tree_root, ignore_errors=True)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark für den lokalen Scanner mit synthetischen Verzeichnisbäumen')
+    parser.add_argument('--files', type=int, nargs='+', default=[1000, 10000],
+                        help='Anzahl der Mediendateien je Lauf (z.B. 1000 10000 200000)')
+    parser.add_argument('--animes', type=int, default=500, help='Anzahl der Animes in der Datenbank')
+    parser.add_argument('--unknown-ratio', type=float, default=0.1,
+                        help='Anteil zusätzlicher Serien im Baum, die nicht in der Datenbank sind')
+    parser.add_argument('--workers', type=int, default=1, help='Parser-Prozesse für scan_and_update')
+    parser.add_argument('--chunk-size', type=int, default=500, help='Dateien pro Commit')
+    parser.add_argument('--database-url', type=str, default=None,
+                        help='Datenbank für den Benchmark (Standard: SQLite-Datei im Arbeitsverzeichnis); wird geleert!')
+    parser.add_argument('--work-dir', type=str, default=None, help='Arbeitsverzeichnis (Standard: temporär)')
+    parser.add_argument('--keep', action='store_true', help='Erzeugte Bäume nach dem Lauf nicht löschen')
+    parser.add_argument('--seed', type=int, default=42, help='Startwert für reproduzierbare Bäume')
+    parser.add_argument('--output', type=str, default=None, help='Ergebnis als JSON in diese Datei (Standard: stdout)')
+    args = parser.parse_args()
+
+    # Scanner-Logs (neue Animes, nicht zugeordnete Extras) verfälschen die Messung
+    logging.disable(logging.WARNING)
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='bench_scan_')
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        results = []
+        for files in args.files:
+            print(f"Messe {files} Dateien ...", file=sys.stderr)
+            results.append(bench_size(files, args, work_dir))
+    finally:
+        if not args.keep and not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "format": RESULT_FORMAT,
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {"animes": args.animes, "unknown_ratio": args.unknown_ratio, "workers": args.workers,
+                    "chunk_size": args.chunk_size, "seed": args.seed,
+                    "database": (args.database_url or "sqlite").split(':', 1)[0]},
+        "results": results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+        print(f"Ergebnis geschrieben: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,7 @@ from pathlib import Path
 # Damit wir das Skript vom Projektstamm ausführen können
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.scraper.scraper import download_image
+from app.utils.image_fetch import image_fetcher
 
 # Logger konfigurieren
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -54,16 +54,17 @@ def main():
     except Exception as e:
         logger.error(f"Fehler beim direkten Download: {str(e)}")
     
-    # Test mit download_image Funktion
-    logger.info(f"Teste download_image Funktion mit {url}")
-    image_data = download_image(url)
+    # Test mit dem gemeinsamen Bild-Fetcher (Cache, dann alle konfigurierten Methoden)
+    logger.info(f"Teste image_fetcher.load mit {url}")
+    image = image_fetcher.load(url)
     
-    if image_data:
+    if image is not None:
         with open(output_file, "wb") as f:
-            f.write(image_data)
-        logger.info(f"Download mit download_image erfolgreich: {len(image_data)} Bytes")
+            f.write(image.data)
+        logger.info(f"Download mit image_fetcher erfolgreich: {len(image.data)} Bytes ({image.content_type})")
     else:
-        logger.error("Download mit download_image fehlgeschlagen")
+        logger.error("Download mit image_fetcher fehlgeschlagen")
+    logger.info(f"Kennzahlen der Download-Methoden: {image_fetcher.metrics()['strategies']}")
 
 if __name__ == "__main__":
     main()
@@ -16,6 +16,7 @@ from app.scraper.scraper import get_page_content, extract_anime_info, extract_ep
 from app import crud, schemas, models
 from app.database import get_db, SessionLocal
 from app.models import EpisodeAvailabilityStatus
+from app.utils.cover_prefetch import cover_prefetcher
 
 # Logger konfigurieren
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -27,7 +28,7 @@ def import_anime(url: str, skip_cover_download: bool = False) -> Optional[models
     
     Args:
         url: Die URL zur Anime-Seite
-        skip_cover_download: Wenn True, wird der Cover-Download übersprungen
+        skip_cover_download: Wenn True, wird das Cover nicht zum Laden eingereiht
         
     Returns:
         Das erstellte Anime-Modell oder None bei Fehler
@@ -42,7 +43,8 @@ def import_anime(url: str, skip_cover_download: bool = False) -> Optional[models
         return None
     
     # Extrahiere Anime-Informationen
-    anime_data = extract_anime_info(soup, url, skip_cover_download)
+    # (ohne Cover-Download; das Cover lädt anschließend der Cover-Prefetcher)
+    anime_data = extract_anime_info(soup, url)
     
     if not anime_data:
         logger.error("Konnte keine Anime-Informationen extrahieren")
@@ -116,12 +118,6 @@ def import_anime(url: str, skip_cover_download: bool = False) -> Optional[models
             logger.info("Erstelle neuen Anime in der Datenbank...")
             anime = crud.create_anime(db, anime_create)
         
-        # Cover-Bild-Daten speichern, falls vorhanden und nicht übersprungen
-        if anime_data.get('cover_image_data') and not skip_cover_download:
-            logger.info(f"Speichere Cover-Bild-Daten ({len(anime_data['cover_image_data'])} Bytes)")
-            anime.cover_image_data = anime_data['cover_image_data']
-            db.commit()
-        
         # Importiere Episoden, falls vorhanden
         if episodes_data:
             for ep_data in episodes_data:
@@ -201,6 +197,9 @@ def import_anime(url: str, skip_cover_download: bool = False) -> Optional[models
         
         db.commit()
         logger.info(f"Import erfolgreich abgeschlossen für: {anime.titel}")
+        if not skip_cover_download:
+            # Cover im Hintergrund in den lokalen Cache laden
+            cover_prefetcher.enqueue([anime.id])
         return anime
         
     except Exception as e:
@@ -216,9 +215,19 @@ def main():
     parser.add_argument('url', help='URL zur Anime-Seite auf anime-loads.org')
     parser.add_argument('--skip-cover', action='store_true', help='Cover-Download überspringen')
     
+    parser.add_argument('--cover-timeout', type=float, default=300,
+                        help='Maximale Wartezeit in Sekunden auf das Vorladen der Cover nach dem Import')
+    
     args = parser.parse_args()
     
+    # Cover (auch die der importierten Relationen) laden parallel zum restlichen Import
+    if not args.skip_cover:
+        cover_prefetcher.start()
     result = import_anime(args.url, args.skip_cover)
+    if not args.skip_cover:
+        if not cover_prefetcher.wait_idle(args.cover_timeout):
+            logger.warning("Nicht alle Cover wurden rechtzeitig geladen: %s", cover_prefetcher.status())
+        cover_prefetcher.stop()
     
     if result:
         print(f"Import erfolgreich: {result.titel}")
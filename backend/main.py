@@ -1,14 +1,19 @@
-from fastapi import FastAPI, Response, HTTPException, Depends
+from fastapi import FastAPI, Response, HTTPException, Depends, Header
 import logging
-import requests
 from urllib.parse import unquote
 from app import models
 from app.database import engine, Base, SessionLocal, get_db
-from app.routers import animes, episodes
-from app.scraper.scraper import download_image
-import base64
+from app.routers import aliases, animes, covers, episodes, media_roots, scans
+from app.config import settings
 from fastapi.responses import FileResponse
-from app.utils.image import hash_url, download_or_proxy
+from app.utils.image import hash_url, guess_image_type
+from app.utils.covers import cache_cover, cover_version, get_cover_variant
+from app.utils.cover_prefetch import cover_prefetcher
+from app.utils.cover_store import cover_store
+from app.utils.http import image_http
+from app.utils.image_cache import etag_matches
+from app.utils.image_fetch import image_fetcher
+from typing import Optional
 import os
 from app import crud
 from fastapi.staticfiles import StaticFiles
@@ -45,8 +50,57 @@ app.include_router(animes.router)
 # Include the episodes router
 app.include_router(episodes.router)
 
+# Include the scans router (Hintergrund-Scans lokaler Dateien)
+app.include_router(scans.router)
+
+# Include the aliases router (Titel-Aliase für das Matching lokaler Dateien)
+app.include_router(aliases.router)
+
+# Include the media roots router (Medienwurzeln und zeitgesteuerte Scans)
+app.include_router(media_roots.router)
+
+# Include the covers router (Cover-Prefetch)
+app.include_router(covers.router)
+
+@app.on_event("startup")
+def start_scan_scheduler():
+    if settings.scan_scheduler_enabled:
+        media_roots.scheduler.start()
+
+@app.on_event("startup")
+def start_cover_prefetcher():
+    if settings.cover_prefetch_enabled:
+        cover_prefetcher.start()
+        db = SessionLocal()
+        try:
+            # Fehlende Cover aus früheren Importen nachladen
+            cover_prefetcher.enqueue_missing(db)
+        finally:
+            db.close()
+
+@app.on_event("startup")
+def start_cover_store_gc():
+    cover_store.start()
+
+@app.on_event("shutdown")
+def stop_scan_scheduler():
+    media_roots.scheduler.stop()
+
+@app.on_event("shutdown")
+def stop_cover_prefetcher():
+    cover_prefetcher.stop()
+
+@app.on_event("shutdown")
+def stop_cover_store_gc():
+    cover_store.stop()
+
+@app.on_event("shutdown")
+async def close_image_http():
+    await image_http.aclose()
+
 # Verzeichnis für gecachte Coverbilder
 os.makedirs("static/covers", exist_ok=True)
+os.makedirs(settings.image_cache_dir, exist_ok=True)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -60,71 +114,55 @@ def read_root():
 # app.include_router(routes.router)
 
 @app.get("/api/image-proxy")
-async def image_proxy(url: str, response: Response):
+async def image_proxy(url: str, if_none_match: Optional[str] = Header(None)):
     """
     Proxy für Bilder, die durch DDoS-Schutz geschützt sind.
-    Verwendet FlareSolverr, um die Bilder zu holen.
+    Lädt die Bilder über den gemeinsamen Bild-Fetcher (direkt, FlareSolverr,
+    Browser) mit asynchronem HTTP-Client, sodass viele Cover parallel geladen werden
+    können, ohne andere Anfragen zu blockieren.
+    
+    Geladene Bilder landen im Bild-Cache (Speicher und static/covers); bedingte
+    Anfragen mit passendem If-None-Match werden mit 304 beantwortet.
     
     Args:
         url: Die URL des zu proxenden Bildes (URL-encoded)
+        if_none_match: ETag einer früheren Antwort
     
     Returns:
         Das Bild als Binärdaten
     """
+    decoded_url = unquote(url)
     try:
-        # URL dekodieren
-        decoded_url = unquote(url)
-        logger.info(f"Proxying image from: {decoded_url}")
-        
-        # FlareSolverr verwenden, um das Bild zu holen
-        flaresolverr_url = "http://localhost:8191/v1"
-        payload = {
-            "cmd": "request.get",
-            "url": decoded_url,
-            "maxTimeout": 60000,
-            "responseType": "binary"
-        }
-        headers = {"Content-Type": "application/json"}
-        
-        flare_response = requests.post(flaresolverr_url, json=payload, headers=headers, timeout=60)
-        
-        if flare_response.status_code == 200:
-            data = flare_response.json()
-            if data.get("status") == "ok" and data.get("solution", {}).get("response"):
-                try:
-                    # Binäre Daten aus dem Base64-String extrahieren
-                    base64_response = data["solution"]["response"]
-                    image_data = base64.b64decode(base64_response)
-                    
-                    # Content-Type aus den Headers extrahieren
-                    content_type = data["solution"]["headers"].get("content-type", "image/png")
-                    
-                    # Response mit dem Bild zurückgeben
-                    response.headers["Content-Type"] = content_type
-                    response.headers["Cache-Control"] = "max-age=86400"  # 1 Tag cachen
-                    return Response(content=image_data, media_type=content_type)
-                except (base64.binascii.Error, ValueError, TypeError) as e:
-                    logger.error(f"Fehler beim Dekodieren der Base64-Antwort von FlareSolverr: {e}")
-                    logger.debug(f"FlareSolverr response content type: {type(base64_response)}")
-        
-        # Fallback auf direkte Methode
-        image_data = download_image(decoded_url)
-        if image_data:
-            # Content-Type aus dem Image bestimmen (vereinfacht)
-            content_type = "image/png" if decoded_url.endswith(".png") else "image/jpeg"
-            response.headers["Content-Type"] = content_type
-            response.headers["Cache-Control"] = "max-age=86400"  # 1 Tag cachen
-            return Response(content=image_data, media_type=content_type)
-            
-        # Wenn alles fehlschlägt, 404 zurückgeben
-        raise HTTPException(status_code=404, detail="Bild konnte nicht gefunden werden")
+        # Cache zuerst; gleichzeitige Anfragen für dasselbe Bild teilen sich einen Download
+        image = await image_fetcher.aload(decoded_url)
     except Exception as e:
-        logger.error(f"Fehler beim Proxen des Bildes: {str(e)}")
+        logger.error("Fehler beim Proxen des Bildes: %s", e)
         raise HTTPException(status_code=500, detail=f"Interner Serverfehler: {str(e)}")
+    
+    # Wenn alles fehlschlägt, 404 zurückgeben
+    if image is None:
+        raise HTTPException(status_code=404, detail="Bild konnte nicht gefunden werden")
+    
+    headers = {"ETag": image.etag, "Cache-Control": "max-age=86400"}  # 1 Tag cachen
+    if etag_matches(if_none_match, image.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=image.data, media_type=image.content_type, headers=headers)
 
 # Neue Route für Covers mit Caching
 @app.get("/api/cover/{anime_id}")
-def get_cover(anime_id: int, db=Depends(get_db)):
+def get_cover(anime_id: int, w: Optional[int] = None, v: Optional[str] = None,
+              accept: Optional[str] = Header(None), db=Depends(get_db)):
+    """
+    Liefert das Cover eines Animes aus dem lokalen Cache (lädt es beim ersten Abruf herunter).
+    
+    Args:
+        anime_id: ID des Animes
+        w: Gewünschte Breite in Pixeln; liefert eine verkleinerte Variante im besten
+            Format, das der Browser laut Accept-Header versteht (AVIF, WebP, JPEG)
+        v: Version aus /api/covers/batch; passt sie zur aktuellen Cover-URL, darf der
+            Browser die Antwort dauerhaft cachen
+        accept: Accept-Header der Anfrage
+    """
     anime = crud.get_anime(db, anime_id)
     if not anime:
         raise HTTPException(status_code=404, detail="Anime nicht gefunden")
@@ -134,20 +172,27 @@ def get_cover(anime_id: int, db=Depends(get_db)):
 
     # Hash für Dateinamen
     filename_hash = hash_url(anime.cover_image_url)
-    local_path = os.path.join("static", "covers", f"{filename_hash}.png")
-
-    # Wenn Datei nicht existiert, herunterladen
-    if not os.path.exists(local_path):
-        data = download_or_proxy(anime.cover_image_url)
-        if not data:
-            raise HTTPException(status_code=502, detail="Cover konnte nicht geladen werden")
-        with open(local_path, "wb") as f:
-            f.write(data)
-        # Pfad in DB speichern (optional)
-        anime.cover_local_path = local_path
-        db.commit()
-
-    return FileResponse(local_path, media_type="image/png")
+
+    # Wenn Datei nicht existiert, herunterladen (meist hat der Prefetcher das schon erledigt)
+    local_path = cache_cover(db, anime)
+    if not local_path:
+        raise HTTPException(status_code=502, detail="Cover konnte nicht geladen werden")
+
+    headers = {}
+    if v and v == cover_version(filename_hash):
+        # Versionierte URL: eine neue Cover-URL ergibt eine neue Version
+        headers["Cache-Control"] = "public, max-age=31536000, immutable"
+
+    if w:
+        variant = get_cover_variant(local_path, filename_hash, w, accept)
+        if variant:
+            variant_path, media_type = variant
+            # Gleiche URL, je nach Accept-Header anderes Format
+            return FileResponse(variant_path, media_type=media_type, headers={**headers, "Vary": "Accept"})
+
+    with open(local_path, "rb") as f:
+        media_type = guess_image_type(f.read(16))
+    return FileResponse(local_path, media_type=media_type, headers=headers)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,84 @@
+"""Add title_aliases table and migrate hard-coded title mappings
+
+Revision ID: 0b7d4e2c9a15
+Revises: f2a9c6e4d813
+Create Date: 2026-10-19 16:22:48.130574
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7d4e2c9a15'
+down_revision: Union[str, None] = 'f2a9c6e4d813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Bisher fest im Code hinterlegte Mappings (Alias -> normalisierter Zieltitel)
+LEGACY_TITLE_MAPPINGS = {
+    "a certain magical index": "toaru majutsu no index",
+    "index die zauberin": "toaru majutsu no index",
+    "to aru majutsu no index": "toaru majutsu no index",
+    "a certain scientific railgun": "toaru kagaku no railgun",
+    "railgun": "toaru kagaku no railgun",
+    "to love ru": "to-love-ru trouble",
+    "to love ru trouble": "to-love-ru trouble",
+    "to love ru darkness": "to-love-ru trouble darkness",
+    "to loveru": "to-love-ru trouble",
+    "to loveru trouble": "to-love-ru trouble",
+    "to loveru darkness": "to-love-ru trouble darkness",
+}
+
+
+def _normalize(title):
+    """Entspricht normalize_title() ohne die entfernten Mappings."""
+    normalized = re.sub(r'[^\w\s]', '', (title or "").lower())
+    return re.sub(r'\s+', ' ', normalized).strip()
+
+
+def migrate_title_mappings(connection):
+    """Legt für die alten Mappings Aliase auf die passenden vorhandenen Animes an."""
+    animes = connection.execute(text("SELECT id, titel_de FROM animes ORDER BY id")).fetchall()
+    for alias, target in LEGACY_TITLE_MAPPINGS.items():
+        # Die alten Zieltitel enthielten Bindestriche, die normalisierte Datenbanktitel nicht haben
+        target_normalized = _normalize(target)
+        is_darkness = 'darkness' in alias
+        for anime_id, titel_de in animes:
+            normalized = _normalize(titel_de)
+            # Ersatz für das frühere Spezial-Matching: "to love" mit gleicher Darkness-Zugehörigkeit
+            if normalized == target_normalized or (
+                    'to love' in alias and 'to love' in normalized and ('darkness' in normalized) == is_darkness):
+                connection.execute(
+                    text("INSERT INTO title_aliases (alias, anime_id, created_at) VALUES (:alias, :anime_id, CURRENT_TIMESTAMP)"),
+                    {"alias": alias, "anime_id": anime_id}
+                )
+                break
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('title_aliases',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('alias', sa.String(length=255), nullable=False),
+    sa.Column('anime_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['anime_id'], ['animes.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('alias')
+    )
+    op.create_index(op.f('ix_title_aliases_id'), 'title_aliases', ['id'], unique=False)
+    op.create_index(op.f('ix_title_aliases_anime_id'), 'title_aliases', ['anime_id'], unique=False)
+
+    migrate_title_mappings(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_title_aliases_anime_id'), table_name='title_aliases')
+    op.drop_index(op.f('ix_title_aliases_id'), table_name='title_aliases')
+    op.drop_table('title_aliases')
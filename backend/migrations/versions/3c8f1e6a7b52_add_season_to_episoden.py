@@ -0,0 +1,34 @@
+"""Add season and absolute number to episoden
+
+Revision ID: 3c8f1e6a7b52
+Revises: 0b7d4e2c9a15
+Create Date: 2026-10-19 16:42:10.318214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8f1e6a7b52'
+down_revision: Union[str, None] = '0b7d4e2c9a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('episoden', sa.Column('staffel', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('episoden', sa.Column('absolute_nummer', sa.Integer(), nullable=True))
+    # Bisher gab es nur eine Staffel je Anime; die Nummer war damit bereits absolut
+    op.execute("UPDATE episoden SET absolute_nummer = episoden_nummer")
+    op.create_index('ix_episoden_anime_staffel_nummer', 'episoden', ['anime_id', 'staffel', 'episoden_nummer'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_episoden_anime_staffel_nummer', table_name='episoden')
+    op.drop_column('episoden', 'absolute_nummer')
+    op.drop_column('episoden', 'staffel')
@@ -0,0 +1,50 @@
+"""Add media_roots table
+
+Revision ID: 7d2e5a9c4f18
+Revises: 3c8f1e6a7b52
+Create Date: 2026-10-19 18:20:37.604519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e5a9c4f18'
+down_revision: Union[str, None] = '3c8f1e6a7b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('media_roots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('path', sa.String(length=500), nullable=False),
+    sa.Column('include_globs', sa.JSON(), nullable=True),
+    sa.Column('exclude_globs', sa.JSON(), nullable=True),
+    sa.Column('extensions', sa.JSON(), nullable=True),
+    sa.Column('scan_interval_minutes', sa.Integer(), nullable=True),
+    sa.Column('workers', sa.Integer(), nullable=False, server_default='1'),
+    sa.Column('io_workers', sa.Integer(), nullable=True),
+    sa.Column('create_missing', sa.Boolean(), nullable=False, server_default=sa.true()),
+    sa.Column('hash_mode', sa.String(length=10), nullable=True),
+    sa.Column('probe_media', sa.Boolean(), nullable=True),
+    sa.Column('enabled', sa.Boolean(), nullable=False, server_default=sa.true()),
+    sa.Column('last_scan_at', sa.DateTime(), nullable=True),
+    sa.Column('last_scan_status', sa.String(length=20), nullable=True),
+    sa.Column('last_job_id', sa.String(length=32), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_media_roots_id'), 'media_roots', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_media_roots_id'), table_name='media_roots')
+    op.drop_table('media_roots')
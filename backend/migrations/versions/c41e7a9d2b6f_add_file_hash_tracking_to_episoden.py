@@ -0,0 +1,41 @@
+"""Add file hash tracking to episoden
+
+Revision ID: c41e7a9d2b6f
+Revises: 4a45d02b028d
+Create Date: 2026-10-19 09:12:37.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7a9d2b6f'
+down_revision: Union[str, None] = '4a45d02b028d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Dateien über 2 GB passen nicht in INT
+    op.alter_column('episoden', 'file_size',
+               existing_type=sa.Integer(),
+               type_=sa.BigInteger(),
+               existing_nullable=True)
+    op.add_column('episoden', sa.Column('file_mtime', sa.BigInteger(), nullable=True))
+    op.add_column('episoden', sa.Column('hash_mode', sa.String(length=10), nullable=True))
+    op.create_index(op.f('ix_episoden_file_hash'), 'episoden', ['file_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_episoden_file_hash'), table_name='episoden')
+    op.drop_column('episoden', 'hash_mode')
+    op.drop_column('episoden', 'file_mtime')
+    op.alter_column('episoden', 'file_size',
+               existing_type=sa.BigInteger(),
+               type_=sa.Integer(),
+               existing_nullable=True)
@@ -0,0 +1,30 @@
+"""Add media probe cache to episoden
+
+Revision ID: e5b8d3f01a27
+Revises: c41e7a9d2b6f
+Create Date: 2026-10-19 11:40:05.263118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8d3f01a27'
+down_revision: Union[str, None] = 'c41e7a9d2b6f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('episoden', sa.Column('probe_size', sa.BigInteger(), nullable=True))
+    op.add_column('episoden', sa.Column('probe_mtime', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('episoden', 'probe_mtime')
+    op.drop_column('episoden', 'probe_size')
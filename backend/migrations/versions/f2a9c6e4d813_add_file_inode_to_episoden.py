@@ -0,0 +1,28 @@
+"""Add file inode to episoden
+
+Revision ID: f2a9c6e4d813
+Revises: e5b8d3f01a27
+Create Date: 2026-10-19 14:05:51.907342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a9c6e4d813'
+down_revision: Union[str, None] = 'e5b8d3f01a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('episoden', sa.Column('file_inode', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('episoden', 'file_inode')
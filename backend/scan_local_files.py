@@ -3,188 +3,133 @@
 
 import os
 import re
+import json
 import logging
 import argparse
+import time
 import sys
-from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Dict, Optional, Set, Tuple
 from datetime import datetime
 
 # SQLAlchemy und Datenbankmodelle importieren
-from sqlalchemy import create_engine, or_
+from sqlalchemy import create_engine, func, or_
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 
 # Projekt-spezifische Importe
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from app.models import Anime, Episode, EpisodeAvailabilityStatus
+from app.models import Anime, Episode, AnimeStatus, EpisodeStatus, EpisodeAvailabilityStatus, MediaRoot, TitleAlias
 from app.database import SessionLocal, get_db
+from app.config import settings
 from app import crud
+from app.scanner import ParsedFile, ScanSummary, parse_filename
+from app.scanner.pipeline import PathFilter, iter_media_files, iter_parsed_batches
+from app.scanner.jobs import ScanProgress
+from app.scanner.hashing import FileHasher, is_hash_current
+from app.scanner.probe import MediaProber
+from app.scanner.reconcile import KnownFile, diff_manifest, match_moved_files, stat_files
+from app.scanner.matching import TitleSnapshot
+from app.scanner.plan import ScanPlan
+from app.scanner.candidates import CandidateIndex, build_unmatched_report
+from app.scanner.report import ProgressReporter, build_run_summary
+from app.scanner.seasons import DEFAULT_SEASON, SeasonLayout, assign_absolute_numbers
+from app.scanner.titles import normalize_title
 
-# Logger konfigurieren
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Verschiedene Regex-Patterns für das Parsen von Dateinamen
-PATTERNS = [
-    # Pattern 1: [Gruppe] Anime Name - Episode [Qualität].Erweiterung
-    r'\[(?P<group>[^\]]+)\]\s*(?P<title>[^-]+)-\s*(?P<episode>\d+)(?:\s*v\d+)?\s*(?:\[(?P<quality>[^\]]+)\])?\..+',
-    
-    # Pattern 2: Anime Name - Episode.Erweiterung
-    r'(?P<title>[^-]+)-\s*(?P<episode>\d+)(?:\s*v\d+)?\..+',
-    
-    # Pattern 3: Anime Name EpisodeErweiterung (ohne Trennzeichen)
-    r'(?P<title>.*?)(?P<episode>\d{2,3})(?:v\d+)?\.(?P<ext>[a-zA-Z0-9]+)$',
-    
-    # Pattern 4: Anime.Name.S01E01.Info.Erweiterung (TV-Format mit Punkten)
-    r'(?P<title>.*?)\.S\d+E(?P<episode>\d+)\..*?\.(?P<ext>[a-zA-Z0-9]+)$',
-    
-    # Pattern 5: Anime Name S01E01.Erweiterung (TV-Format mit Leerzeichen)
-    r'(?P<title>.*?)\sS\d+E(?P<episode>\d+)\.(?P<ext>[a-zA-Z0-9]+)$',
-
-    # Pattern 6: Anime Name/Season 01/EpisodeX.Erweiterung (Basierend auf Verzeichnisstruktur)
-    r'.*?/(?P<title>.*?)/Season\s+\d+/.*?(?P<episode>\d+).*\.(?P<ext>[a-zA-Z0-9]+)$',
-]
-
-def parse_filename(filename: str) -> Optional[Dict[str, str]]:
+def load_title_snapshot(db: Session) -> TitleSnapshot:
     """
-    Versucht, den Anime-Titel und die Episodennummer aus einem Dateinamen zu extrahieren.
+    Lädt die Titel aller Animes als Momentaufnahme für das Matching im Speicher.
     
     Args:
-        filename: Der zu parsende Dateiname
+        db: Die Datenbankverbindung
         
     Returns:
-        Ein Dictionary mit 'title' und 'episode', oder None, wenn das Parsing fehlschlägt
+        TitleSnapshot mit (id, titel_de, synonyme, local_path) aller Animes und allen Aliasen
     """
-    basename = os.path.basename(filename)
-    logger.debug(f"Versuche Datei zu parsen: {filename}")
-    
-    # Spezialfall: Extrahiere den Anime-Titel aus dem übergeordneten Verzeichnis
-    # (für Dateien, die in einem Verzeichnis mit dem Anime-Namen liegen)
-    try:
-        # Versuche, den Anime-Namen aus dem Verzeichnisnamen zu extrahieren
-        anime_dir = os.path.basename(os.path.dirname(os.path.dirname(filename)))
-        logger.debug(f"Extrahierter Anime-Ordnername: {anime_dir}")
-        
-        if anime_dir and anime_dir != "Anime":
-            # Versuche, die Episodennummer aus dem Dateinamen zu extrahieren
-            # Für TV-Format (S01E01)
-            ep_match = re.search(r'S\d+E(\d{1,3})', basename)
-            if ep_match:
-                episode = int(ep_match.group(1))
-                logger.debug(f"Aus Verzeichnis geparst mit TV-Format: {filename} -> Titel: {anime_dir}, Episode: {episode}")
-                return {'title': anime_dir, 'episode': episode}
-            
-            # Alternativ: Versuche einfach eine Zahl zu finden
-            ep_match = re.search(r'[^0-9](\d{1,3})[^0-9]', basename)
-            if ep_match:
-                episode = int(ep_match.group(1))
-                logger.debug(f"Aus Verzeichnis geparst mit Zahlenmuster: {filename} -> Titel: {anime_dir}, Episode: {episode}")
-                return {'title': anime_dir, 'episode': episode}
-    except Exception as e:
-        logger.debug(f"Fehler beim Parsen des Verzeichnisnamens: {e}")
-    
-    # Versuche zuerst Pattern, die auf dem vollen Pfad basieren (für Verzeichnisstruktur-basiertes Matching)
-    for pattern in [p for p in PATTERNS if '/' in p]:
-        match = re.match(pattern, filename)
-        if match:
-            data = match.groupdict()
-            # Titel bereinigen
-            if 'title' in data:
-                data['title'] = data['title'].strip().replace('.', ' ')
-            # Episodennummer in Integer umwandeln
-            if 'episode' in data:
-                data['episode'] = int(data['episode'])
-            logger.debug(f"Geparst mit Verzeichnispattern: {filename} -> {data}")
-            return data
-    
-    # Dann versuche die restlichen Pattern mit dem Basisnamen
-    for i, pattern in enumerate([p for p in PATTERNS if '/' not in p]):
-        logger.debug(f"Versuche Pattern {i+1}: {pattern} auf {basename}")
-        match = re.match(pattern, basename)
-        if match:
-            data = match.groupdict()
-            # Titel bereinigen
-            if 'title' in data:
-                data['title'] = data['title'].strip().replace('.', ' ')
-            # Episodennummer in Integer umwandeln
-            if 'episode' in data:
-                data['episode'] = int(data['episode'])
-            logger.debug(f"Geparst mit Pattern {i+1}: {basename} -> {data}")
-            return data
-    
-    # Für Dateien mit speziellem TV-Format, extrahiere manuell
-    if re.search(r'S\d+E\d+', basename):
-        # Extrahiere den Teil vor S01E01 als Titel
-        title_match = re.match(r'(.*?)\.S\d+E\d+', basename)
-        if title_match:
-            title = title_match.group(1).replace('.', ' ')
-            # Extrahiere die Episodennummer
-            ep_match = re.search(r'S\d+E(\d+)', basename)
-            if ep_match:
-                episode = int(ep_match.group(1))
-                logger.debug(f"Manuell geparst: {basename} -> Titel: {title}, Episode: {episode}")
-                return {'title': title, 'episode': episode}
-    
-    logger.warning(f"Konnte Datei nicht parsen: {basename}")
-    return None
+    rows = db.query(Anime.id, Anime.titel_de, Anime.synonyme, Anime.local_path).order_by(Anime.id).all()
+    aliases = db.query(TitleAlias.alias, TitleAlias.anime_id).all()
+    logger.debug("Anzahl der Animes in der Datenbank: %s, Aliase: %s", len(rows), len(aliases))
+    return TitleSnapshot(rows, aliases)
 
-# Bekannte Titel-Mappings zwischen englischen/deutschen und japanischen Titeln
-TITLE_MAPPINGS = {
-    "a certain magical index": "toaru majutsu no index",
-    "index die zauberin": "toaru majutsu no index",
-    "to aru majutsu no index": "toaru majutsu no index",
-    "a certain scientific railgun": "toaru kagaku no railgun",
-    "railgun": "toaru kagaku no railgun",
-    "to love ru": "to-love-ru trouble",
-    "to love ru trouble": "to-love-ru trouble",
-    "to love ru darkness": "to-love-ru trouble darkness",
-    "to loveru": "to-love-ru trouble",
-    "to loveru trouble": "to-love-ru trouble",
-    "to loveru darkness": "to-love-ru trouble darkness",
-}
-
-def normalize_title(title: str) -> str:
-    """
-    Normalisiert einen Titel für den Vergleich (Kleinbuchstaben, keine Sonderzeichen).
+def load_season_layout(db: Session) -> SeasonLayout:
+    """
+    Lädt die höchste Episodennummer je Anime und Staffel (eine gruppierte Abfrage).
     
     Args:
-        title: Der zu normalisierende Titel
+        db: Die Datenbankverbindung
         
     Returns:
-        Normalisierter Titel
+        SeasonLayout für die Zuordnung von Dateien ohne Staffelangabe
     """
-    if not title:
-        return ""
+    return SeasonLayout(
+        db.query(Episode.anime_id, Episode.staffel, func.max(Episode.episoden_nummer))
+        .group_by(Episode.anime_id, Episode.staffel)
+        .all()
+    )
+
+def match_parsed_file(titles: TitleSnapshot, parsed_data: ParsedFile,
+                      normalized_title: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Ordnet eine geparste Datei einem Anime zu und bestimmt ihre Staffel.
     
-    # Zu Kleinbuchstaben konvertieren und Sonderzeichen entfernen
-    normalized = re.sub(r'[^\w\s]', '', title.lower())
-    normalized = re.sub(r'\s+', ' ', normalized).strip()
+    Hat eine Staffel größer 1 einen eigenen Eintrag (z.B. "Vinland Saga Season 2"),
+    gewinnt dieser; die Datei zählt dann als Staffel 1 dieses Eintrags.
     
-    logger.debug(f"Normalisierter Titel: '{title}' -> '{normalized}'")
+    Args:
+        titles: Die Titel-Momentaufnahme
+        parsed_data: Das Ergebnis von parse_filename
+        normalized_title: Bereits normalisierter Titel, falls vorhanden
+        
+    Returns:
+        Tuple (anime_id oder None, Staffel oder None, wenn die Datei keine Staffel angibt)
+    """
+    season = parsed_data.season
+    if season is not None and season > DEFAULT_SEASON:
+        if normalized_title is None:
+            normalized_title = normalize_title(parsed_data.title)
+        anime_id = titles.match_season(normalized_title, season)
+        if anime_id is not None:
+            return anime_id, DEFAULT_SEASON
+    return titles.match(parsed_data.title, normalized_title), season
+
+def build_candidate_index(db: Session) -> CandidateIndex:
+    """
+    Baut den Trigramm-Index für Vorschläge zu nicht zugeordneten Dateien.
     
-    # Bekannte Titel-Mappings anwenden
-    if normalized in TITLE_MAPPINGS:
-        mapped = TITLE_MAPPINGS[normalized]
-        logger.debug(f"Titel-Mapping angewendet: '{normalized}' -> '{mapped}'")
-        return mapped
+    Args:
+        db: Die Datenbankverbindung
+        
+    Returns:
+        CandidateIndex über Titel und Synonyme aller Animes
+    """
+    return CandidateIndex(db.query(Anime.id, Anime.titel_de, Anime.synonyme).all())
+
+def catalog_version(db: Session) -> Tuple:
+    """
+    Kennung des Titelbestands, um zwischengespeicherte Indizes zu verwerfen.
     
-    # Zusätzlich: Versuche eine flexiblere Matching-Strategie für bestimmte Muster
-    if 'to love' in normalized:
-        logger.debug(f"'to love' gefunden in '{normalized}', versuche flexibles Matching")
-        if 'darkness' in normalized:
-            return "to-love-ru trouble darkness"
-        else:
-            return "to-love-ru trouble"
+    Neue, gelöschte oder geänderte Animes sowie neue und gelöschte Aliase ändern die Kennung.
     
-    return normalized
+    Args:
+        db: Die Datenbankverbindung
+        
+    Returns:
+        Tupel aus Anzahl, höchster ID und letzter Änderung der Animes sowie Anzahl und höchster ID der Aliase
+    """
+    animes = db.query(func.count(Anime.id), func.max(Anime.id), func.max(Anime.updated_at)).one()
+    aliases = db.query(func.count(TitleAlias.id), func.max(TitleAlias.id)).one()
+    return tuple(animes) + tuple(aliases)
 
-def find_matching_anime(db: Session, title: str) -> Optional[Anime]:
+def find_matching_anime(db: Session, title: str, normalized_title: Optional[str] = None) -> Optional[Anime]:
     """
     Sucht nach einem passenden Anime in der Datenbank.
     
     Args:
         db: Die Datenbankverbindung
         title: Der zu suchende Anime-Titel
+        normalized_title: Bereits normalisierter Titel (z.B. aus der Parser-Stufe der Pipeline)
         
     Returns:
         Das Anime-Objekt oder None, wenn kein passender Anime gefunden wurde
@@ -192,78 +137,9 @@ def find_matching_anime(db: Session, title: str) -> Optional[Anime]:
     if not title:
         return None
     
-    logger.debug(f"Suche nach Anime-Titel: '{title}'")
-    
-    # Normalisiere den Eingabetitel
-    normalized_title = normalize_title(title)
-    
-    # Alle Anime aus der Datenbank abrufen für Debugging
-    all_anime = db.query(Anime).all()
-    logger.debug(f"Anzahl der Animes in der Datenbank: {len(all_anime)}")
-    if len(all_anime) <= 30:  # Nur anzeigen, wenn nicht zu viele
-        logger.debug(f"Anime-Titel in der Datenbank: {[a.titel for a in all_anime]}")
-    
-    # 1. Exakte Übereinstimmung mit normalisiertem Titel
-    for a in all_anime:
-        db_title_normalized = normalize_title(a.titel)
-        logger.debug(f"Vergleiche: '{normalized_title}' mit '{db_title_normalized}' (Original: '{a.titel}')")
-        
-        if normalized_title == db_title_normalized:
-            logger.info(f"Exakte Übereinstimmung gefunden: '{title}' -> '{a.titel}'")
-            return a
-    
-    # 2. Teilstring-Suche mit normalisiertem Titel
-    for a in all_anime:
-        db_title_normalized = normalize_title(a.titel)
-        if normalized_title in db_title_normalized or db_title_normalized in normalized_title:
-            logger.info(f"Teilstring-Übereinstimmung gefunden: '{title}' -> '{a.titel}'")
-            return a
-    
-    # 3. Suche in Synonymen (wenn vorhanden)
-    for a in all_anime:
-        if a.synonyme:
-            synonyms = [s.strip() for s in a.synonyme.split(',')]
-            logger.debug(f"Synonyme für '{a.titel}': {synonyms}")
-            
-            for synonym in synonyms:
-                synonym_normalized = normalize_title(synonym)
-                if normalized_title == synonym_normalized:
-                    logger.info(f"Übereinstimmung in Synonymen gefunden: '{title}' -> '{a.titel}' (Synonym: '{synonym}')")
-                    return a
-    
-    # 4. Spezial-Matching für bestimmte Titel (z.B. To Love Ru)
-    for a in all_anime:
-        # Für To Love Ru: Spezielle Logik anwenden
-        if 'to love' in normalized_title.lower() and 'to love' in normalize_title(a.titel).lower():
-            # Unterscheide zwischen Darkness und nicht-Darkness
-            is_input_darkness = 'darkness' in normalized_title.lower()
-            is_db_darkness = 'darkness' in normalize_title(a.titel).lower()
-            
-            if is_input_darkness == is_db_darkness:
-                logger.info(f"Spezial-Matching für To Love Ru gefunden: '{title}' -> '{a.titel}'")
-                return a
-    
-    # 5. Ähnlichkeitssuche für Verzeichnisnamen
-    # Wenn der Titel direkt aus einem Verzeichnisnamen kommt, versuche eine flexiblere Suche
-    if os.path.sep in title or title.count(' ') < 3:  # Wahrscheinlich ein Verzeichnisname
-        for a in all_anime:
-            # Prüfe auf Teilübereinstimmung in beide Richtungen mit kleineren Tokens
-            db_title_tokens = set(normalize_title(a.titel).split())
-            input_title_tokens = set(normalized_title.split())
-            
-            # Wenn mindestens 50% der Tokens übereinstimmen
-            common_tokens = db_title_tokens.intersection(input_title_tokens)
-            
-            logger.debug(f"Token-Vergleich für '{title}' vs '{a.titel}': " +
-                        f"Common: {common_tokens}, DB: {db_title_tokens}, Input: {input_title_tokens}")
-            
-            if common_tokens and (len(common_tokens) / len(db_title_tokens) > 0.5 or 
-                                  len(common_tokens) / len(input_title_tokens) > 0.5):
-                logger.info(f"Token-Übereinstimmung gefunden: '{title}' -> '{a.titel}'")
-                return a
-    
-    logger.warning(f"Kein passender Anime für '{title}' gefunden")
-    return None
+    logger.debug("Suche nach Anime-Titel: '%s'", title)
+    anime_id = load_title_snapshot(db).match(title, normalized_title)
+    return db.get(Anime, anime_id) if anime_id is not None else None
 
 def find_anime_files(directory: str, extensions: List[str] = None) -> List[str]:
     """
@@ -276,67 +152,130 @@ def find_anime_files(directory: str, extensions: List[str] = None) -> List[str]:
     Returns:
         Eine Liste von Pfaden zu Anime-Dateien
     """
-    if extensions is None:
-        extensions = ['mkv', 'mp4', 'avi']
+    return list(iter_media_files(directory, extensions))
+
+def next_availability_status(current_status: EpisodeAvailabilityStatus) -> Optional[EpisodeAvailabilityStatus]:
+    """
+    Ermittelt den Verfügbarkeitsstatus einer Episode, nachdem eine lokale Datei gefunden wurde.
+    
+    Args:
+        current_status: Der aktuelle Status der Episode
         
-    anime_files = []
+    Returns:
+        Der neue Status oder None, wenn die Episode bereits als lokal markiert ist
+    """
+    if current_status == EpisodeAvailabilityStatus.AVAILABLE_ONLINE:
+        # Episode ist online und lokal verfügbar
+        return EpisodeAvailabilityStatus.OWNED_AND_AVAILABLE_ONLINE
+    if current_status == EpisodeAvailabilityStatus.NOT_AVAILABLE:
+        # Episode ist nur lokal verfügbar
+        return EpisodeAvailabilityStatus.OWNED_LOCALLY
+    # Status bleibt unverändert, wenn Episode bereits als lokal markiert ist
+    return None
+
+def previous_availability_status(current_status: EpisodeAvailabilityStatus) -> Optional[EpisodeAvailabilityStatus]:
+    """
+    Ermittelt den Verfügbarkeitsstatus einer Episode, deren lokale Datei verschwunden ist.
     
-    for root, _, files in os.walk(directory):
-        for file in files:
-            ext = file.split('.')[-1].lower()
-            if ext in extensions:
-                anime_files.append(os.path.join(root, file))
-                
-    return anime_files
+    Args:
+        current_status: Der aktuelle Status der Episode
+        
+    Returns:
+        Der neue Status oder None, wenn die Episode nicht als lokal markiert ist
+    """
+    if current_status == EpisodeAvailabilityStatus.OWNED_AND_AVAILABLE_ONLINE:
+        return EpisodeAvailabilityStatus.AVAILABLE_ONLINE
+    if current_status == EpisodeAvailabilityStatus.OWNED_LOCALLY:
+        return EpisodeAvailabilityStatus.NOT_AVAILABLE
+    return None
 
-def update_episode_status(db: Session, anime: Anime, episode_number: int, file_path: str) -> None:
+def apply_episode_batch(db: Session, entries: List[Tuple[int, int, int, str]]) -> Tuple[int, int, int]:
     """
-    Aktualisiert den Status einer Episode in der Datenbank.
+    Schreibt die Episoden eines Chunks mit einer Abfrage und zwei Bulk-Operationen.
+    
+    Alle vorhandenen Episoden der betroffenen Animes werden in einer einzigen Abfrage
+    geladen (nur die benötigten Spalten, keine ORM-Objekte). Neue Episoden werden per
+    Bulk-Insert angelegt, vorhandene per Bulk-Update aktualisiert.
     
     Args:
         db: Die Datenbankverbindung
-        anime: Das Anime-Objekt
-        episode_number: Die Episodennummer
-        file_path: Der Pfad zur lokalen Datei
-    """
-    episode = db.query(Episode).filter(
-        Episode.anime_id == anime.id,
-        Episode.episoden_nummer == episode_number
-    ).first()
-    
-    if episode:
-        # Aktualisiere den Status basierend auf dem aktuellen Status
-        current_status = episode.availability_status
-        
-        if current_status == EpisodeAvailabilityStatus.AVAILABLE_ONLINE:
-            # Episode ist online und lokal verfügbar
-            new_status = EpisodeAvailabilityStatus.OWNED_AND_AVAILABLE_ONLINE
-        elif current_status == EpisodeAvailabilityStatus.NOT_AVAILABLE:
-            # Episode ist nur lokal verfügbar
-            new_status = EpisodeAvailabilityStatus.OWNED_LOCALLY
-        elif current_status in [EpisodeAvailabilityStatus.OWNED_LOCALLY, EpisodeAvailabilityStatus.OWNED_AND_AVAILABLE_ONLINE]:
-            # Status bleibt unverändert, wenn Episode bereits als lokal markiert ist
-            return
-            
-        episode.availability_status = new_status
-        episode.local_path = file_path
-        episode.zuletzt_aktualisiert_am = datetime.now()
-        
-        db.add(episode)
-        logger.info(f"Episode {episode_number} von '{anime.titel}' auf Status {new_status} aktualisiert")
-    else:
-        # Episode existiert noch nicht in der Datenbank, erstelle sie
-        new_episode = Episode(
-            anime_id=anime.id,
-            episoden_nummer=episode_number,
-            titel=f"Episode {episode_number}",  # Standard-Titel
-            local_path=file_path,
-            availability_status=EpisodeAvailabilityStatus.OWNED_LOCALLY
-        )
-        db.add(new_episode)
-        logger.info(f"Neue Episode {episode_number} für '{anime.titel}' erstellt (Lokal verfügbar)")
+        entries: Liste von (anime_id, season, episode_number, file_path)
+        
+    Returns:
+        Tuple (erstellt, aktualisiert, unverändert); der Aufrufer übernimmt die Zähler
+        erst nach erfolgreichem Commit in die Scan-Zusammenfassung
+    """
+    if not entries:
+        return 0, 0, 0
+    
+    # Ausstehende Objekte (z.B. von create_anime_from_parsed_data) sichtbar machen
+    db.flush()
+    
+    anime_ids = {anime_id for anime_id, _, _, _ in entries}
+    existing = {
+        (row.anime_id, row.staffel, row.episoden_nummer): row
+        for row in db.query(
+            Episode.id, Episode.anime_id, Episode.staffel, Episode.episoden_nummer,
+            Episode.local_path, Episode.availability_status
+        ).filter(Episode.anime_id.in_(anime_ids))
+    }
+    
+    inserts = []
+    updates = []
+    unchanged = 0
+    seen = set()
+    now = datetime.now()
+    for anime_id, season, episode_number, file_path in entries:
+        key = (anime_id, season, episode_number)
+        if key in seen:
+            # Mehrere Dateien für dieselbe Episode: die erste gewinnt
+            unchanged += 1
+            continue
+        seen.add(key)
+        
+        row = existing.get(key)
+        if row is None:
+            inserts.append({
+                'anime_id': anime_id,
+                'staffel': season,
+                'episoden_nummer': episode_number,
+                'titel': f"Episode {episode_number}",  # Standard-Titel
+                'local_path': file_path,
+                'availability_status': EpisodeAvailabilityStatus.OWNED_LOCALLY,
+            })
+            continue
+        
+        new_status = next_availability_status(row.availability_status)
+        if new_status is None:
+            unchanged += 1
+            continue
+        updates.append({
+            'id': row.id,
+            'availability_status': new_status,
+            'local_path': file_path,
+            'zuletzt_aktualisiert_am': now,
+        })
+    
+    if inserts:
+        db.bulk_insert_mappings(Episode, inserts)
+    if updates:
+        db.bulk_update_mappings(Episode, updates)
+    
+    logger.info("Chunk geschrieben: %s Episoden erstellt, %s aktualisiert", len(inserts), len(updates))
+    return len(inserts), len(updates), unchanged
+
+def get_anime_base_dir(file_path: str) -> str:
+    """
+    Ermittelt das Basisverzeichnis des Animes einer Datei (ein Verzeichnis höher,
+    wenn die Datei in einem Season-Verzeichnis liegt).
+    """
+    folder_path = os.path.dirname(file_path)
+    folder_name = os.path.basename(folder_path).lower()
+    if 'season' in folder_name or 'staffel' in folder_name:
+        return os.path.dirname(folder_path)
+    return folder_path
 
-def create_anime_from_parsed_data(db: Session, parsed_data: Dict[str, str], file_path: str) -> Optional[Anime]:
+def create_anime_from_parsed_data(db: Session, parsed_data: ParsedFile, file_path: str) -> Optional[Anime]:
     """
     Erstellt einen neuen Anime-Eintrag basierend auf lokalen Dateiinformationen.
     
@@ -350,23 +289,16 @@ def create_anime_from_parsed_data(db: Session, parsed_data: Dict[str, str], file
     """
     try:
         # Grundlegende Informationen aus dem Dateinamen extrahieren
-        title = parsed_data.get('title')
-        episode_number = parsed_data.get('episode')
+        title = parsed_data.title
+        episode_number = parsed_data.episode
         
         if not title or not episode_number:
-            logger.warning(f"Unvollständige Daten für Anime-Erstellung: {parsed_data}")
+            logger.warning("Unvollständige Daten für Anime-Erstellung: %s", parsed_data)
             return None
             
-        # Folder-Pfad ermitteln
-        folder_path = os.path.dirname(file_path)
-        
-        # Anime-Basisverzeichnis ermitteln (ein Verzeichnis höher, wenn es ein Season-Verzeichnis gibt)
-        if 'season' in os.path.basename(folder_path).lower():
-            anime_base_dir = os.path.dirname(folder_path)
-        else:
-            anime_base_dir = folder_path
+        anime_base_dir = get_anime_base_dir(file_path)
             
-        logger.info(f"Erstelle Anime aus lokaler Datei: {title}, Verzeichnis: {anime_base_dir}")
+        logger.info("Erstelle Anime aus lokaler Datei: %s, Verzeichnis: %s", title, anime_base_dir)
         
         # Neuen Anime erstellen
         anime = Anime(
@@ -375,14 +307,14 @@ def create_anime_from_parsed_data(db: Session, parsed_data: Dict[str, str], file
             local_path=anime_base_dir,
             auto_update=True,
             status=AnimeStatus.owned,  # Neuer Status für lokale Animes
-            hinzugefuegt_am=datetime.now(),
+            created_at=datetime.now(),
             last_scan_time=datetime.now()
         )
         
         db.add(anime)
         db.flush()  # ID generieren, ohne zu committen
         
-        logger.info(f"Anime '{title}' mit ID {anime.id} erstellt")
+        logger.info("Anime '%s' mit ID %s erstellt", title, anime.id)
         
         # Episode erstellen
         if episode_number:
@@ -394,205 +326,977 @@ def create_anime_from_parsed_data(db: Session, parsed_data: Dict[str, str], file
                 if os.path.exists(file_path):
                     file_size = os.path.getsize(file_path)
                 
-                # Versuche Auflösung und Codec aus dem Dateinamen zu extrahieren
-                resolution = None
-                codec = None
-                audio_format = None
-                
-                # Einfache Regex-Muster für Metadaten
-                resolution_match = re.search(r'(1080p|720p|480p|2160p|4K)', file_path)
-                if resolution_match:
-                    resolution = resolution_match.group(1)
-                    
-                codec_match = re.search(r'(x264|x265|h264|h265|AVC|HEVC)', file_path)
-                if codec_match:
-                    codec = codec_match.group(1)
-                    
-                audio_match = re.search(r'(AC3|DTS|AAC|FLAC|TrueHD)', file_path)
-                if audio_match:
-                    audio_format = audio_match.group(1)
-                
                 episode = Episode(
                     anime_id=anime.id,
+                    staffel=parsed_data.season if parsed_data.season is not None else DEFAULT_SEASON,
                     episoden_nummer=episode_number_int,
                     local_path=file_path,
                     file_size=file_size,
-                    resolution=resolution,
-                    codec=codec,
-                    audio_format=audio_format,
+                    resolution=parsed_data.resolution,
+                    codec=parsed_data.codec,
+                    audio_format=parsed_data.audio,
                     status=EpisodeStatus.owned,
                     availability_status=EpisodeAvailabilityStatus.OWNED_LOCALLY,
                     hinzugefuegt_am=datetime.now()
                 )
                 
                 db.add(episode)
-                logger.info(f"Episode {episode_number} für Anime '{title}' erstellt")
+                logger.info("Episode %s für Anime '%s' erstellt", episode_number, title)
                 
             except ValueError:
-                logger.error(f"Episodennummer '{episode_number}' konnte nicht in Integer konvertiert werden")
+                logger.error("Episodennummer '%s' konnte nicht in Integer konvertiert werden", episode_number)
         
         return anime
         
     except Exception as e:
-        logger.exception(f"Fehler beim Erstellen des Animes aus lokaler Datei: {str(e)}")
+        logger.exception("Fehler beim Erstellen des Animes aus lokaler Datei: %s", e)
         return None
 
-def find_matching_anime_by_path(db: Session, path: str) -> Optional[Anime]:
+def update_file_hashes(db: Session, file_paths: List[str], hasher: FileHasher, summary: ScanSummary) -> int:
     """
-    Sucht nach einem Anime mit dem angegebenen lokalen Pfad.
+    Berechnet die Inhalts-Hashes der Episoden eines Chunks.
+    
+    Dateien, deren Größe und Änderungszeit seit dem letzten Hashen unverändert sind,
+    werden übersprungen. Die übrigen werden im Thread-Pool des Hashers gelesen.
     
     Args:
-        db: Datenbankverbindung
-        path: Lokaler Pfad des Animes
+        db: Die Datenbankverbindung
+        file_paths: Pfade der im Chunk geschriebenen Dateien
+        hasher: Der FileHasher (bestimmt auch den Hash-Modus)
+        summary: Die Scan-Zusammenfassung, deren Zähler fortgeschrieben werden
         
     Returns:
-        Das Anime-Objekt oder None, wenn kein passender Anime gefunden wurde
+        Anzahl der gehashten Dateien
     """
-    try:
-        return db.query(Anime).filter(Anime.local_path == path).first()
-    except Exception as e:
-        logger.error(f"Fehler bei der Suche nach Anime mit Pfad '{path}': {str(e)}")
-        return None
+    if not file_paths:
+        return 0
+    
+    rows = db.query(
+        Episode.id, Episode.local_path, Episode.file_size, Episode.file_mtime,
+        Episode.file_hash, Episode.hash_mode
+    ).filter(Episode.local_path.in_(file_paths)).all()
+    
+    episode_ids_by_path: Dict[str, List[int]] = {}
+    for row in rows:
+        try:
+            stat = os.stat(row.local_path)
+        except OSError:
+            continue
+        if is_hash_current(row.file_hash, row.hash_mode, row.file_size, row.file_mtime,
+                           stat.st_size, int(stat.st_mtime), hasher.mode):
+            summary.unchanged_hashes += 1
+            continue
+        episode_ids_by_path.setdefault(row.local_path, []).append(row.id)
+    
+    results = hasher.hash_many(episode_ids_by_path)
+    updates = [
+        {
+            'id': episode_id,
+            'file_hash': file_hash,
+            'hash_mode': hasher.mode,
+            'file_size': size,
+            'file_mtime': mtime,
+        }
+        for path, (file_hash, size, mtime) in results.items()
+        for episode_id in episode_ids_by_path[path]
+    ]
+    if updates:
+        db.bulk_update_mappings(Episode, updates)
+    
+    summary.hashed_files += len(results)
+    return len(results)
+
+def update_media_info(db: Session, file_paths: List[str], prober: MediaProber, summary: ScanSummary) -> int:
+    """
+    Liest Auflösung, Video-Codec und Audio-Format aus den Container-Headern.
+    
+    Das Ergebnis wird zusammen mit Größe und Änderungszeit der Datei gespeichert; bei
+    unveränderter Datei wird sie beim nächsten Scan nicht erneut gelesen. Das gilt auch
+    für nicht unterstützte Formate.
+    
+    Args:
+        db: Die Datenbankverbindung
+        file_paths: Pfade der im Chunk geschriebenen Dateien
+        prober: Der MediaProber
+        summary: Die Scan-Zusammenfassung, deren Zähler fortgeschrieben werden
+        
+    Returns:
+        Anzahl der gelesenen Dateien
+    """
+    if not file_paths:
+        return 0
+    
+    rows = db.query(
+        Episode.id, Episode.local_path, Episode.probe_size, Episode.probe_mtime
+    ).filter(Episode.local_path.in_(file_paths)).all()
+    
+    episode_ids_by_path: Dict[str, List[int]] = {}
+    stats = {}
+    for row in rows:
+        try:
+            stat = os.stat(row.local_path)
+        except OSError:
+            continue
+        size, mtime = stat.st_size, int(stat.st_mtime)
+        if row.probe_size == size and row.probe_mtime == mtime:
+            summary.unchanged_probes += 1
+            continue
+        episode_ids_by_path.setdefault(row.local_path, []).append(row.id)
+        stats[row.local_path] = (size, mtime)
+    
+    results = prober.probe_many(episode_ids_by_path)
+    updates = []
+    for path, info in results.items():
+        size, mtime = stats[path]
+        values = {'probe_size': size, 'probe_mtime': mtime}
+        if info is not None:
+            # Nur ermittelte Werte übernehmen, vorhandene Angaben sonst behalten
+            for column, value in (('resolution', info.resolution),
+                                  ('codec', info.video_codec),
+                                  ('audio_format', info.audio_codec)):
+                if value:
+                    values[column] = value
+        updates.extend(dict(values, id=episode_id) for episode_id in episode_ids_by_path[path])
+    if updates:
+        db.bulk_update_mappings(Episode, updates)
+    
+    summary.probed_files += len(results)
+    return len(results)
+
+def _hash_candidates(paths: List[str], mode: str) -> Dict[str, str]:
+    """Hasht Kandidaten für den Abgleich verschobener Dateien im Modus des gespeicherten Hashes."""
+    with FileHasher(mode, settings.scan_hash_workers) as hasher:
+        return {path: result[0] for path, result in hasher.hash_many(paths).items()}
+
+def _same_episode_check(db: Session, rows_by_path: Dict[str, list]) -> Callable[[str, str], bool]:
+    """
+    Bestätigung für Zuordnungen nur über die Dateigröße: die neue Datei muss beim Matching
+    derselben Episode (Anime, Staffel, Episodennummer) zugeordnet werden wie die alte.
+    Titel und Staffeln werden erst beim ersten Kandidaten geladen.
+    """
+    snapshot = []
+    
+    def same_episode(old_path: str, new_path: str) -> bool:
+        parsed = parse_filename(new_path)
+        if not parsed or not parsed.title or not parsed.episode:
+            return False
+        if not snapshot:
+            snapshot.extend((load_title_snapshot(db), load_season_layout(db)))
+        titles, seasons = snapshot
+        anime_id, season = match_parsed_file(titles, parsed, None)
+        if anime_id is None:
+            anime_id = titles.match_path(get_anime_base_dir(new_path))
+        if anime_id is None:
+            return False
+        season, episode_number = seasons.resolve(anime_id, season, int(parsed.episode))
+        row = rows_by_path[old_path][0]
+        return (anime_id, season, episode_number) == (row.anime_id, row.staffel, row.episoden_nummer)
+    
+    return same_episode
 
-def scan_and_update(media_dir: str, db: Session, create_missing: bool = True) -> Tuple[int, int, int]:
+def known_local_paths(db: Session, media_dir: str, path_filter: Optional[PathFilter] = None) -> Set[str]:
+    """Bekannte Dateipfade der Episoden unterhalb von media_dir (innerhalb der Dateiauswahl)."""
+    prefix = os.path.join(media_dir, '')
+    return {
+        local_path for (local_path,) in db.query(Episode.local_path).filter(
+            Episode.local_path.startswith(prefix, autoescape=True))
+        if not path_filter or path_filter.accepts(local_path[len(prefix):].replace(os.sep, '/'))
+    }
+
+def stream_manifest(db: Session, media_dir: str, progress: ScanProgress, manifest: Set[str],
+                    reconcile: Callable[[Set[str]], Set[str]],
+                    path_filter: Optional[PathFilter] = None) -> Iterator[str]:
+    """
+    Walker-Stufe: reicht die Pfade sofort an den Parser weiter und sammelt dabei das Manifest.
+    
+    Walk und Parsen laufen damit überlappend. Pfade, die die Datenbank schon kennt,
+    gehen direkt weiter; unbekannte könnten verschobene Dateien sein und warten, bis
+    der Walk beendet ist und reconcile die Verschiebungen ermittelt hat. Sind noch
+    keine Dateien bekannt (z.B. beim ersten Scan), kann nichts verschoben sein und
+    alle Pfade gehen direkt weiter.
+    
+    Args:
+        db: Die Datenbankverbindung
+        media_dir: Das zu scannende Verzeichnis
+        progress: Fortschritt des Scans (zählt die gefundenen Dateien)
+        manifest: Wird mit allen gefundenen Pfaden gefüllt
+        reconcile: Abgleich nach dem Walk: (manifest) -> Pfade, die bereits einer Episode
+            zugeordnet wurden (verschobene Dateien) und nicht mehr geparst werden
+        path_filter: Optionale Dateiauswahl (Endungen, Include-/Exclude-Globs)
+    """
+    known = known_local_paths(db, media_dir, path_filter)
+    deferred = []
+    walked = progress.timed(iter_media_files(media_dir, path_filter=path_filter), "walk")
+    for path in progress.count_walked(walked):
+        manifest.add(path)
+        if known and path not in known:
+            deferred.append(path)
+            continue
+        yield path
+    reconciled = reconcile(manifest)
+    for path in deferred:
+        if path not in reconciled:
+            yield path
+
+def reconcile_moved_files(db: Session, media_dir: str, manifest: Set[str], summary: ScanSummary,
+                          dry_run: bool = False,
+                          path_filter: Optional[PathFilter] = None) -> Tuple[Dict[str, str], Set[str]]:
+    """
+    Gleicht die bekannten Dateipfade unterhalb von media_dir mit dem Manifest des Scans ab.
+    
+    Verschwundene Dateien werden neu aufgetauchten über Inode, Größe oder Inhalts-Hash
+    zugeordnet und die Pfade der Episoden direkt angepasst. Episoden, deren Datei
+    tatsächlich fehlt, verlieren ihren lokalen Status. Alle Vergleiche laufen als
+    Mengenoperationen im Speicher; die Datenbank wird einmal gelesen und per
+    Bulk-Update geschrieben.
+    
+    Args:
+        db: Die Datenbankverbindung
+        media_dir: Das gescannte Verzeichnis
+        manifest: Alle beim Scan gefundenen Dateipfade
+        summary: Die Scan-Zusammenfassung, deren Zähler fortgeschrieben werden
+        dry_run: Nur ermitteln, nichts schreiben
+        path_filter: Dateiauswahl des Scans; bekannte Dateien außerhalb der Auswahl
+            gelten nicht als verschwunden
+        
+    Returns:
+        Tuple (verschobene Dateien als alter Pfad -> neuer Pfad, tatsächlich verschwundene Pfade)
+    """
+    prefix = os.path.join(media_dir, '')
+    rows_by_path = {}
+    for row in db.query(
+        Episode.id, Episode.anime_id, Episode.staffel, Episode.episoden_nummer,
+        Episode.local_path, Episode.availability_status, Episode.file_inode,
+        Episode.file_size, Episode.probe_size, Episode.file_hash, Episode.hash_mode
+    ).filter(Episode.local_path.startswith(prefix, autoescape=True)):
+        if path_filter and not path_filter.accepts(row.local_path[len(prefix):].replace(os.sep, '/')):
+            continue
+        rows_by_path.setdefault(row.local_path, []).append(row)
+    
+    vanished_paths, appeared_paths = diff_manifest(rows_by_path, manifest)
+    if not vanished_paths:
+        return {}, set()
+    if not manifest:
+        # Vermutlich ist das Laufwerk nicht eingehängt; nichts herabstufen
+        logger.warning("Keine Dateien in %s gefunden, Abgleich verschwundener Dateien übersprungen", media_dir)
+        return {}, set()
+    
+    vanished = {}
+    for path in vanished_paths:
+        row = rows_by_path[path][0]
+        size = row.file_size if row.file_size is not None else row.probe_size
+        vanished[path] = KnownFile(path, row.file_inode, size, row.file_hash, row.hash_mode)
+    appeared = stat_files(appeared_paths)
+    moves = match_moved_files(vanished, appeared, _hash_candidates, _same_episode_check(db, rows_by_path))
+    
+    updates = []
+    now = datetime.now()
+    for old_path, new_path in moves.items():
+        for row in rows_by_path[old_path]:
+            updates.append({
+                'id': row.id,
+                'local_path': new_path,
+                'file_inode': appeared[new_path].inode,
+                'zuletzt_aktualisiert_am': now,
+            })
+    vanished_episodes = 0
+    gone_paths = vanished_paths - moves.keys()
+    for old_path in gone_paths:
+        for row in rows_by_path[old_path]:
+            values = {'id': row.id, 'local_path': None, 'file_inode': None, 'zuletzt_aktualisiert_am': now}
+            new_status = previous_availability_status(row.availability_status)
+            if new_status is not None:
+                values['availability_status'] = new_status
+            updates.append(values)
+            vanished_episodes += 1
+    if updates and not dry_run:
+        db.bulk_update_mappings(Episode, updates)
+    
+    summary.moved_files += len(moves)
+    summary.vanished_episodes += vanished_episodes
+    logger.info("Abgleich: %s Dateien verschoben/umbenannt, %s Episoden ohne lokale Datei",
+                len(moves), vanished_episodes)
+    return moves, gone_paths
+
+def record_file_inodes(db: Session, media_dir: str, manifest: Set[str]) -> None:
+    """
+    Speichert Inode (und fehlende Größe) der Episoden-Dateien, für die noch keine Inode bekannt ist.
+    
+    Args:
+        db: Die Datenbankverbindung
+        media_dir: Das gescannte Verzeichnis
+        manifest: Alle beim Scan gefundenen Dateipfade
+    """
+    prefix = os.path.join(media_dir, '')
+    rows = [
+        row for row in db.query(Episode.id, Episode.local_path, Episode.file_size).filter(
+            Episode.local_path.startswith(prefix, autoescape=True),
+            Episode.file_inode.is_(None)
+        )
+        if row.local_path in manifest
+    ]
+    found = stat_files({row.local_path for row in rows})
+    updates = []
+    for row in rows:
+        if row.local_path not in found:
+            continue
+        values = {'id': row.id, 'file_inode': found[row.local_path].inode}
+        if row.file_size is None:
+            values['file_size'] = found[row.local_path].size
+        updates.append(values)
+    if updates:
+        db.bulk_update_mappings(Episode, updates)
+
+def update_absolute_numbers(db: Session, anime_ids: Set[int]) -> int:
+    """
+    Schreibt die absoluten Episodennummern der angegebenen Animes fort.
+    
+    Pro Abfrage werden die Episoden von höchstens settings.scan_chunk_size Animes
+    geladen; geschrieben werden nur geänderte Nummern.
+    
+    Args:
+        db: Die Datenbankverbindung
+        anime_ids: Die beim Scan zugeordneten Animes
+        
+    Returns:
+        Anzahl der geänderten Episoden
+    """
+    ids = sorted(anime_id for anime_id in anime_ids if anime_id > 0)
+    changed = 0
+    for start in range(0, len(ids), settings.scan_chunk_size):
+        rows = db.query(
+            Episode.id, Episode.anime_id, Episode.staffel, Episode.episoden_nummer, Episode.absolute_nummer
+        ).filter(Episode.anime_id.in_(ids[start:start + settings.scan_chunk_size])).all()
+        numbers = assign_absolute_numbers(
+            (row.id, row.anime_id, row.staffel, row.episoden_nummer) for row in rows
+        )
+        updates = [
+            {'id': row.id, 'absolute_nummer': numbers[row.id]}
+            for row in rows if numbers[row.id] != row.absolute_nummer
+        ]
+        if updates:
+            db.bulk_update_mappings(Episode, updates)
+            changed += len(updates)
+    return changed
+
+def plan_episode_batch(db: Session, entries: List[Tuple[int, int, int, str]], titles: TitleSnapshot,
+                       plan: ScanPlan, summary: ScanSummary) -> None:
+    """
+    Gegenstück zu apply_episode_batch für Probeläufe: ermittelt, welche Episoden
+    angelegt oder aktualisiert würden, ohne etwas zu schreiben.
+    
+    Args:
+        db: Die Datenbankverbindung (nur lesend)
+        entries: Liste von (anime_id, season, episode_number, file_path); negative IDs sind verplante Animes
+        titles: Die Titel-Momentaufnahme (für die Ausgabe der Titel)
+        plan: Der Plan, in den die Episoden eingetragen werden
+        summary: Die Scan-Zusammenfassung, deren Zähler fortgeschrieben werden
+    """
+    anime_ids = {anime_id for anime_id, _, _, _ in entries if anime_id > 0}
+    existing = {}
+    if anime_ids:
+        existing = {
+            (row.anime_id, row.staffel, row.episoden_nummer): row.availability_status
+            for row in db.query(
+                Episode.anime_id, Episode.staffel, Episode.episoden_nummer, Episode.availability_status
+            ).filter(Episode.anime_id.in_(anime_ids))
+        }
+    
+    for anime_id, season, episode_number, _ in entries:
+        key = (anime_id, season, episode_number)
+        if key in plan.seen_episodes:
+            summary.unchanged_episodes += 1
+            continue
+        plan.seen_episodes.add(key)
+        
+        if key not in existing:
+            plan.add_episode(anime_id, titles.title_of(anime_id), season, episode_number, "inserted")
+            summary.inserted_episodes += 1
+        elif next_availability_status(existing[key]) is not None:
+            plan.add_episode(anime_id, titles.title_of(anime_id), season, episode_number, "updated")
+            summary.updated_episodes += 1
+        else:
+            summary.unchanged_episodes += 1
+
+def plan_scan(media_dir: str, db: Session, create_missing: bool = True, chunk_size: Optional[int] = None,
+              workers: int = 1, progress: Optional[ScanProgress] = None,
+              path_filter: Optional[PathFilter] = None) -> ScanPlan:
+    """
+    Probelauf von scan_and_update: Walker, Parser und Matching laufen vollständig,
+    die Datenbank wird aber nur gelesen.
+    
+    Das Matching erfolgt gegen eine einmal geladene Momentaufnahme der Titel. Neue
+    Animes werden nur verplant und für die folgenden Dateien in die Momentaufnahme
+    aufgenommen, damit das Ergebnis dem echten Scan entspricht.
+    
+    Args:
+        media_dir: Das zu scannende Verzeichnis
+        db: Die Datenbankverbindung (nur lesend)
+        create_missing: Wenn True, werden neue Animes für nicht zugeordnete Dateien verplant
+        chunk_size: Anzahl der Dateien pro Chunk (Standard: settings.scan_chunk_size)
+        workers: Anzahl der Parser-Prozesse
+        progress: Optionaler Fortschritt eines Scan-Jobs
+        path_filter: Optionale Dateiauswahl (Endungen, Include-/Exclude-Globs)
+        
+    Returns:
+        ScanPlan mit den geplanten Änderungen und der Laufzeit je Stufe
+    """
+    if chunk_size is None:
+        chunk_size = settings.scan_chunk_size
+    if progress is None:
+        progress = ScanProgress()
+    
+    plan = ScanPlan(timings=progress.timings)
+    progress.plan = plan
+    summary = progress.summary
+    matched_animes = progress.matched_anime_ids
+    plan.unmatched = progress.unmatched_files
+    logger.info("Starte Probelauf für Verzeichnis: %s (%s Parser-Prozesse)", media_dir, workers)
+    
+    with plan.stage("snapshot"):
+        titles = load_title_snapshot(db)
+        seasons = load_season_layout(db)
+    
+    def reconcile(manifest: Set[str]) -> Set[str]:
+        with plan.stage("reconcile"):
+            moves, gone_paths = reconcile_moved_files(db, media_dir, manifest, summary, dry_run=True,
+                                                      path_filter=path_filter)
+        plan.moved = sorted(moves.items())
+        plan.vanished = sorted(gone_paths)
+        return set(moves.values())
+    
+    manifest: Set[str] = set()
+    paths = stream_manifest(db, media_dir, progress, manifest, reconcile, path_filter)
+    batches = iter_parsed_batches(paths, chunk_size, workers)
+    while not progress.cancelled:
+        with plan.stage("parse"):
+            chunk = next(batches, None)
+        if chunk is None:
+            break
+        summary.total_files += len(chunk)
+        progress.files_parsed += len(chunk)
+        entries = []
+        
+        with plan.stage("match"):
+            for file_path, parsed_data, normalized_title in chunk:
+                if not parsed_data or not parsed_data.title or not parsed_data.episode:
+                    plan.unmatched.append(file_path)
+                    continue
+                
+                anime_id, season = match_parsed_file(titles, parsed_data, normalized_title)
+                if anime_id is None and create_missing:
+                    anime_base_dir = get_anime_base_dir(file_path)
+                    anime_id = titles.match_path(anime_base_dir)
+                    if anime_id is None:
+                        anime_id = plan.plan_anime(parsed_data.title, anime_base_dir)
+                        titles.add(anime_id, parsed_data.title, local_path=anime_base_dir)
+                        summary.created_animes += 1
+                
+                if anime_id is None:
+                    plan.unmatched.append(file_path)
+                    continue
+                season, episode_number = seasons.resolve(anime_id, season, int(parsed_data.episode))
+                entries.append((anime_id, season, episode_number, file_path))
+                matched_animes.add(anime_id)
+        
+        progress.files_matched += len(entries)
+        with plan.stage("diff"):
+            plan_episode_batch(db, entries, titles, plan, summary)
+        
+        summary.matched_animes = len(matched_animes)
+        summary.unmatched_files = len(plan.unmatched)
+    
+    # Der Probelauf darf keine Änderungen hinterlassen (auch keine autoflush-Reste)
+    db.rollback()
+    plan.finish()
+    progress.finished_at = time.monotonic()
+    
+    logger.info(
+        "Probelauf abgeschlossen: %s Dateien, %s neue Animes, %s neue Episoden, %s Aktualisierungen, "
+        "%s nicht zugeordnet, %s verschoben, %s verschwunden",
+        summary.total_files, summary.created_animes, summary.inserted_episodes, summary.updated_episodes,
+        summary.unmatched_files, summary.moved_files, summary.vanished_episodes
+    )
+    return plan
+
+def scan_and_update(media_dir: str, db: Session, create_missing: bool = True, chunk_size: Optional[int] = None,
+                    workers: int = 1, progress: Optional[ScanProgress] = None,
+                    hash_mode: Optional[str] = None, probe_media: Optional[bool] = None,
+                    dry_run: bool = False, path_filter: Optional[PathFilter] = None,
+                    io_workers: Optional[int] = None) -> ScanSummary:
     """
     Scannt das Medienverzeichnis und aktualisiert die Datenbank.
     
+    Die Dateien werden in Chunks verarbeitet; nach jedem Chunk werden die Episoden
+    gesammelt geschrieben und committet. Schlägt ein Chunk fehl, wird nur dieser
+    zurückgerollt und der Scan mit dem nächsten Chunk fortgesetzt.
+    
+    Mit workers > 1 läuft der Scan als Pipeline: ein Prozess-Pool parst Dateinamen
+    und normalisiert Titel, während dieser Prozess als einziger Writer Matching und
+    Schreibzugriffe übernimmt.
+    
+    Walk und Parsen laufen überlappend (stream_manifest). Nach dem Walk wird das
+    Manifest aller gefundenen Dateien mit den bekannten Pfaden abgeglichen
+    (reconcile_moved_files): verschobene Dateien behalten ihre Episode, verschwundene
+    verlieren den lokalen Status. Neue Dateien werden erst danach zugeordnet.
+    
     Args:
         media_dir: Das zu scannende Verzeichnis
         db: Die Datenbankverbindung
         create_missing: Wenn True, werden neue Animes erstellt, wenn keine Übereinstimmung gefunden wird
+        chunk_size: Anzahl der Dateien pro Commit (Standard: settings.scan_chunk_size)
+        workers: Anzahl der Parser-Prozesse
+        progress: Optionaler Fortschritt eines Scan-Jobs; wird laufend aktualisiert und
+            zwischen den Chunks auf Abbruch geprüft
+        hash_mode: "partial" oder "full" aktiviert das Hashen der Dateien (für die
+            Duplikaterkennung); None überspringt diese Stufe
+        probe_media: Container-Header für Auflösung, Codec und Audio-Format auslesen
+            (Standard: settings.scan_probe_media)
+        dry_run: Nur einen Plan erstellen (siehe plan_scan), nichts schreiben; der Plan
+            steht anschließend in progress.plan
+        path_filter: Optionale Dateiauswahl (Endungen, Include-/Exclude-Globs), z.B. aus
+            einer Medienwurzel
+        io_workers: Threads für Hashen und Auslesen der Container-Header (Standard:
+            settings.scan_hash_workers bzw. settings.scan_probe_workers); für langsame
+            Netzlaufwerke kleiner wählen
         
     Returns:
-        Tuple mit (gefundene Dateien, gefundene/erstellte Animes, aktualisierte Episoden)
+        ScanSummary mit den Zählern des Scans
     """
+    if dry_run:
+        if progress is None:
+            progress = ScanProgress()
+        plan_scan(media_dir, db, create_missing, chunk_size, workers, progress, path_filter)
+        return progress.summary
+    
+    if chunk_size is None:
+        chunk_size = settings.scan_chunk_size
+    if progress is None:
+        progress = ScanProgress()
+    
+    if probe_media is None:
+        probe_media = settings.scan_probe_media
+    
+    hasher = FileHasher(hash_mode, io_workers or settings.scan_hash_workers) if hash_mode else None
+    prober = MediaProber(io_workers or settings.scan_probe_workers) if probe_media else None
+    
     try:
-        logger.info(f"Starte Scan von Verzeichnis: {media_dir}")
-        anime_files = find_anime_files(media_dir)
-        logger.info(f"{len(anime_files)} Anime-Dateien gefunden in {media_dir}")
+        logger.info("Starte Scan von Verzeichnis: %s (%s Parser-Prozesse)", media_dir, workers)
         
-        matched_animes = set()
-        created_animes = 0
-        updated_episodes = 0
-        unmatched_files = []
+        summary = progress.summary
+        matched_animes = progress.matched_anime_ids
+        unmatched_files = progress.unmatched_files
+        # Titel, Aliase und Staffeln einmal laden; das Matching läuft danach nur im Speicher
+        with progress.stage("snapshot"):
+            titles = load_title_snapshot(db)
+            seasons = load_season_layout(db)
         
-        for file_path in anime_files:
+        def reconcile(manifest: Set[str]) -> Set[str]:
+            # Verschobene Dateien gehören bereits zu einer Episode und müssen nicht erneut zugeordnet werden
             try:
-                parsed_data = parse_filename(file_path)
-                if not parsed_data:
-                    unmatched_files.append(file_path)
-                    continue
-                    
-                title = parsed_data.get('title')
-                episode = parsed_data.get('episode')
-                
-                if not title or not episode:
-                    unmatched_files.append(file_path)
-                    continue
-                    
-                # Versuche zuerst die Datei einem Anime zuzuordnen
-                anime = find_matching_anime(db, title)
-                
-                # Wenn kein Anime gefunden wurde und create_missing aktiviert ist
-                if not anime and create_missing:
-                    # Prüfe, ob wir bereits einen Anime für dieses Verzeichnis erstellt haben
-                    folder_path = os.path.dirname(file_path)
-                    anime_base_dir = folder_path
+                with progress.stage("reconcile"):
+                    moves, _ = reconcile_moved_files(db, media_dir, manifest, summary, path_filter=path_filter)
+                    db.commit()
+                return set(moves.values())
+            except SQLAlchemyError as e:
+                logger.error("Datenbankfehler beim Abgleich verschobener Dateien: %s", e)
+                db.rollback()
+                return set()
+        
+        # Manifest aller Dateien für den Abgleich verschobener und verschwundener Dateien;
+        # es wird beim Walk gefüllt, während die ersten Chunks schon geparst werden
+        manifest: Set[str] = set()
+        pending = stream_manifest(db, media_dir, progress, manifest, reconcile, path_filter)
+        for chunk in progress.timed(iter_parsed_batches(pending, chunk_size, workers), "parse"):
+            if progress.cancelled:
+                logger.warning("Scan von %s abgebrochen nach %s Dateien", media_dir, summary.total_files)
+                break
+            summary.total_files += len(chunk)
+            progress.files_parsed += len(chunk)
+            entries = []
+            chunk_animes = set()
+            created_in_chunk = 0
+            match_started = time.perf_counter()
+            
+            for file_path, parsed_data, normalized_title in chunk:
+                try:
+                    if not parsed_data or not parsed_data.title or not parsed_data.episode:
+                        unmatched_files.append(file_path)
+                        continue
                     
-                    # Anime-Basisverzeichnis ermitteln (ein Verzeichnis höher, wenn es ein Season-Verzeichnis gibt)
-                    if 'season' in os.path.basename(folder_path).lower():
-                        anime_base_dir = os.path.dirname(folder_path)
+                    # Versuche zuerst die Datei einem Anime zuzuordnen
+                    anime_id, season = match_parsed_file(titles, parsed_data, normalized_title)
                     
-                    # Suche nach einem Anime mit diesem Pfad
-                    anime_by_path = find_matching_anime_by_path(db, anime_base_dir)
+                    # Wenn kein Anime gefunden wurde und create_missing aktiviert ist
+                    if anime_id is None and create_missing:
+                        anime_base_dir = get_anime_base_dir(file_path)
+                        
+                        anime_id = titles.match_path(anime_base_dir)
+                        
+                        if anime_id is None:
+                            # Erstelle einen neuen Anime (inklusive der ersten Episode)
+                            anime = create_anime_from_parsed_data(db, parsed_data, file_path)
+                            if anime:
+                                anime_id = anime.id
+                                titles.add(anime.id, anime.titel_de, local_path=anime_base_dir)
+                                created_in_chunk += 1
+                                logger.info("Neuer Anime '%s' erstellt aus Datei: %s", anime.titel_de, file_path)
                     
-                    if anime_by_path:
-                        # Verwende den existierenden Anime mit diesem Pfad
-                        anime = anime_by_path
-                        logger.info(f"Anime mit Pfad '{anime_base_dir}' gefunden: {anime.titel_de}")
+                    if anime_id is not None:
+                        season, episode_number = seasons.resolve(anime_id, season, int(parsed_data.episode))
+                        entries.append((anime_id, season, episode_number, file_path))
+                        chunk_animes.add(anime_id)
                     else:
-                        # Erstelle einen neuen Anime
-                        anime = create_anime_from_parsed_data(db, parsed_data, file_path)
-                        if anime:
-                            created_animes += 1
-                            logger.info(f"Neuer Anime '{anime.titel_de}' erstellt aus Datei: {file_path}")
-                
-                if anime:
-                    # Update der Episode
-                    if not any(ep.episoden_nummer == int(episode) and ep.local_path == file_path for ep in anime.episodes):
-                        update_episode_status(db, anime, int(episode), file_path)
-                        updated_episodes += 1
-                    
-                    matched_animes.add(anime.id)
-                else:
-                    logger.warning(f"Kein passender Anime für '{title}' gefunden")
-                    unmatched_files.append(file_path)
-            except Exception as e:
-                logger.error(f"Fehler bei der Verarbeitung von Datei {file_path}: {str(e)}")
-                # Fahre mit nächster Datei fort, anstatt den ganzen Prozess zu beenden
-                continue
-        
-        # Änderungen speichern
-        try:
-            logger.info("Speichere Änderungen in der Datenbank")
-            db.commit()
-        except SQLAlchemyError as e:
-            logger.error(f"Datenbankfehler beim Speichern der Änderungen: {str(e)}")
-            db.rollback()
-            raise
+                        logger.warning("Kein passender Anime für '%s' gefunden", parsed_data.title)
+                        unmatched_files.append(file_path)
+                except Exception as e:
+                    logger.error("Fehler bei der Verarbeitung von Datei %s: %s", file_path, e)
+                    # Fahre mit nächster Datei fort, anstatt den ganzen Prozess zu beenden
+                    continue
+            
+            progress.files_matched += len(entries)
+            # Enthält auch das Anlegen neuer Animes (einzelne Schreibzugriffe)
+            progress.timings["match"] = progress.timings.get("match", 0.0) + time.perf_counter() - match_started
+            
+            # Episoden des Chunks schreiben und committen
+            write_started = time.perf_counter()
+            try:
+                inserted, updated, unchanged = apply_episode_batch(db, entries)
+                db.commit()
+                progress.record_write(time.perf_counter() - write_started)
+                # Zähler erst nach dem Commit übernehmen, damit ein zurückgerollter Chunk nicht mitzählt
+                summary.inserted_episodes += inserted
+                summary.updated_episodes += updated
+                summary.unchanged_episodes += unchanged
+                summary.committed_chunks += 1
+                summary.created_animes += created_in_chunk
+                matched_animes.update(chunk_animes)
+                progress.files_written += len(entries)
+            except SQLAlchemyError as e:
+                logger.error("Datenbankfehler beim Speichern eines Chunks (%s Dateien): %s", len(chunk), e)
+                db.rollback()
+                summary.failed_chunks += 1
+                summary.failed_files += len(chunk)
+                # Im Chunk erstellte Animes wurden zurückgerollt
+                titles = load_title_snapshot(db)
+                entries = []
+            
+            # Optionale Stufen für die geschriebenen Dateien
+            written_paths = [path for _, _, _, path in entries]
+            if prober and written_paths:
+                try:
+                    with progress.stage("probe"):
+                        progress.files_probed += update_media_info(db, written_paths, prober, summary)
+                        db.commit()
+                except SQLAlchemyError as e:
+                    logger.error("Datenbankfehler beim Speichern der Stream-Eigenschaften: %s", e)
+                    db.rollback()
+            
+            if hasher and written_paths:
+                try:
+                    with progress.stage("hash"):
+                        progress.files_hashed += update_file_hashes(db, written_paths, hasher, summary)
+                        db.commit()
+                except SQLAlchemyError as e:
+                    logger.error("Datenbankfehler beim Speichern der Datei-Hashes: %s", e)
+                    db.rollback()
+            
+            summary.matched_animes = len(matched_animes)
+            summary.unmatched_files = len(unmatched_files)
+        
+        if not progress.cancelled:
+            try:
+                with progress.stage("inodes"):
+                    record_file_inodes(db, media_dir, manifest)
+                    db.commit()
+            except SQLAlchemyError as e:
+                logger.error("Datenbankfehler beim Speichern der Inodes: %s", e)
+                db.rollback()
+            try:
+                with progress.stage("absolute_numbers"):
+                    update_absolute_numbers(db, matched_animes)
+                    db.commit()
+            except SQLAlchemyError as e:
+                logger.error("Datenbankfehler beim Speichern der absoluten Episodennummern: %s", e)
+                db.rollback()
         
         # Nicht geparste Dateien loggen
         if unmatched_files:
-            logger.warning(f"{len(unmatched_files)} Dateien konnten nicht geparst oder keinem Anime zugeordnet werden:")
+            logger.warning("%s Dateien konnten nicht geparst oder keinem Anime zugeordnet werden:", len(unmatched_files))
             for file in unmatched_files[:10]:  # Nur die ersten 10 anzeigen, um die Ausgabe übersichtlich zu halten
-                logger.warning(f"  - {file}")
+                logger.warning("  - %s", file)
             if len(unmatched_files) > 10:
-                logger.warning(f"  ... und {len(unmatched_files) - 10} weitere")
+                logger.warning("  ... und %s weitere", len(unmatched_files) - 10)
         
-        total_animes = len(matched_animes)
-        logger.info(f"Scan abgeschlossen: {len(anime_files)} Dateien gefunden, {total_animes} Animes ({created_animes} neu erstellt), {updated_episodes} Episoden aktualisiert")
+        logger.info(
+            "Scan abgeschlossen: %s Dateien gefunden, %s Animes (%s neu erstellt), %s Episoden erstellt, "
+            "%s aktualisiert, %s unverändert, %s Chunks gespeichert, %s fehlgeschlagen (%s Dateien)",
+            summary.total_files, summary.matched_animes, summary.created_animes, summary.inserted_episodes,
+            summary.updated_episodes, summary.unchanged_episodes, summary.committed_chunks, summary.failed_chunks,
+            summary.failed_files
+        )
         
-        return len(anime_files), total_animes, updated_episodes
+        return summary
     except Exception as e:
-        logger.exception(f"Unerwarteter Fehler beim Scannen von {media_dir}: {str(e)}")
+        logger.exception("Unerwarteter Fehler beim Scannen von %s: %s", media_dir, e)
         raise
+    finally:
+        progress.finished_at = time.monotonic()
+        if hasher:
+            hasher.close()
+        if prober:
+            prober.close()
+
+def media_root_filter(root: MediaRoot) -> PathFilter:
+    """Dateiauswahl einer Medienwurzel (Endungen, Include- und Exclude-Globs)."""
+    return PathFilter(root.extensions, root.include_globs, root.exclude_globs)
+
+def scan_media_root(db: Session, root: MediaRoot, progress: Optional[ScanProgress] = None,
+                    dry_run: bool = False) -> ScanSummary:
+    """
+    Scannt eine Medienwurzel mit ihren eigenen Einstellungen.
+    
+    Args:
+        db: Die Datenbankverbindung
+        root: Die Medienwurzel
+        progress: Optionaler Fortschritt eines Scan-Jobs
+        dry_run: Nur einen Plan erstellen (steht anschließend in progress.plan)
+        
+    Returns:
+        ScanSummary mit den Zählern des Scans
+    """
+    return scan_and_update(
+        root.path, db,
+        create_missing=root.create_missing,
+        workers=max(1, root.workers or 1),
+        progress=progress,
+        hash_mode=root.hash_mode,
+        probe_media=root.probe_media,
+        dry_run=dry_run,
+        path_filter=media_root_filter(root),
+        io_workers=root.io_workers
+    )
+
+def _scan_root_in_session(root_id: int, dry_run: bool,
+                          on_start: Optional[Callable[[str, ScanProgress], None]] = None) -> Tuple[str, ScanProgress]:
+    """Scannt eine Medienwurzel mit eigener Datenbankverbindung (für parallele Scans)."""
+    db = SessionLocal()
+    try:
+        root = crud.get_media_root(db, root_id)
+        progress = ScanProgress()
+        if on_start:
+            on_start(root.name, progress)
+        if not os.path.isdir(root.path):
+            logger.error("Verzeichnis der Medienwurzel '%s' existiert nicht: %s", root.name, root.path)
+            if not dry_run:
+                crud.record_media_root_scan(db, root.id, "unavailable", started_at=datetime.now())
+            return root.name, progress
+        if not dry_run:
+            crud.record_media_root_scan(db, root.id, "running", started_at=datetime.now())
+        try:
+            scan_media_root(db, root, progress, dry_run=dry_run)
+        except Exception:
+            if not dry_run:
+                db.rollback()
+                crud.record_media_root_scan(db, root.id, "failed")
+            raise
+        if not dry_run:
+            crud.record_media_root_scan(db, root.id, "completed")
+        return root.name, progress
+    finally:
+        db.close()
+
+def scan_media_roots(root_ids: List[int], dry_run: bool = False,
+                     on_start: Optional[Callable[[str, ScanProgress], None]] = None) -> Dict[str, ScanProgress]:
+    """
+    Scannt mehrere Medienwurzeln parallel (höchstens settings.scan_max_parallel_roots
+    gleichzeitig), jede mit eigener Datenbankverbindung und eigenen Worker-Limits.
+    
+    Args:
+        root_ids: Die zu scannenden Medienwurzeln
+        dry_run: Nur Pläne erstellen
+        on_start: Optionaler Callback (Name, Fortschritt) beim Start jedes Scans, z.B. für
+            eine Fortschrittsanzeige
+    
+    Returns:
+        Dictionary Name der Medienwurzel -> Fortschritt (inklusive Zusammenfassung und Plan)
+    """
+    with ThreadPoolExecutor(max_workers=max(1, settings.scan_max_parallel_roots)) as pool:
+        return dict(pool.map(lambda root_id: _scan_root_in_session(root_id, dry_run, on_start), root_ids))
 
 def main():
     parser = argparse.ArgumentParser(description='Scannt lokale Anime-Dateien und aktualisiert die Datenbank')
     parser.add_argument('--media-dir', type=str, default='/mnt/mediathek', help='Pfad zum Mediathek-Verzeichnis')
     parser.add_argument('--anime-subdir', type=str, default='Anime', help='Anime-Unterverzeichnis in der Mediathek')
     parser.add_argument('--include-movies', action='store_true', help='Filme-Verzeichnis ebenfalls scannen')
+    parser.add_argument('--chunk-size', type=int, default=settings.scan_chunk_size, help='Anzahl der Dateien pro Commit')
+    parser.add_argument('--hash', dest='hash_mode', choices=['partial', 'full'], default=None,
+                        help='Inhalts-Hashes für die Duplikaterkennung berechnen (partial: Anfang, Ende und Größe; full: gesamte Datei)')
+    parser.add_argument('--no-probe', dest='probe_media', action='store_false', default=settings.scan_probe_media,
+                        help='Container-Header (Auflösung, Codec, Audio) nicht auslesen')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Anzahl der Prozesse für das Parsen der Dateinamen (Standard: 1 wie in der API)')
+    parser.add_argument('--dry-run', action='store_true', help='Nur anzeigen, was der Scan ändern würde (Plan als JSON auf stdout)')
+    parser.add_argument('--unmatched-report', type=str, default=None,
+                        help='Nicht zugeordnete Dateien mit Vorschlägen als JSON in diese Datei schreiben')
+    parser.add_argument('--top-k', type=int, default=3, help='Anzahl der Vorschläge je nicht zugeordneter Datei')
+    parser.add_argument('--root', dest='roots', action='append', default=None, metavar='NAME',
+                        help='Konfigurierte Medienwurzel scannen (mehrfach möglich); nutzt deren eigene Einstellungen')
+    parser.add_argument('--all-roots', action='store_true', help='Alle aktivierten Medienwurzeln parallel scannen')
+    parser.add_argument('--progress', action='store_true',
+                        help='Laufend Fortschritt ausgeben (Dateien/s, Parse- und Match-Rate, DB-Latenz) auf stderr')
+    parser.add_argument('--progress-interval', type=float, default=2.0, help='Abstand der Fortschrittsausgaben in Sekunden')
+    parser.add_argument('--summary-json', type=str, default=None,
+                        help='Zusammenfassung mit Zählern und Laufzeiten je Stufe als JSON in diese Datei schreiben')
+    parser.add_argument('--debug', action='store_true', help='Debug-Ausgaben aktivieren')
     args = parser.parse_args()
     
+    # Logging erst hier konfigurieren, damit ein Import des Moduls (z.B. durch die API)
+    # nicht das Log-Level der gesamten Anwendung auf DEBUG setzt
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    started_at = datetime.now()
+    # Alle Scans des Aufrufs (Verzeichnis bzw. Medienwurzel -> Fortschritt) für --summary-json
+    runs: Dict[str, ScanProgress] = {}
+    reporter = ProgressReporter(interval=args.progress_interval) if args.progress else None
+    
+    def track(label: str, progress: ScanProgress) -> None:
+        runs[label] = progress
+        if reporter:
+            reporter.track(label, progress)
+    
+    if reporter:
+        reporter.start()
+    try:
+        run_cli(args, track)
+    finally:
+        if reporter:
+            reporter.stop()
+        if args.summary_json:
+            options = {key: getattr(args, key) for key in ('media_dir', 'anime_subdir', 'include_movies', 'chunk_size',
+                                                          'hash_mode', 'probe_media', 'workers', 'dry_run', 'roots',
+                                                          'all_roots')}
+            with open(args.summary_json, 'w', encoding='utf-8') as f:
+                json.dump(build_run_summary(runs, started_at, options), f, ensure_ascii=False, indent=2)
+            logger.info("Zusammenfassung geschrieben: %s", args.summary_json)
+
+def run_cli(args: argparse.Namespace, track: Callable[[str, ScanProgress], None]) -> None:
+    """
+    Führt die über die Kommandozeile gewählten Scans aus.
+    
+    Args:
+        args: Die geparsten Argumente von main()
+        track: Callback (Bezeichnung, Fortschritt), der für jeden gestarteten Scan aufgerufen wird
+    """
+    if args.roots or args.all_roots:
+        db = SessionLocal()
+        try:
+            if args.all_roots:
+                roots = crud.get_media_roots(db, enabled_only=True)
+            else:
+                roots = []
+                for name in args.roots:
+                    root = crud.get_media_root_by_name(db, name)
+                    if root is None:
+                        logger.error("Medienwurzel nicht gefunden: %s", name)
+                        sys.exit(1)
+                    roots.append(root)
+            root_ids = [root.id for root in roots]
+        finally:
+            db.close()
+        
+        results = scan_media_roots(root_ids, dry_run=args.dry_run, on_start=track)
+        if args.dry_run:
+            plans = {name: progress.plan.as_dict(progress.summary.as_dict()) if progress.plan else None
+                     for name, progress in results.items()}
+            print(json.dumps(plans, ensure_ascii=False, indent=2))
+            return
+        for name, progress in results.items():
+            summary = progress.summary
+            logger.info("Medienwurzel '%s': %s Dateien gefunden, %s Animes gematcht, %s Episoden erstellt, %s aktualisiert",
+                        name, summary.total_files, summary.matched_animes, summary.inserted_episodes,
+                        summary.updated_episodes)
+        if args.unmatched_report:
+            db = SessionLocal()
+            try:
+                unmatched = [path for progress in results.values() for path in progress.unmatched_files]
+                report = build_unmatched_report(unmatched, build_candidate_index(db), args.top_k)
+            finally:
+                db.close()
+            with open(args.unmatched_report, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            logger.info("Bericht über %s nicht zugeordnete Dateien geschrieben: %s", len(report), args.unmatched_report)
+        return
+    
     media_dir = os.path.join(args.media_dir, args.anime_subdir)
     
     if not os.path.exists(media_dir):
-        logger.error(f"Verzeichnis existiert nicht: {media_dir}")
+        logger.error("Verzeichnis existiert nicht: %s", media_dir)
         sys.exit(1)
     
-    logger.info(f"Starte Scan von {media_dir}...")
+    logger.info("Starte Scan von %s...", media_dir)
     
     # Datenbankverbindung herstellen
     db = SessionLocal()
+    
+    if args.dry_run:
+        try:
+            directories = [media_dir]
+            movie_dir = os.path.join(args.media_dir, 'Anime Movie')
+            if args.include_movies and os.path.exists(movie_dir):
+                directories.append(movie_dir)
+            plans = {}
+            for directory in directories:
+                progress = ScanProgress()
+                track(directory, progress)
+                plan = plan_scan(directory, db, chunk_size=args.chunk_size, workers=args.workers, progress=progress)
+                plans[directory] = plan.as_dict(progress.summary.as_dict())
+            print(json.dumps(plans, ensure_ascii=False, indent=2))
+        finally:
+            db.close()
+        return
+    
+    # Alle nicht zugeordneten Dateien des Laufs (für --unmatched-report)
+    unmatched_files: List[str] = []
     try:
-        files, animes, episodes = scan_and_update(media_dir, db)
-        logger.info(f"Scan abgeschlossen: {files} Dateien gefunden, {animes} Animes gematcht, {episodes} Episoden aktualisiert")
+        progress = ScanProgress()
+        track(media_dir, progress)
+        summary = scan_and_update(media_dir, db, chunk_size=args.chunk_size, workers=args.workers, progress=progress,
+                                  hash_mode=args.hash_mode, probe_media=args.probe_media)
+        unmatched_files.extend(progress.unmatched_files)
+        logger.info("Scan abgeschlossen: %s Dateien gefunden, %s Animes gematcht, %s Episoden aktualisiert",
+                    summary.total_files, summary.matched_animes, summary.updated_episodes)
         
         # Optionaler Scan des Film-Verzeichnisses
         if args.include_movies:
             movie_dir = os.path.join(args.media_dir, 'Anime Movie')
             if os.path.exists(movie_dir):
-                logger.info(f"Starte Scan von {movie_dir}...")
-                m_files, m_animes, m_episodes = scan_and_update(movie_dir, db)
-                logger.info(f"Film-Scan abgeschlossen: {m_files} Dateien gefunden, {m_animes} Animes gematcht, {m_episodes} Episoden aktualisiert")
+                logger.info("Starte Scan von %s...", movie_dir)
+                movie_progress = ScanProgress()
+                track(movie_dir, movie_progress)
+                movie_summary = scan_and_update(movie_dir, db, chunk_size=args.chunk_size, workers=args.workers, progress=movie_progress,
+                                                hash_mode=args.hash_mode, probe_media=args.probe_media)
+                unmatched_files.extend(movie_progress.unmatched_files)
+                logger.info("Film-Scan abgeschlossen: %s Dateien gefunden, %s Animes gematcht, %s Episoden aktualisiert",
+                            movie_summary.total_files, movie_summary.matched_animes, movie_summary.updated_episodes)
                 
                 # Gesamtergebnisse
-                logger.info(f"Gesamtergebnis: {files + m_files} Dateien gefunden, {animes + m_animes} Animes gematcht, {episodes + m_episodes} Episoden aktualisiert")
+                logger.info("Gesamtergebnis: %s Dateien gefunden, %s Animes gematcht, %s Episoden aktualisiert",
+                            summary.total_files + movie_summary.total_files,
+                            summary.matched_animes + movie_summary.matched_animes,
+                            summary.updated_episodes + movie_summary.updated_episodes)
             else:
-                logger.warning(f"Film-Verzeichnis existiert nicht: {movie_dir}")
+                logger.warning("Film-Verzeichnis existiert nicht: %s", movie_dir)
+        
+        if args.unmatched_report:
+            report = build_unmatched_report(unmatched_files, build_candidate_index(db), args.top_k)
+            with open(args.unmatched_report, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            logger.info("Bericht über %s nicht zugeordnete Dateien geschrieben: %s", len(report), args.unmatched_report)
                 
     except SQLAlchemyError as e:
-        logger.error(f"Datenbankfehler: {e}")
+        logger.error("Datenbankfehler: %s", e)
         db.rollback()
     finally:
         db.close()
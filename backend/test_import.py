@@ -44,13 +44,14 @@ def test_import(media_dir):
     
     try:
         # Import durchführen
-        total_files, matched_animes, updated_episodes = scan_and_update(media_dir, db)
+        summary = scan_and_update(media_dir, db)
         
         # Ergebnisse ausgeben
         logger.info(f"=== IMPORT ERFOLGREICH ===")
-        logger.info(f"Gefundene Dateien: {total_files}")
-        logger.info(f"Zugeordnete Animes: {matched_animes}")
-        logger.info(f"Aktualisierte Episoden: {updated_episodes}")
+        logger.info(f"Gefundene Dateien: {summary.total_files}")
+        logger.info(f"Zugeordnete Animes: {summary.matched_animes}")
+        logger.info(f"Erstellte Episoden: {summary.inserted_episodes}")
+        logger.info(f"Aktualisierte Episoden: {summary.updated_episodes}")
         
     except SQLAlchemyError as e:
         logger.error(f"Datenbankfehler: {str(e)}")
@@ -22,12 +22,14 @@ const statusVariants: Record<AnimeStatus, string> = {
 
 interface AnimeCardProps {
   anime: Anime;
+  // Versionierte Thumbnail-URL aus /api/covers/batch (darf dauerhaft gecacht werden)
+  coverUrl?: string | null;
 }
 
-const AnimeCard: React.FC<AnimeCardProps> = ({ anime }) => {
+const AnimeCard: React.FC<AnimeCardProps> = ({ anime, coverUrl: batchCoverUrl }) => {
   // Fallback-Bild, falls kein Cover vorhanden
   const coverUrl = anime.cover_image_url 
-    ? `/api/cover/${anime.id}` 
+    ? batchCoverUrl || `/api/cover/${anime.id}?w=240` 
     : '/placeholder-cover.jpg';
 
   // Kürze die Beschreibung, wenn sie zu lang ist
@@ -1,6 +1,10 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { Modal, Button, Form, Alert, Spinner } from 'react-bootstrap';
 import { animeService } from '../services/api';
+import { ScanJob } from '../types';
+
+// Abfrageintervall für den Fortschritt eines Scan-Jobs
+const POLL_INTERVAL_MS = 1000;
 
 interface ImportLocalFilesModalProps {
   show: boolean;
@@ -12,12 +16,53 @@ const ImportLocalFilesModal: React.FC<ImportLocalFilesModalProps> = ({ show, onH
   const [importPath, setImportPath] = useState<string>('/mnt/mediathek/Anime');
   const [isImporting, setIsImporting] = useState<boolean>(false);
   const [importError, setImportError] = useState<string | null>(null);
-  const [importResult, setImportResult] = useState<{
-    total_files: number;
-    matched_animes: number;
-    updated_episodes: number;
-  } | null>(null);
+  const [scanJob, setScanJob] = useState<ScanJob | null>(null);
   const [createNew, setCreateNew] = useState<boolean>(true);
+  const pollTimer = useRef<number | null>(null);
+
+  const stopPolling = () => {
+    if (pollTimer.current !== null) {
+      window.clearTimeout(pollTimer.current);
+      pollTimer.current = null;
+    }
+  };
+
+  // Polling beim Schließen der Komponente beenden
+  useEffect(() => stopPolling, []);
+
+  const pollScanJob = async (jobId: string) => {
+    const response = await animeService.getScanJob(jobId);
+    if (response.error || !response.data) {
+      setImportError(response.error || 'Status des Scans konnte nicht abgerufen werden.');
+      setIsImporting(false);
+      return;
+    }
+
+    const job = response.data;
+    setScanJob(job);
+
+    if (job.status === 'queued' || job.status === 'running') {
+      pollTimer.current = window.setTimeout(() => pollScanJob(jobId), POLL_INTERVAL_MS);
+      return;
+    }
+
+    setIsImporting(false);
+    if (job.status === 'failed') {
+      setImportError(job.error || 'Der Scan ist fehlgeschlagen.');
+    } else if (job.status === 'completed') {
+      // Erfolgreiche Importbenachrichtigung
+      setTimeout(() => {
+        onSuccess();
+        onHide();
+      }, 3000);
+    }
+  };
+
+  const handleCancel = async () => {
+    if (scanJob) {
+      await animeService.cancelScanJob(scanJob.job_id);
+    }
+  };
 
   const handleImport = async () => {
     if (!importPath.trim()) {
@@ -25,44 +70,36 @@ const ImportLocalFilesModal: React.FC<ImportLocalFilesModalProps> = ({ show, onH
       return;
     }
 
+    stopPolling();
     setIsImporting(true);
     setImportError(null);
-    setImportResult(null);
+    setScanJob(null);
 
     try {
-      console.log('Import-Anfrage wird gesendet für:', importPath);
-      console.log('CreateNew Flag ist:', createNew);
-      
       // Je nach Einstellung entweder normale Scan-Funktion oder Scan-and-Create verwenden
       const response = createNew 
         ? await animeService.scanAndCreateAnimes(importPath)
         : await animeService.scanLocalFiles(importPath);
       
-      console.log('Vollständige API-Antwort:', response);
-      
-      if (response.error) {
+      if (response.error || !response.data) {
         const errorMessage = typeof response.error === 'string' 
           ? response.error 
           : JSON.stringify(response.error);
         console.error('Import error details:', errorMessage);
         setImportError(errorMessage);
-      } else if (response.data) {
-        console.log('Import erfolgreich, Ergebnis:', response.data);
-        setImportResult(response.data);
-        
-        // Erfolgreiche Importbenachrichtigung
-        setTimeout(() => {
-          onSuccess();
-          onHide();
-        }, 3000);
+        setIsImporting(false);
+        return;
       }
+
+      // Der Scan läuft im Hintergrund weiter, Fortschritt abfragen
+      setScanJob(response.data);
+      pollScanJob(response.data.job_id);
     } catch (err) {
       console.error('Import error:', err);
       const errorMessage = err instanceof Error 
         ? `${err.name}: ${err.message}` 
         : 'Ein unerwarteter Fehler ist aufgetreten.';
       setImportError(errorMessage);
-    } finally {
       setIsImporting(false);
     }
   };
@@ -108,18 +145,40 @@ const ImportLocalFilesModal: React.FC<ImportLocalFilesModalProps> = ({ show, onH
           </Alert>
         )}
 
-        {importResult && (
-          <Alert variant="success" className="mt-3">
-            <p className="mb-0">Import erfolgreich!</p>
+        {scanJob && isImporting && (
+          <Alert variant="info" className="mt-3">
+            <p className="mb-0">Scan läuft...</p>
             <ul className="mb-0 mt-2">
-              <li>Gefundene Dateien: {importResult.total_files}</li>
-              <li>Zugeordnete/Erstellte Animes: {importResult.matched_animes}</li>
-              <li>Aktualisierte Episoden: {importResult.updated_episodes}</li>
+              <li>Gefundene Dateien: {scanJob.progress.files_walked}</li>
+              <li>Geparste Dateien: {scanJob.progress.files_parsed}</li>
+              <li>Zugeordnete Dateien: {scanJob.progress.files_matched}</li>
+              <li>Gespeicherte Dateien: {scanJob.progress.files_written}</li>
+              <li>Durchsatz: {scanJob.progress.files_per_second} Dateien/s</li>
+            </ul>
+          </Alert>
+        )}
+
+        {scanJob && (scanJob.status === 'completed' || scanJob.status === 'cancelled') && (
+          <Alert variant={scanJob.status === 'completed' ? 'success' : 'warning'} className="mt-3">
+            <p className="mb-0">
+              {scanJob.status === 'completed' ? 'Import erfolgreich!' : 'Import abgebrochen.'}
+            </p>
+            <ul className="mb-0 mt-2">
+              <li>Gefundene Dateien: {scanJob.summary.total_files}</li>
+              <li>Zugeordnete/Erstellte Animes: {scanJob.summary.matched_animes}</li>
+              <li>Neue Episoden: {scanJob.summary.inserted_episodes}</li>
+              <li>Aktualisierte Episoden: {scanJob.summary.updated_episodes}</li>
+              <li>Nicht zugeordnete Dateien: {scanJob.summary.unmatched_files}</li>
             </ul>
           </Alert>
         )}
       </Modal.Body>
       <Modal.Footer>
+        {isImporting && scanJob && (
+          <Button variant="outline-danger" onClick={handleCancel}>
+            Abbrechen
+          </Button>
+        )}
         <Button variant="secondary" onClick={onHide} disabled={isImporting}>
           Schließen
         </Button>
@@ -0,0 +1,29 @@
+import { useState, useEffect } from 'react';
+import { Anime, CoverInfo } from '../types';
+import { animeService } from '../services/api';
+
+/**
+ * Löst die Cover-URLs aller Karten mit einer Anfrage auf statt einer Datenbankabfrage je Karte.
+ * Liefert die Cover-Infos je Anime-ID (als String), sobald die Antwort da ist.
+ */
+export const useCoverBatch = (animes: Anime[], width?: number): Record<string, CoverInfo> => {
+  const [covers, setCovers] = useState<Record<string, CoverInfo>>({});
+
+  useEffect(() => {
+    const ids = animes.filter(anime => anime.cover_image_url).map(anime => anime.id);
+    if (ids.length === 0) {
+      return;
+    }
+    let cancelled = false;
+    animeService.getCoverBatch(ids, width).then(response => {
+      if (!cancelled && response.data) {
+        setCovers(response.data.covers);
+      }
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, [animes, width]);
+
+  return covers;
+};
@@ -144,7 +144,7 @@ const AnimeDetailPage = () => {
 
   // Anime-Cover URL
   const coverUrl = anime.cover_image_url 
-    ? `/api/cover/${anime.id}` 
+    ? `/api/cover/${anime.id}?w=480` 
     : '/placeholder-cover.jpg';
 
   return (
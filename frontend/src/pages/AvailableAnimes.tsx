@@ -310,7 +310,7 @@ const AvailableAnimes = () => {
                         <div className="card-img-container">
                           <Card.Img 
                             variant="top" 
-                            src={anime.cover_image_url ? `/api/cover/${anime.id}` : '/placeholder-cover.jpg'} 
+                            src={anime.cover_image_url ? `/api/cover/${anime.id}?w=240` : '/placeholder-cover.jpg'} 
                             alt={`Cover: ${anime.titel_de}`} 
                             className="anime-cover"
                           />
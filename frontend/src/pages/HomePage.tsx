@@ -3,6 +3,7 @@ import { Container, Row, Col, Spinner, Alert, Form } from 'react-bootstrap';
 import { AnimeStatus, Anime } from '../types';
 import { animeService } from '../services/api';
 import AnimeCard from '../components/AnimeCard';
+import { useCoverBatch } from '../hooks/useCoverBatch';
 
 const HomePage = () => {
   const [animes, setAnimes] = useState<Anime[]>([]);
@@ -27,6 +28,8 @@ const HomePage = () => {
     fetchAnimes();
   }, []);
 
+  const covers = useCoverBatch(animes);
+
   // Filtere Animes basierend auf dem ausgewählten Status
   const filteredAnimes = statusFilter === 'all'
     ? animes
@@ -79,7 +82,7 @@ const HomePage = () => {
         <Row xs={1} sm={2} md={3} lg={4} className="g-4">
           {filteredAnimes.map(anime => (
             <Col key={anime.id}>
-              <AnimeCard anime={anime} />
+              <AnimeCard anime={anime} coverUrl={covers[anime.id]?.url} />
             </Col>
           ))}
         </Row>
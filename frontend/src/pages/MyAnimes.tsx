@@ -3,6 +3,7 @@ import { Container, Row, Col, Spinner, Alert, Form, InputGroup, Button, Paginati
 import { AnimeStatus, Anime } from '../types';
 import { animeService } from '../services/api';
 import AnimeCard from '../components/AnimeCard';
+import { useCoverBatch } from '../hooks/useCoverBatch';
 import { FaSearch, FaThList, FaTh, FaFileImport } from 'react-icons/fa';
 import ImportLocalFilesModal from '../components/ImportLocalFilesModal';
 
@@ -76,6 +77,8 @@ const MyAnimes = () => {
     fetchAnimes();
   }, []);
 
+  const covers = useCoverBatch(animes);
+
   // Filtern der Animes basierend auf allen Filtern
   const filteredAnimes = animes.filter(anime => {
     // Status-Filter
@@ -521,7 +524,7 @@ const MyAnimes = () => {
             <Row xs={1} sm={2} md={3} lg={4} className="g-4">
               {currentAnimes.map(anime => (
                 <Col key={anime.id}>
-                  <AnimeCard anime={anime} />
+                  <AnimeCard anime={anime} coverUrl={covers[anime.id]?.url} />
                 </Col>
               ))}
             </Row>
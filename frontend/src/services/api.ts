@@ -1,9 +1,12 @@
 import axios, { AxiosResponse } from 'axios';
-import { Anime, Episode, AnimeListResponse, ApiResponse, AnimeCreate, AnimeUpdate, EpisodeCreate, ExternalAnimeSearchResult, AnimeScrapingResult } from '../types';
+import { Anime, Episode, AnimeListResponse, ApiResponse, AnimeCreate, AnimeUpdate, EpisodeCreate, ExternalAnimeSearchResult, AnimeScrapingResult, ScanJob, CoverBatchResponse } from '../types';
 
 // API Basis-URL konfigurieren
 const API_BASE_URL = 'http://localhost:8000';
 
+// Höchstzahl an Anime-IDs je Anfrage an /api/covers/batch (cover_batch_max_ids im Backend)
+const COVER_BATCH_SIZE = 500;
+
 // Axios-Instance mit Basis-Konfiguration
 const api = axios.create({
   baseURL: API_BASE_URL,
@@ -50,6 +53,27 @@ export const animeService = {
     }
   },
 
+  // Thumbnail-URLs vieler Animes mit einer Anfrage auflösen (für Kartenraster)
+  // (in Blöcken von COVER_BATCH_SIZE IDs, der Obergrenze des Backends)
+  getCoverBatch: async (animeIds: number[], width: number = 240): Promise<ApiResponse<CoverBatchResponse>> => {
+    try {
+      const result: CoverBatchResponse = { covers: {}, not_found: [] };
+      let status = 200;
+      for (let i = 0; i < animeIds.length; i += COVER_BATCH_SIZE) {
+        const response = await api.post<CoverBatchResponse>('/api/covers/batch', {
+          anime_ids: animeIds.slice(i, i + COVER_BATCH_SIZE),
+          w: width,
+        });
+        Object.assign(result.covers, response.data.covers);
+        result.not_found.push(...response.data.not_found);
+        status = response.status;
+      }
+      return { data: result, status };
+    } catch (error) {
+      return handleApiError(error);
+    }
+  },
+
   // Anime nach Titel suchen
   searchAnimes: async (query: string): Promise<ApiResponse<AnimeListResponse>> => {
     try {
@@ -144,11 +168,11 @@ export const animeService = {
     }
   },
   
-  // Lokale Anime-Dateien scannen und importieren
-  scanLocalFiles: async (mediaDir: string): Promise<ApiResponse<{total_files: number, matched_animes: number, updated_episodes: number}>> => {
+  // Lokale Anime-Dateien im Hintergrund scannen und importieren
+  scanLocalFiles: async (mediaDir: string): Promise<ApiResponse<ScanJob>> => {
     try {
-      const response = await api.post<{total_files: number, matched_animes: number, updated_episodes: number}>(
-        '/api/animes/scan-local-files/', 
+      const response = await api.post<ScanJob>(
+        '/api/animes/scan-local-files', 
         { media_dir: mediaDir }
       );
       return createApiResponse(response);
@@ -157,10 +181,10 @@ export const animeService = {
     }
   },
 
-  // Lokale Anime-Dateien scannen und neue Animes erstellen
-  scanAndCreateAnimes: async (mediaDir: string): Promise<ApiResponse<{total_files: number, matched_animes: number, updated_episodes: number}>> => {
+  // Lokale Anime-Dateien im Hintergrund scannen und neue Animes erstellen
+  scanAndCreateAnimes: async (mediaDir: string): Promise<ApiResponse<ScanJob>> => {
     try {
-      const response = await api.post<{total_files: number, matched_animes: number, updated_episodes: number}>(
+      const response = await api.post<ScanJob>(
         '/api/animes/scan-and-create', 
         { media_dir: mediaDir }
       );
@@ -169,6 +193,26 @@ export const animeService = {
       return handleApiError(error);
     }
   },
+
+  // Status und Fortschritt eines Scan-Jobs abrufen
+  getScanJob: async (jobId: string): Promise<ApiResponse<ScanJob>> => {
+    try {
+      const response = await api.get<ScanJob>(`/api/scans/${jobId}`);
+      return createApiResponse(response);
+    } catch (error) {
+      return handleApiError(error);
+    }
+  },
+
+  // Laufenden Scan-Job abbrechen
+  cancelScanJob: async (jobId: string): Promise<ApiResponse<ScanJob>> => {
+    try {
+      const response = await api.post<ScanJob>(`/api/scans/${jobId}/cancel`);
+      return createApiResponse(response);
+    } catch (error) {
+      return handleApiError(error);
+    }
+  },
 };
 
 export const episodeService = {
@@ -95,7 +95,9 @@ export interface AnimeUpdate {
 export interface Episode {
   id: number;
   anime_id: number;
+  staffel: number;
   episoden_nummer: number;
+  absolute_nummer?: number | null;
   titel: string;
   status: EpisodeStatus;
   availability_status: EpisodeAvailabilityStatus;
@@ -110,6 +112,7 @@ export interface Episode {
 // Episode Create Interface
 export interface EpisodeCreate {
   anime_id: number;
+  staffel?: number;
   episoden_nummer: number;
   titel?: string;
   status?: EpisodeStatus;
@@ -144,3 +147,94 @@ export interface AnimeScrapingResult {
   anime: AnimeCreate;
   episodes: EpisodeCreate[];
 }
+
+// Scan-Job Interfaces (Hintergrund-Scan lokaler Dateien)
+export type ScanJobStatus = 'queued' | 'running' | 'completed' | 'cancelled' | 'failed';
+
+export interface ScanProgress {
+  files_walked: number;
+  files_parsed: number;
+  files_matched: number;
+  files_written: number;
+  files_hashed: number;
+  files_probed: number;
+  files_per_second: number;
+  parse_per_second: number;
+  match_per_second: number;
+  db_writes: number;
+  db_write_avg_ms: number;
+  db_write_max_ms: number;
+  elapsed_seconds: number;
+  timings: Record<string, number>;
+}
+
+export interface ScanSummary {
+  total_files: number;
+  matched_animes: number;
+  created_animes: number;
+  inserted_episodes: number;
+  updated_episodes: number;
+  unchanged_episodes: number;
+  unmatched_files: number;
+  hashed_files: number;
+  unchanged_hashes: number;
+  probed_files: number;
+  unchanged_probes: number;
+  moved_files: number;
+  vanished_episodes: number;
+  committed_chunks: number;
+  failed_chunks: number;
+  failed_files: number;
+}
+
+export interface ScanJob {
+  job_id: string;
+  media_dir: string;
+  create_missing: boolean;
+  workers: number;
+  hash_mode?: 'partial' | 'full' | null;
+  probe_media?: boolean | null;
+  dry_run?: boolean;
+  root_id?: number | null;
+  root_name?: string | null;
+  status: ScanJobStatus;
+  error?: string | null;
+  created_at: string;
+  finished_at?: string | null;
+  progress: ScanProgress;
+  summary: ScanSummary;
+}
+
+export interface MediaRoot {
+  id: number;
+  name: string;
+  path: string;
+  include_globs?: string[] | null;
+  exclude_globs?: string[] | null;
+  extensions?: string[] | null;
+  scan_interval_minutes?: number | null;
+  workers: number;
+  io_workers?: number | null;
+  create_missing: boolean;
+  hash_mode?: 'partial' | 'full' | null;
+  probe_media?: boolean | null;
+  enabled: boolean;
+  last_scan_at?: string | null;
+  last_scan_status?: string | null;
+  last_job_id?: string | null;
+  created_at?: string | null;
+}
+
+export type CoverStatus = 'ready' | 'pending' | 'failed' | 'none';
+
+export interface CoverInfo {
+  status: CoverStatus;
+  url: string | null;
+  etag?: string | null;
+  content_type?: string | null;
+}
+
+export interface CoverBatchResponse {
+  covers: Record<string, CoverInfo>;
+  not_found: number[];
+}